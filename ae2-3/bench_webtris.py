@@ -0,0 +1,605 @@
+"""Benchmarks for the WebTRIS client. Run with `python bench_webtris.py <benchmark>`"""
+
+import argparse
+import asyncio
+import json
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+
+from webtris_archive import ObservationArchive
+from webtris_async import AsyncWebTRISClient
+from webtris_cache import ObservationCache, SingleFlight, approximate_size
+from webtris_catalog import SiteCatalog
+from webtris_client import (
+    DailyReportRangeRequest,
+    DailyReportRequest,
+    ObservationStore,
+    Site,
+    SiteInfo,
+    SiteTrend,
+    TrafficObservation,
+    WebTRISTransport,
+    get_default_single_flight,
+    set_default_single_flight,
+)
+from webtris_codec import SiteDayFleet
+from webtris_graph import (
+    DijkstrasAlgoSearch,
+    RouteSegment,
+    collect_segments,
+    hydrate_segments,
+)
+from webtris_planner import RequestPlanner
+from webtris_stub_server import StubWebTRISServer, make_daily_rows
+
+DATE = datetime(2025, 3, 10)
+
+
+def bench_transport(request_count: int) -> None:
+    """
+    Compares requests per second against a local stub server with a pooled transport
+    and with a new connection per request (the behaviour of module-level `requests.request`).
+    """
+    with StubWebTRISServer() as server:
+        start_connections = server.connection_count
+        start = time.perf_counter()
+        for i in range(request_count):
+            with WebTRISTransport(base_url=server.url) as transport:
+                DailyReportRequest(i + 1, DATE, transport=transport).send()
+        unpooled = time.perf_counter() - start
+        unpooled_connections = server.connection_count - start_connections
+
+        start_connections = server.connection_count
+        start = time.perf_counter()
+        with WebTRISTransport(base_url=server.url) as transport:
+            for i in range(request_count):
+                DailyReportRequest(i + 1, DATE, transport=transport).send()
+        pooled = time.perf_counter() - start
+        pooled_connections = server.connection_count - start_connections
+
+    print(f"{'mode':<10}{'req/s':>10}{'connections':>14}")
+    print(
+        f"{'unpooled':<10}{request_count / unpooled:>10.1f}{unpooled_connections:>14}"
+    )
+    print(f"{'pooled':<10}{request_count / pooled:>10.1f}{pooled_connections:>14}")
+
+
+def bench_batch(site_count: int) -> None:
+    """
+    Compares hydrating a `RouteSegment` one request per site against one batched request,
+    with 20ms of server latency per call to imitate a remote API.
+    """
+    site_ids = list(range(1, site_count + 1))
+    with (
+        StubWebTRISServer(latency=0.02) as server,
+        WebTRISTransport(base_url=server.url) as transport,
+    ):
+        for batched in (False, True):
+            start_requests = server.request_count
+            start = time.perf_counter()
+            RouteSegment("bench", site_ids, DATE, 1, transport, batched=batched)
+            elapsed = time.perf_counter() - start
+            mode = "batched" if batched else "per-site"
+            print(
+                f"{mode:<10}{elapsed * 1000:>10.1f} ms{server.request_count - start_requests:>8} calls"
+            )
+
+
+def bench_async(pair_count: int) -> None:
+    """
+    Measures `AsyncWebTRISClient` throughput at 10, 50 and 200 concurrent requests,
+    with 50ms of server latency per call to imitate a remote API.
+    """
+    pairs = [
+        (site_id % 100 + 1, DATE + timedelta(days=site_id // 100))
+        for site_id in range(pair_count)
+    ]
+
+    async def run(concurrency: int, url: str) -> float:
+        transport = WebTRISTransport(pool_size=concurrency, base_url=url)
+        async with AsyncWebTRISClient(concurrency, transport=transport) as client:
+            start = time.perf_counter()
+            results = await client.fetch_many(pairs)
+            elapsed = time.perf_counter() - start
+        transport.close()
+        failed = sum(isinstance(r, Exception) for r in results.values())
+        if failed:
+            print(f"{failed} requests failed")
+        return elapsed
+
+    print(f"{'concurrency':<12}{'req/s':>10}{'peak in flight':>16}")
+    for concurrency in (10, 50, 200):
+        with StubWebTRISServer(latency=0.05) as server:
+            elapsed = asyncio.run(run(concurrency, server.url))
+            print(
+                f"{concurrency:<12}{len(pairs) / elapsed:>10.1f}{server.peak_in_flight:>16}"
+            )
+
+
+def make_year(site_id: int = 1, days: int = 365) -> list[TrafficObservation]:
+    """
+    Builds a year of fifteen minute observations for one site, in chronological order.
+    """
+    observations: list[TrafficObservation] = []
+    for day in range(days):
+        date = datetime(2025, 1, 1) + timedelta(days=day)
+        for interval in range(96):
+            minutes = interval * 15 + 14
+            observations.append(
+                TrafficObservation(
+                    site_name=f"STUB/{site_id}",
+                    site_id=site_id,
+                    end_time=date.replace(hour=minutes // 60, minute=minutes % 60),
+                    average_speed=40.0 + (day + interval) % 30,
+                    vehicle_count=50 + (day * 7 + interval * 13) % 200,
+                )
+            )
+    return observations
+
+
+def _time_ms(function, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def _list_dashboard(observations: list[TrafficObservation]) -> None:
+    # The list-of-objects aggregates `Site` used before columnar storage
+    sum(o.average_speed * o.vehicle_count for o in observations)
+    sum(o.vehicle_count for o in observations)
+    for hour in range(24):
+        sum(
+            o.average_speed * o.vehicle_count
+            for o in observations
+            if o.end_datetime.hour == hour
+        )
+        sum(o.vehicle_count for o in observations if o.end_datetime.hour == hour)
+
+
+def _site_dashboard(site: Site) -> None:
+    site.get_average_speed()
+    for hour in range(24):
+        site.get_hourly_average_speed(hour)
+        site.get_hourly_vehicle_count(hour)
+    site.get_peak_hour()
+
+
+def bench_columns(days: int) -> None:
+    """
+    Compares memory per row and the latency of a full dashboard (average speed, 24 hourly speeds and counts, peak hour)
+    between a list of `TrafficObservation` and the columnar storage used by `Site`.
+    """
+    observations = make_year(days=days)
+    site = Site(1, datetime(2025, 1, 1), observations=observations)
+    rows = len(observations)
+    print(f"{rows} rows")
+    print(f"{'storage':<10}{'bytes/row':>12}{'dashboard ms':>15}")
+    print(
+        f"{'objects':<10}{approximate_size(observations) / rows:>12.1f}"
+        f"{_time_ms(lambda: _list_dashboard(observations)):>15.2f}"
+    )
+    print(
+        f"{'columns':<10}{site._observations.nbytes / rows:>12.1f}"
+        f"{_time_ms(lambda: _site_dashboard(site)):>15.2f}"
+    )
+
+
+def make_report_rows(row_count: int) -> list[dict]:
+    """
+    Scales the rows of the `ae2-report/res.json` response up to `row_count`, moving each copy to the next day.
+    Every hundredth row has its "Avg mph" blanked, as the API does for faulty loops.
+    """
+    with open(Path(__file__).parent / "ae2-report" / "res.json") as file:
+        sample = json.load(file)["Rows"]
+    start = datetime.fromisoformat(sample[0]["Report Date"])
+    rows: list[dict] = []
+    while len(rows) < row_count:
+        date = (start + timedelta(days=len(rows) // len(sample))).isoformat()
+        for row in sample[: row_count - len(rows)]:
+            row = dict(row, **{"Report Date": date})
+            if len(rows) % 100 == 99:
+                row["Avg mph"] = ""
+            rows.append(row)
+    return rows
+
+
+def _parse_each(rows: list[dict]) -> list[TrafficObservation]:
+    # The row by row parse `DailyReportRequest.send()` used before `ObservationStore.from_rows()`
+    observations: list[TrafficObservation] = []
+    for row in rows:
+        try:
+            observations.append(TrafficObservation.from_dict(1, row))
+        except (ValueError, TypeError):
+            continue
+    return sorted(observations)
+
+
+def bench_parse(row_count: int) -> None:
+    """
+    Compares parsing a `/reports/daily` response row by row with `TrafficObservation.from_dict()` against
+    `ObservationStore.from_rows()`, both to columns and to the list of observations returned by `send()`.
+    """
+    rows = make_report_rows(row_count)
+    store, dropped = ObservationStore.from_rows(1, rows)
+    print(f"{len(rows)} rows, {len(store)} kept, {dropped} dropped")
+    print(f"{'parser':<16}{'ms':>10}{'rows/s':>14}")
+    for name, function in (
+        ("from_dict", lambda: _parse_each(rows)),
+        ("from_rows", lambda: ObservationStore.from_rows(1, rows)),
+        ("from_rows+list", lambda: list(ObservationStore.from_rows(1, rows)[0])),
+    ):
+        elapsed = _time_ms(function, repeat=3)
+        print(f"{name:<16}{elapsed:>10.1f}{len(rows) / elapsed * 1000:>14.0f}")
+
+
+class _CopyingRouteSegment(RouteSegment):
+    def get_average_speed(self) -> float:
+        # The lookup RouteSegment used before views: copies the sites and each site's observations, then scans them
+        avg_speeds: list[float] = []
+        for site in self.sites:
+            observation = None
+            for o in site.get_observations_list():
+                if o.end_datetime > self.date:
+                    observation = o
+                    break
+            if observation:
+                avg_speeds.append(observation.average_speed)
+        return sum(avg_speeds) / len(avg_speeds)
+
+
+def make_network(
+    segment_count: int, segment_class: type[RouteSegment], width: int = 10
+) -> tuple[RouteSegment, RouteSegment]:
+    """
+    Builds a grid of segments `width` wide, each with three sites holding a day of observations.
+    Each segment leads to the three segments nearest to it in the next row. Returns the head and the far corner.
+    """
+    date = datetime(2025, 1, 1, 17, 30)
+    base = ObservationStore.from_observations(make_year(days=1))
+    rows = max(segment_count // width, 1)
+    grid: list[list[RouteSegment]] = []
+    for row in range(rows):
+        grid.append([])
+        for column in range(width):
+            site_ids = [(row * width + column) * 3 + i + 1 for i in range(3)]
+            segment = segment_class(
+                f"{row}-{column}",
+                site_ids,
+                date,
+                # Lengths that never tie, as DijkstrasAlgoSearch compares paths when times are equal
+                1 + (row * width + column) * 0.6180339887 % 1,
+                hydrate=False,
+            )
+            for site in segment.sites_view:
+                site.set_observations(
+                    ObservationStore(
+                        site.site_id,
+                        f"STUB/{site.site_id}",
+                        base.day,
+                        base.minute,
+                        base.speed + site.site_id % 7,
+                        base.volume,
+                    )
+                )
+            grid[row].append(segment)
+    for row in range(rows - 1):
+        for column in range(width):
+            for offset in (-1, 0, 1):
+                if 0 <= column + offset < width:
+                    grid[row][column].next_segments.append(
+                        grid[row + 1][column + offset]
+                    )
+    return grid[0][0], grid[-1][-1]
+
+
+def bench_dijkstra(segment_count: int) -> None:
+    """
+    Compares a Dijkstra search over a grid network when segment speeds are found by copying site and observation lists
+    and when they use read-only views and binary search. Reports the time taken and the `TrafficObservation` objects
+    created, with their approximate size. The search is run once beforehand so that caches built once per site are not counted.
+    """
+    created = 0
+    from_parts = TrafficObservation._from_parts.__func__
+
+    def counting_from_parts(cls, *args):
+        nonlocal created
+        created += 1
+        return from_parts(cls, *args)
+
+    print(f"{segment_count} segments")
+    print(f"{'lookup':<10}{'ms':>10}{'objects':>10}{'KiB':>10}")
+    for name, segment_class in (
+        ("copying", _CopyingRouteSegment),
+        ("views", RouteSegment),
+    ):
+        head, target = make_network(segment_count, segment_class)
+        DijkstrasAlgoSearch().search(head, target)
+        for segment in collect_segments(head):
+            segment._speed_key = (
+                None  # Forget segment speeds so every lookup is made again
+            )
+        created = 0
+        TrafficObservation._from_parts = classmethod(counting_from_parts)
+        try:
+            start = time.perf_counter()
+            path = DijkstrasAlgoSearch().search(head, target)
+            elapsed = time.perf_counter() - start
+        finally:
+            TrafficObservation._from_parts = classmethod(from_parts)
+        size = created * approximate_size(make_year(days=1)) / 96
+        print(f"{name:<10}{elapsed * 1000:>10.1f}{created:>10}{size / 1024:>10.0f}")
+    print(f"path of {len(path)} segments")
+
+
+def bench_archive(days: int) -> None:
+    """
+    Compares loading `days` days of one site as `Site` objects from JSON responses, parsed with `ObservationStore.from_rows()`,
+    and from an `ObservationArchive`, including opening the archive.
+    """
+    dates = [datetime(2023, 1, 1) + timedelta(days=day) for day in range(days)]
+    responses = [json.dumps({"Rows": make_daily_rows(1, date)}) for date in dates]
+    with tempfile.TemporaryDirectory() as root:
+        with ObservationArchive(root) as archive:
+            for date, response in zip(dates, responses):
+                archive.write_day(
+                    1,
+                    date,
+                    ObservationStore.from_rows(1, json.loads(response)["Rows"])[0],
+                )
+
+        def from_json() -> None:
+            for date, response in zip(dates, responses):
+                store, _ = ObservationStore.from_rows(1, json.loads(response)["Rows"])
+                Site(1, date, lazy=True).set_observations(store, copy=False)
+
+        def from_archive() -> None:
+            with ObservationArchive(root) as archive:
+                for date in dates:
+                    archive.load_site(1, date)
+
+        print(f"{days} days")
+        print(f"{'source':<10}{'ms':>10}{'ms/day':>10}")
+        for name, function in (("json", from_json), ("archive", from_archive)):
+            elapsed = _time_ms(function, repeat=3)
+            print(f"{name:<10}{elapsed:>10.1f}{elapsed / days:>10.3f}")
+
+
+def bench_codec(site_days: int) -> None:
+    """
+    Compares the bytes held per site-day as `TrafficObservation` lists, as `ObservationStore` columns, and as
+    `SiteDayFleet` blocks with and without delta and zlib, and times decoding every block into a `Site` and averaging its speed.
+    """
+    days = [
+        (1 + i % 100, datetime(2025, 3, 10) + timedelta(days=i // 100))
+        for i in range(site_days)
+    ]
+    stores = [
+        ObservationStore.from_rows(site_id, make_daily_rows(site_id, date))[0]
+        for site_id, date in days
+    ]
+    print(f"{site_days} site-days")
+    print(f"{'format':<14}{'bytes/day':>12}{'decode ms':>12}")
+    print(f"{'objects':<14}{approximate_size(list(stores[0])):>12.1f}{'':>12}")
+    print(f"{'columns':<14}{stores[0].nbytes:>12.1f}{'':>12}")
+    for name, delta, compress in (
+        ("codec", False, False),
+        ("codec+delta", True, False),
+        ("codec+zlib", True, True),
+    ):
+        fleet = SiteDayFleet(delta=delta, compress=compress)
+        for (site_id, date), store in zip(days, stores):
+            fleet.put(site_id, date, store)
+
+        def decode(fleet: SiteDayFleet = fleet) -> None:
+            for site_id, date in days:
+                fleet.site(site_id, date).get_average_speed()
+
+        elapsed = _time_ms(decode, repeat=3)
+        print(f"{name:<14}{fleet.bytes_per_site_day:>12.1f}{elapsed:>12.1f}")
+
+
+class _CountingTransport(WebTRISTransport):
+    """
+    A transport that counts the response bytes it receives.
+    """
+
+    received = 0
+
+    def get(self, endpoint: str, params: dict):
+        res = super().get(endpoint, params)
+        self.received += len(res.content)
+        return res
+
+
+def bench_trend(days: int) -> None:
+    """
+    Compares summarising `days` days of one site from fifteen minute rows with `DailyReportRangeRequest`
+    against daily totals (`SiteTrend(period="day")`) and monthly totals (`SiteTrend(period="month")`).
+    Times include the stub server building its reports, so bytes and objects are the fairer comparison.
+    """
+    start = datetime(2023, 1, 1)
+    end = start + timedelta(days=days - 1)
+    print(f"{days} days")
+    print(f"{'source':<10}{'KiB':>10}{'objects':>10}{'ms':>10}")
+    with StubWebTRISServer() as server:
+        for name in ("rows", "day", "month"):
+            with _CountingTransport(base_url=server.url) as transport:
+                begin = time.perf_counter()
+                if name == "rows":
+                    items = list(
+                        DailyReportRangeRequest(
+                            1, start, end, page_size=40000, transport=transport
+                        ).send()
+                    )
+                    sum(o.vehicle_count for o in items)
+                else:
+                    items = SiteTrend(1, start, end, period=name, transport=transport)
+                    items.get_vehicle_count()
+                elapsed = (time.perf_counter() - begin) * 1000
+                print(
+                    f"{name:<10}{transport.received / 1024:>10.1f}{len(items):>10}{elapsed:>10.1f}"
+                )
+
+
+def bench_catalog(query_count: int) -> None:
+    """
+    Compares `query_count` nearest-site queries over 20,000 sites using the `SiteCatalog` grid against a numpy scan of every
+    site's projected distance, and builds the catalog once.
+    """
+    rng = random.Random(1)
+    sites = [
+        SiteInfo(
+            i,
+            f"Site {i}",
+            f"M{i % 60}/{i}",
+            rng.uniform(-5.5, 1.7),
+            rng.uniform(50.0, 55.8),
+            "Active",
+        )
+        for i in range(1, 20001)
+    ]
+    points = [
+        (rng.uniform(50.0, 55.8), rng.uniform(-5.5, 1.7)) for _ in range(query_count)
+    ]
+    build = _time_ms(lambda: SiteCatalog.from_sites(sites), repeat=3)
+    catalog = SiteCatalog.from_sites(sites)
+
+    def scan() -> None:
+        for latitude, longitude in points:
+            x, y = catalog._project(latitude, longitude)
+            np.argmin(np.hypot(catalog._x - x, catalog._y - y))
+
+    def grid() -> None:
+        for latitude, longitude in points:
+            catalog.nearest(latitude, longitude)
+
+    print(f"{len(sites)} sites, {query_count} queries, build {build:.1f} ms")
+    print(f"{'method':<10}{'ms':>10}{'us/query':>10}")
+    for name, function in (("scan", scan), ("grid", grid)):
+        elapsed = _time_ms(function, repeat=1)
+        print(f"{name:<10}{elapsed:>10.1f}{elapsed * 1000 / query_count:>10.1f}")
+
+
+# Sites on each RouteSegment of the AE3 Gatwick to Heathrow network
+AE3_SITES = {
+    "M25 J7-12": [138, 144, 479, 544, 547, 598, 699, 752, 778, 885, 1069, 1135, 1221, 1270, 1442,
+                  1479, 1914, 1990, 2005, 2089, 2097, 2149, 2419, 2486, 2530, 2636, 3003, 3323, 3437,
+                  3714, 3835, 3897, 4000, 4092, 4145, 4202, 4223, 4714, 4719, 4761, 4894, 5107, 5118,
+                  5138, 5176, 5261, 5288, 5457, 5526, 5546, 5712, 5842, 5875, 5914, 5990, 6156, 6252],
+    "M25 J12-13": [8, 1811, 1910, 2952, 2992, 3319, 5245, 5662, 5681],
+    "M25 J13-14": [279, 737, 3671, 4053, 4354, 5317],
+    "M25 J14-Heathrow": [746, 2153, 2977],
+    "A30": [9005],
+}  # fmt: skip
+
+
+def bench_planner(days: int) -> None:
+    """
+    Compares fetching every site of the AE3 network for route queries on `days` dates, one `DailyReportRequest` per
+    site-day against a `RequestPlanner` plan, with 20ms of server latency per call. Dates are the same weekday over
+    `days` weeks, so no two are consecutive, and then `days` consecutive days. The plan is run a second time to show
+    that needs already cached are not fetched again.
+    """
+    site_ids = sorted({site_id for ids in AE3_SITES.values() for site_id in ids})
+    start = datetime(2025, 1, 6)
+    print(f"{len(site_ids)} sites, {days} dates")
+    print(f"{'dates':<12}{'mode':<10}{'calls':>8}{'ms':>10}")
+    for name, step in (("weekly", 7), ("consecutive", 1)):
+        needs = [
+            (site_id, start + timedelta(days=i * step))
+            for i in range(days)
+            for site_id in site_ids
+        ]
+        with (
+            StubWebTRISServer(latency=0.02) as server,
+            WebTRISTransport(pool_size=16, base_url=server.url) as transport,
+        ):
+            begin = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=16) as pool:
+                list(
+                    pool.map(
+                        lambda need: DailyReportRequest(
+                            *need, transport=transport, observation_cache=None
+                        ).send(),
+                        needs,
+                    )
+                )
+            elapsed = (time.perf_counter() - begin) * 1000
+            print(f"{name:<12}{'per-day':<10}{server.request_count:>8}{elapsed:>10.1f}")
+            planner = RequestPlanner(
+                transport=transport, observation_cache=ObservationCache()
+            )
+            for mode in ("planned", "cached"):
+                calls = server.request_count
+                begin = time.perf_counter()
+                plan = planner.plan(needs)
+                planner.execute(plan, max_workers=16)
+                elapsed = (time.perf_counter() - begin) * 1000
+                print(
+                    f"{name:<12}{mode:<10}{server.request_count - calls:>8}{elapsed:>10.1f}"
+                )
+
+
+def bench_coalesce(segment_count: int) -> None:
+    """
+    Hydrates `segment_count` overlapping `RouteSegment`s at once, one thread each, as concurrent route queries do.
+    Each segment holds 10 of 30 sites, so most (site, date) pairs are wanted by several threads at the same moment.
+    Compares sending every request against sharing identical requests in flight with a `SingleFlight`,
+    with 50ms of server latency per call.
+    """
+    rng = random.Random(1)
+    site_sets = [rng.sample(range(1, 31), 10) for _ in range(segment_count)]
+    print(
+        f"{segment_count} segments, {len({s for ids in site_sets for s in ids})} sites"
+    )
+    print(f"{'mode':<12}{'calls':>8}{'coalesced':>11}{'ms':>10}")
+    for name, single_flight in (("separate", None), ("coalesced", SingleFlight())):
+        with StubWebTRISServer(latency=0.05) as server:
+            with WebTRISTransport(pool_size=64, base_url=server.url) as transport:
+                segments = [
+                    RouteSegment(f"{i}", ids, DATE, 1, transport, hydrate=False)
+                    for i, ids in enumerate(site_sets)
+                ]
+                previous = get_default_single_flight()
+                set_default_single_flight(single_flight)
+                try:
+                    begin = time.perf_counter()
+                    with ThreadPoolExecutor(max_workers=segment_count) as pool:
+                        list(pool.map(lambda s: hydrate_segments([s], 10), segments))
+                    elapsed = (time.perf_counter() - begin) * 1000
+                finally:
+                    set_default_single_flight(previous)
+            coalesced = single_flight.coalesced if single_flight is not None else 0
+            print(f"{name:<12}{server.request_count:>8}{coalesced:>11}{elapsed:>10.1f}")
+
+
+BENCHMARKS = {
+    "transport": bench_transport,
+    "batch": bench_batch,
+    "async": bench_async,
+    "columns": bench_columns,
+    "parse": bench_parse,
+    "dijkstra": bench_dijkstra,
+    "archive": bench_archive,
+    "codec": bench_codec,
+    "trend": bench_trend,
+    "catalog": bench_catalog,
+    "planner": bench_planner,
+    "coalesce": bench_coalesce,
+}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("benchmark", choices=BENCHMARKS.keys())
+    parser.add_argument("-n", type=int, default=500, help="Size of the workload")
+    args = parser.parse_args()
+    BENCHMARKS[args.benchmark](args.n)
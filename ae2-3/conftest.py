@@ -0,0 +1,16 @@
+import pytest
+
+from webtris_client import WebTRISTransport
+from webtris_stub_server import StubWebTRISServer
+
+
+@pytest.fixture
+def stub_server():
+    with StubWebTRISServer() as server:
+        yield server
+
+
+@pytest.fixture
+def stub_transport(stub_server):
+    with WebTRISTransport(base_url=stub_server.url) as transport:
+        yield transport
@@ -1,22 +1,186 @@
-"""Demonstration on how to use the application"""
+"""Demonstration on how to use the application, interactively or as a batch job"""
 
-from datetime import datetime
-from webtris_client import Site
+import argparse
+import csv
+import json
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import ExitStack
+from datetime import datetime, timedelta
+from typing import TextIO
 
-if __name__ == "__main__":
+from webtris_catalog import SiteCatalog
+from webtris_client import API_URL, FETCH_ERRORS, Site, WebTRISTransport
+from webtris_quality import QualityFilter
+
+FIELDS = [
+    "site_id",
+    "date",
+    "site_name",
+    "average_speed",
+    "vehicle_count",
+    "peak_hour",
+    "peak_hour_vehicle_count",
+]
+
+
+def summarise(
+    site_id: int, date: datetime, transport: WebTRISTransport | None = None
+) -> dict:
+    """
+    Fetches one day of a site and summarises it as one output row.
+
+    Parameters
+    ----------
+    site_id : int
+        The site to summarise
+    date : datetime
+        The day to summarise
+    transport : WebTRISTransport | None
+        The pooled transport to fetch through
+
+    Returns
+    -------
+    dict
+        The summary, keyed by `FIELDS`
+    """
+    site = Site(site_id=site_id, date=date, transport=transport)
+    peak_hour = site.get_peak_hour()
+    return {
+        "site_id": site_id,
+        "date": date.date().isoformat(),
+        "site_name": site.name,
+        "average_speed": site.get_average_speed(),
+        "vehicle_count": site.get_vehicle_count(),
+        "peak_hour": peak_hour,
+        "peak_hour_vehicle_count": site.get_hourly_vehicle_count(peak_hour),
+    }
+
+
+def read_site_ids(path: str) -> list[int]:
+    """
+    Reads site IDs from a file, separated by whitespace or commas. Text after a '#' on a line is ignored.
+
+    Raises
+    ------
+    ValueError
+        If the file holds anything other than integers
+    """
+    site_ids: list[int] = []
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            for token in line.split("#", 1)[0].replace(",", " ").split():
+                site_ids.append(int(token))
+    return site_ids
+
+
+def run_batch(
+    site_ids: list[int],
+    start_date: datetime,
+    end_date: datetime,
+    output: TextIO,
+    output_format: str = "csv",
+    max_workers: int = 8,
+    transport: WebTRISTransport | None = None,
+) -> dict[tuple[int, datetime], Exception]:
+    """
+    Fetches every site on every day in a range concurrently and writes a summary of each to `output`
+    as soon as it completes, so results appear in completion order rather than input order.
+
+    Parameters
+    ----------
+    site_ids : list[int]
+        The sites to summarise
+    start_date : datetime
+        The first day to summarise, inclusive
+    end_date : datetime
+        The last day to summarise, inclusive
+    output : TextIO
+        Where summaries are written. Flushed after every row.
+    output_format : str
+        "csv" for a header row then one row per site-day, or "jsonl" for one JSON object per line
+    max_workers : int
+        The number of site-days fetched at once
+    transport : WebTRISTransport | None
+        The pooled transport to fetch through
+
+    Raises
+    ------
+    ValueError
+        If `output_format` is unknown, `max_workers` is not a positive int, or `end_date` is before `start_date`
+
+    Returns
+    -------
+    dict[tuple[int, datetime], Exception]
+        Errors raised while fetching, keyed by (site_id, date). Those site-days are not written.
+    """
+    if output_format not in ("csv", "jsonl"):
+        raise ValueError(f"Cannot write unknown output format {output_format!r}")
+    if not isinstance(max_workers, int) or max_workers <= 0:
+        raise ValueError("Cannot run batch with non-int/<=0 max_workers")
+    start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    end = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+    if end < start:
+        raise ValueError("Cannot run batch with end_date before start_date")
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+    if output_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        write = writer.writerow
+    else:
+
+        def write(row: dict) -> None:
+            output.write(json.dumps(row) + "\n")
+
+    output.flush()
+    errors: dict[tuple[int, datetime], Exception] = {}
+    tasks = [(site_id, day) for site_id in site_ids for day in days]
+    if not tasks:
+        return errors
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tasks))) as pool:
+        futures = {
+            pool.submit(summarise, site_id, day, transport): (site_id, day)
+            for site_id, day in tasks
+        }
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except FETCH_ERRORS as e:
+                errors[futures[future]] = e
+                continue
+            # Failing to write is not a failed fetch, so it is raised
+            write(row)
+            output.flush()
+    return errors
+
+
+def _parse_date(text: str) -> datetime:
+    try:
+        return datetime.strptime(text, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(
+            f"Invalid date {text!r}. Please enter the date in YYYY-MM-DD format."
+        )
+
+
+def interactive() -> int:
+    """
+    Prompts for one site and one date and prints a summary of it.
+    """
     site_id = input("Enter a site ID: ")
     try:
         site_id = int(site_id)
     except ValueError:
         print("Invalid site ID. Please enter a valid integer.")
-        exit(1)
+        return 1
 
     date = input("Enter a date (YYYY-MM-DD): ")
     try:
         date = datetime.strptime(date, "%Y-%m-%d")
     except ValueError:
         print("Invalid date format. Please enter the date in YYYY-MM-DD format.")
-        exit(1)
+        return 1
 
     # Get the traffic data for the site and date
     site = Site(site_id=site_id, date=date)
@@ -27,14 +191,118 @@ if __name__ == "__main__":
     print(
         f"Peak Hour: {peak_hour} ({site.get_hourly_vehicle_count(peak_hour)} vehicles)"
     )
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    """
+    Runs the interactive prompt when no arguments are given, otherwise a batch job. Returns the exit code.
+    """
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        return interactive()
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("site_ids", nargs="*", type=int, help="Site IDs to fetch")
+    parser.add_argument(
+        "--sites-file", help="A file of site IDs, separated by whitespace or commas"
+    )
+    parser.add_argument(
+        "--start", type=_parse_date, required=True, help="First day, YYYY-MM-DD"
+    )
+    parser.add_argument(
+        "--end", type=_parse_date, help="Last day, YYYY-MM-DD. Defaults to --start."
+    )
+    parser.add_argument("--format", choices=("csv", "jsonl"), default="csv")
+    parser.add_argument(
+        "--workers", type=int, default=8, help="Site-days fetched at once"
+    )
+    parser.add_argument("--output", help="File to write to. Defaults to stdout.")
+    parser.add_argument(
+        "--catalog",
+        help="A site list cache file. Inactive and unknown site IDs are skipped.",
+    )
+    parser.add_argument(
+        "--min-quality",
+        type=int,
+        metavar="PCT",
+        help="Skip sites whose data quality over the range is below this percentage",
+    )
+    parser.add_argument("--base-url", default=API_URL, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    site_ids = list(args.site_ids)
+    if args.sites_file is not None:
+        try:
+            site_ids += read_site_ids(args.sites_file)
+        except (OSError, ValueError) as e:
+            parser.error(f"Cannot read site IDs from {args.sites_file}: {e}")
+    if not site_ids:
+        parser.error("No site IDs given")
+    if args.workers <= 0:
+        parser.error("--workers must be positive")
+    end = args.end if args.end is not None else args.start
+    if end < args.start:
+        parser.error("--end is before --start")
+    if args.min_quality is not None and not 0 <= args.min_quality <= 100:
+        parser.error("--min-quality must be between 0 and 100")
+
+    with ExitStack() as stack:
+        output = (
+            stack.enter_context(open(args.output, "w", encoding="utf-8", newline=""))
+            if args.output is not None
+            else sys.stdout
+        )
+        with WebTRISTransport(
+            pool_size=args.workers, base_url=args.base_url
+        ) as transport:
+            if args.catalog is not None:
+                catalog = SiteCatalog(args.catalog, transport=transport)
+                active = catalog.active_ids(site_ids)
+                for site_id in sorted(set(site_ids) - set(active)):
+                    print(
+                        f"Skipping inactive or unknown site {site_id}", file=sys.stderr
+                    )
+                site_ids = active
+            if args.min_quality is not None:
+                quality = QualityFilter(
+                    args.min_quality, transport=transport, max_workers=args.workers
+                )
+                skipped = quality.skipped(site_ids, args.start, end)
+                for site_id, error in sorted(skipped.items()):
+                    print(error, file=sys.stderr)
+                site_ids = [site_id for site_id in site_ids if site_id not in skipped]
+            errors = run_batch(
+                site_ids,
+                args.start,
+                end,
+                output,
+                output_format=args.format,
+                max_workers=args.workers,
+                transport=transport,
+            )
+    for (site_id, day), error in sorted(errors.items()):
+        print(f"Site {site_id} on {day.date()}: {error}", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
 
     """
     Example usage:
     Enter a site ID: 14
     Enter a date (YYYY-MM-DD): 2025-03-10
-    
+
     Site Name: A2/8392M
     Average Speed: 42.467943045611776 mph
     Vehicle Count: 12431
     Peak Hour: 8 (1094 vehicles)
+
+    Batch usage:
+    python main.py 14 15 --start 2025-03-10 --end 2025-03-16 --format jsonl
+    python main.py --sites-file m25.txt --start 2025-03-01 --end 2025-03-31 --output march.csv
+    python main.py --sites-file m25.txt --start 2025-03-10 --catalog sites.json
+    python main.py --sites-file m25.txt --start 2025-03-01 --end 2025-03-31 --min-quality 80
     """
@@ -0,0 +1,131 @@
+import csv
+import io
+import json
+from datetime import datetime
+
+import pytest
+
+from main import main, read_site_ids, run_batch
+
+
+class TestBatch:
+    def test_jsonl(self, stub_transport):
+        output = io.StringIO()
+        errors = run_batch(
+            [1, 2],
+            datetime(2025, 3, 10),
+            datetime(2025, 3, 12),
+            output,
+            output_format="jsonl",
+            transport=stub_transport,
+        )
+        assert errors == {}
+        rows = [json.loads(line) for line in output.getvalue().splitlines()]
+        assert len(rows) == 6
+        assert {(row["site_id"], row["date"]) for row in rows} == {
+            (site_id, f"2025-03-{day}") for site_id in (1, 2) for day in (10, 11, 12)
+        }
+        assert all(row["site_name"] == f"STUB/{row['site_id']}" for row in rows)
+
+    def test_errors_are_reported(self, stub_server, stub_transport):
+        stub_server.failing_sites.add(2)
+        output = io.StringIO()
+        errors = run_batch(
+            [1, 2],
+            datetime(2025, 3, 10),
+            datetime(2025, 3, 10),
+            output,
+            transport=stub_transport,
+        )
+        assert list(errors) == [(2, datetime(2025, 3, 10))]
+        rows = list(csv.DictReader(io.StringIO(output.getvalue())))
+        assert [row["site_id"] for row in rows] == ["1"]
+        with pytest.raises(ValueError):
+            run_batch([1], datetime(2025, 3, 10), datetime(2025, 3, 9), output)
+
+    def test_write_errors_are_raised(self, stub_transport):
+        class FullDisk(io.StringIO):
+            def write(self, text):
+                raise OSError("No space left on device")
+
+        # Only fetch errors are collected, a failing output stops the batch
+        with pytest.raises(OSError):
+            run_batch(
+                [1],
+                datetime(2025, 3, 10),
+                datetime(2025, 3, 10),
+                FullDisk(),
+                output_format="jsonl",
+                transport=stub_transport,
+            )
+
+    def test_cli(self, stub_server, tmp_path):
+        sites = tmp_path / "sites.txt"
+        sites.write_text("1, 2  # M25\n3\n")
+        assert read_site_ids(str(sites)) == [1, 2, 3]
+        path = tmp_path / "out.csv"
+        code = main(
+            [
+                "--sites-file",
+                str(sites),
+                "--start",
+                "2025-03-10",
+                "--output",
+                str(path),
+                "--base-url",
+                stub_server.url,
+            ]
+        )
+        assert code == 0
+        with open(path, newline="") as file:
+            assert len(list(csv.DictReader(file))) == 3
+        with pytest.raises(SystemExit):
+            main(["1", "--start", "10/03/2025"])
+
+    def test_catalog_skips_inactive(self, stub_server, tmp_path, capsys):
+        stub_server.inactive_sites.add(2)
+        code = main(
+            [
+                "1",
+                "2",
+                "--start",
+                "2025-03-10",
+                "--format",
+                "jsonl",
+                "--catalog",
+                str(tmp_path / "sites.json"),
+                "--base-url",
+                stub_server.url,
+            ]
+        )
+        assert code == 0
+        captured = capsys.readouterr()
+        assert [json.loads(line)["site_id"] for line in captured.out.splitlines()] == [
+            1
+        ]
+        assert "site 2" in captured.err
+
+    def test_min_quality_skips_sites(self, stub_server, capsys):
+        stub_server.site_quality[2] = 10
+        code = main(
+            [
+                "1",
+                "2",
+                "--start",
+                "2025-03-10",
+                "--end",
+                "2025-03-11",
+                "--format",
+                "jsonl",
+                "--min-quality",
+                "50",
+                "--base-url",
+                stub_server.url,
+            ]
+        )
+        assert code == 0
+        captured = capsys.readouterr()
+        assert {json.loads(line)["site_id"] for line in captured.out.splitlines()} == {
+            1
+        }
+        assert "Site 2 skipped" in captured.err
@@ -9,9 +9,29 @@ from unittest.mock import patch, Mock
 from webtris_client import (
     Site,
     ReportRequest,
+    ReportSummary,
+    AnnualReportRequest,
+    DailySummary,
+    MonthlyReportRequest,
+    MonthlySummary,
+    SiteTrend,
     DailyReportRequest,
+    DailyReportRangeRequest,
+    MultiSiteDailyReportRequest,
+    ObservationStore,
+    SiteInfo,
+    SitesRequest,
     TrafficObservation,
+    WebTRISTransport,
+    get_default_cache,
+    get_default_transport,
+    load_pending_sites,
+    set_default_cache,
+    set_default_observation_cache,
+    set_default_transport,
 )
+from webtris_cache import ObservationCache, ReportCache
+from webtris_stub_server import StubWebTRISServer
 
 
 @pytest.fixture
@@ -108,6 +128,77 @@ def mock_sites_invalid_json_responses():
     return response
 
 
+class TestWebTRISTransport:
+    def test_invalid_pool_size(self):
+        with pytest.raises(ValueError):
+            WebTRISTransport(pool_size=0)
+
+    def test_default_transport_shared(self):
+        assert get_default_transport() is get_default_transport()
+        assert DailyReportRequest(1, datetime(2025, 3, 10)).transport is (
+            get_default_transport()
+        )
+        with pytest.raises(TypeError):
+            set_default_transport("not a transport")
+
+    def test_injected_transport(self, mock_daily_report_response):
+        transport = Mock(spec=WebTRISTransport)
+        transport.get.return_value = mock_daily_report_response
+        rr = DailyReportRequest(1, datetime(2025, 3, 10), transport=transport)
+        assert len(rr.send()) == 2
+        (endpoint,) = transport.get.call_args.args
+        assert endpoint == "/reports/daily"
+        assert transport.get.call_args.kwargs["params"]["sites"] == 1
+
+    def test_site_uses_transport(self, mock_daily_report_response):
+        transport = Mock(spec=WebTRISTransport)
+        transport.get.return_value = mock_daily_report_response
+        site = Site(1, datetime(2025, 3, 10), transport=transport)
+        assert len(site) == 2
+        assert transport.get.call_count == 1
+
+    def test_connections_reused(self):
+        with StubWebTRISServer() as server:
+            with WebTRISTransport(base_url=server.url, pool_size=2) as transport:
+                for site_id in range(1, 6):
+                    rr = DailyReportRequest(
+                        site_id, datetime(2025, 3, 10), transport=transport
+                    )
+                    assert len(rr.send()) == 96
+            assert server.request_count == 5
+            assert server.connection_count == 1
+
+
+class TestSitesRequest:
+    @patch("requests.Session.send")
+    def test_success(self, mock_send, mock_sites_success_response):
+        mock_send.return_value = mock_sites_success_response
+        sites = SitesRequest([10, 20, 30]).send()
+        assert [s.site_id for s in sites] == [10, 20, 30]
+        assert sites[0].name == "Site 1"
+        assert sites[0].description == "A site"
+        assert sites[0].longitude == 1.0
+        assert sites[0].active
+        assert not sites[1].active
+        assert mock_send.call_args.args[0].url.endswith("/sites/10,20,30")
+
+    @patch("requests.Session.send")
+    def test_invalid_json(self, mock_send, mock_sites_invalid_json_responses):
+        mock_send.return_value = mock_sites_invalid_json_responses
+        sites = SitesRequest().send()
+        assert len(sites) == 1
+        assert sites[0].site_id == 10
+        assert mock_send.call_args.args[0].url.endswith("/sites")
+
+    def test_site_info_validation(self):
+        with pytest.raises(ValueError):
+            SiteInfo(0, "Site", "M25/1", 1.0, 51.0, "Active")
+        with pytest.raises(ValueError):
+            SiteInfo(1, "Site", "M25/1", 200.0, 51.0, "Active")
+        with pytest.raises(ValueError):
+            SiteInfo(1, "Site", "", 1.0, 51.0, "Active")
+
+
 class TestReportRequest:
     def test_endpoint_assert(self):
         assert ReportRequest.ENDPOINT == "/reports"
@@ -403,6 +494,29 @@ class TestFifteenMinuteObservation:
         observation._observation_end_datetime = datetime(2025, 3, 10, 1, 15, 0)
         assert observation.end_time_minutes_in_day == 75
 
+    def test_compact_storage(self, mock_fifteen_minute_observation_data):
+        first = TrafficObservation.from_dict(1, mock_fifteen_minute_observation_data)
+        mock_fifteen_minute_observation_data["Time Period Ending"] = "23:59:00"
+        second = TrafficObservation.from_dict(1, mock_fifteen_minute_observation_data)
+        assert not hasattr(first, "__dict__")
+        # Observations on the same day share one date object
+        assert first.date is second.date
+        assert first < second
+        assert second.end_datetime == datetime(2025, 3, 10, 23, 59)
+        assert second.end_time_minutes_in_day == 1439
+
+    def test_interned_days_bounded(self):
+        days = [datetime(1990, 1, day) for day in (1, 2, 3)]
+        with (
+            patch("webtris_client._INTERNED_DAYS", {}) as interned,
+            patch("webtris_client._MAX_INTERNED_DAYS", 2),
+        ):
+            for day in days:
+                assert TrafficObservation._intern_day(day) is day
+            # The earliest day is forgotten, and the rest stay shared
+            assert list(interned) == days[1:]
+            assert TrafficObservation._intern_day(datetime(1990, 1, 3)) is days[2]
+
 
 class TestDailyReportRequest:
     def test_endpoint_assert(self):
@@ -447,10 +561,313 @@ class TestDailyReportRequest:
         assert response[0].end_time_minutes_in_day == 14
         assert response[0].average_speed == 66
         assert response[0].vehicle_count == 172
+        assert rr.dropped_rows == 2
+
+
+class TestDailyReportRangeRequest:
+    def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            DailyReportRangeRequest(1, datetime(2025, 3, 10), datetime(2025, 3, 9))
+        with pytest.raises(ValueError):
+            DailyReportRangeRequest(
+                1, datetime(2025, 3, 10), datetime(2025, 3, 10), page_size=0
+            )
+        with pytest.raises(TypeError, match="end_date"):
+            DailyReportRangeRequest(1, datetime(2025, 3, 10), "11032025")
+
+    def test_follows_pages(self):
+        with StubWebTRISServer() as server:
+            with WebTRISTransport(base_url=server.url) as transport:
+                rr = DailyReportRangeRequest(
+                    1,
+                    datetime(2025, 3, 1),
+                    datetime(2025, 3, 10, 15, 0),
+                    page_size=100,
+                    transport=transport,
+                )
+                observations = list(rr.send())
+            assert server.request_count == 10
+        assert len(observations) == 960
+        assert observations[0].end_datetime == datetime(2025, 3, 1, 0, 14)
+        assert observations[-1].end_datetime == datetime(2025, 3, 10, 23, 59)
+
+    def test_pages_fetched_lazily(self):
+        with (
+            StubWebTRISServer() as server,
+            WebTRISTransport(base_url=server.url) as transport,
+        ):
+            rr = DailyReportRangeRequest(
+                1,
+                datetime(2025, 3, 1),
+                datetime(2025, 3, 31),
+                page_size=96,
+                transport=transport,
+            )
+            pages = rr.iter_pages()
+            assert len(next(pages)) == 96
+            assert server.request_count == 1
+            assert next(pages)[0].date == datetime(2025, 3, 2)
+            assert server.request_count == 2
+
+    @patch("requests.Session.send")
+    def test_single_page(self, mock_send, mock_daily_report_response):
+        mock_send.return_value = mock_daily_report_response
+        rr = DailyReportRangeRequest(1, datetime(2025, 3, 10), datetime(2025, 3, 10))
+        assert len(list(rr.send())) == 2
+        assert mock_send.call_count == 1
+
+    @patch("requests.Session.send")
+    def test_no_content(self, mock_send):
+        mock_send.return_value = Mock(status_code=204)
+        rr = DailyReportRangeRequest(1, datetime(2025, 3, 10), datetime(2025, 3, 12))
+        assert list(rr.send()) == []
+
+
+class TestMultiSiteDailyReportRequest:
+    def test_batches_sites(self):
+        site_ids = list(range(1, 61))
+        with StubWebTRISServer() as server:
+            with WebTRISTransport(base_url=server.url) as transport:
+                rr = MultiSiteDailyReportRequest(
+                    site_ids, datetime(2025, 3, 10), transport=transport
+                )
+                results = rr.send()
+            # One call to map names to ids and one call for every site's rows
+            assert server.request_count == 2
+        assert sorted(results) == site_ids
+        for site_id, observations in results.items():
+            assert len(observations) == 96
+            assert all(o.site_id == site_id for o in observations)
+            assert observations[0].site_name == f"STUB/{site_id}"
+
+    def test_given_names_and_chunks(self):
+        with StubWebTRISServer() as server:
+            with WebTRISTransport(base_url=server.url) as transport:
+                rr = MultiSiteDailyReportRequest(
+                    [1, 2, 3],
+                    datetime(2025, 3, 10),
+                    site_names={1: "STUB/1", 2: "STUB/2", 3: "not reported"},
+                    page_size=100,
+                    max_sites_per_call=2,
+                    transport=transport,
+                )
+                results = rr.send()
+            # Sites 1 and 2 take two pages of 100 rows, site 3 fits in one page
+            assert server.request_count == 3
+        assert len(results[1]) == 96
+        assert len(results[2]) == 96
+        # Rows reported under a name that does not map to a site are excluded
+        assert results[3] == []
+
+    def test_fill_sites(self):
+        with (
+            StubWebTRISServer() as server,
+            WebTRISTransport(base_url=server.url) as transport,
+        ):
+            sites = [
+                Site(site_id, datetime(2025, 3, 10), observations=[])
+                for site_id in (4, 5)
+            ]
+            rr = MultiSiteDailyReportRequest(
+                [4, 5], datetime(2025, 3, 10), transport=transport
+            )
+            rr.fill_sites(sites)
+            with pytest.raises(ValueError):
+                rr.fill_sites([Site(6, datetime(2025, 3, 10), observations=[])])
+        assert len(sites[0]) == 96
+        assert sites[1].name == "STUB/5"
+
+    def test_invalid_arguments(self):
+        with pytest.raises(TypeError):
+            MultiSiteDailyReportRequest(["1"], datetime(2025, 3, 10))
+        with pytest.raises(ValueError):
+            MultiSiteDailyReportRequest([1], datetime(2025, 3, 10), page_size=0)
+
+
+@pytest.fixture
+def observation_list():
+    return [
+        TrafficObservation(
+            site_name="M25/4876A",
+            site_id=1,
+            end_time=datetime(2025, 3, 10, hour, minute),
+            average_speed=60.0 + hour,
+            vehicle_count=100 + minute,
+        )
+        for hour in (2, 0, 1)
+        for minute in (14, 29)
+    ]
+
+
+class TestSummaryReports:
+    def test_summary_validation(self):
+        row = {
+            "Site Name": "M25/4876A",
+            "Report Date": "2025-03-10T00:00:00",
+            "Avg mph": "61.5",
+            "Total Volume": "15437",
+        }
+        day = DailySummary.from_dict(1, row)
+        assert day.period_start == datetime(2025, 3, 10)
+        assert day.period_end == datetime(2025, 3, 11)
+        month = MonthlySummary.from_dict(1, row)
+        assert month.period_start == datetime(2025, 3, 1)
+        assert month.period_end == datetime(2025, 4, 1)
+        assert MonthlySummary.from_dict(
+            1, {**row, "Report Date": "2025-12-01T00:00:00"}
+        ).period_end == datetime(2026, 1, 1)
+        assert day != month
+        with pytest.raises(ValueError):
+            DailySummary.from_dict(1, {**row, "Avg mph": ""})
+        with pytest.raises(ValueError):
+            DailySummary("M25/4876A", 1, datetime(2025, 3, 10), 61.5, -1)
+        with pytest.raises(TypeError):
+            DailySummary("M25/4876A", 1, "2025-03-10", 61.5, 15437)
+        with pytest.raises(TypeError):
+            ReportSummary("M25/4876A", 1, datetime(2025, 3, 10), 61.5, 15437)
+
+    def test_invalid_range(self):
+        with pytest.raises(ValueError):
+            MonthlyReportRequest(1, datetime(2025, 3, 10), datetime(2025, 2, 28))
+        with pytest.raises(ValueError):
+            AnnualReportRequest(1, 2025, 2024)
+        with pytest.raises(ValueError):
+            AnnualReportRequest(1, "2024", 2025)
+        # Ranges are whole months
+        request = MonthlyReportRequest(1, datetime(2025, 3, 10), datetime(2025, 3, 20))
+        assert request.start_month == request.end_month == datetime(2025, 3, 1)
+
+    def test_monthly_and_annual(self):
+        with (
+            StubWebTRISServer() as server,
+            WebTRISTransport(base_url=server.url) as transport,
+        ):
+            days = MonthlyReportRequest(
+                7, datetime(2025, 1, 15), datetime(2025, 2, 1), transport=transport
+            ).send()
+            months = AnnualReportRequest(
+                7, 2025, 2025, page_size=5, transport=transport
+            ).send()
+            observations = list(
+                DailyReportRangeRequest(
+                    7,
+                    datetime(2025, 2, 1),
+                    datetime(2025, 2, 28),
+                    transport=transport,
+                ).send()
+            )
+        assert len(days) == 31 + 28
+        assert all(isinstance(day, DailySummary) for day in days)
+        assert days[0].period_start == datetime(2025, 1, 1)
+        assert len(months) == 12
+        assert months[1].period_start == datetime(2025, 2, 1)
+        # One monthly row holds the totals of every fifteen minute observation in the month
+        assert months[1].vehicle_count == sum(o.vehicle_count for o in observations)
+        assert sum(day.vehicle_count for day in days[31:]) == months[1].vehicle_count
+        weighted = sum(o.average_speed * o.vehicle_count for o in observations)
+        assert months[1].average_speed == pytest.approx(
+            weighted / months[1].vehicle_count, abs=0.01
+        )
+
+    def test_site_trend(self):
+        with (
+            StubWebTRISServer() as server,
+            WebTRISTransport(base_url=server.url) as transport,
+        ):
+            trend = SiteTrend(
+                7, datetime(2024, 11, 20), datetime(2025, 2, 3), transport=transport
+            )
+            daily = SiteTrend(
+                7,
+                datetime(2025, 2, 1),
+                datetime(2025, 2, 3),
+                period="day",
+                transport=transport,
+            )
+        assert [s.period_start.month for s in trend] == [11, 12, 1, 2]
+        assert trend.name == "STUB/7"
+        assert len(daily) == 3
+        assert daily.get_vehicle_count() == sum(s.vehicle_count for s in daily)
+        assert trend.get_peak_period() in (trend[1], trend[2])
+        assert trend.get_summary_at(datetime(2025, 1, 31, 23, 59)) is trend[2]
+        assert daily.get_summary_at(datetime(2025, 2, 4)) is None
+        assert 40 <= trend.get_average_speed() <= 70
+        with pytest.raises(TypeError):
+            trend.summaries[0] = trend[1]
+        with pytest.raises(ValueError):
+            SiteTrend(7, datetime(2025, 1, 1), datetime(2025, 2, 1), period="week")
+
+
+class TestObservationStore:
+    def test_from_observations(self, observation_list):
+        store = ObservationStore.from_observations(observation_list)
+        assert len(store) == 6
+        assert store.site_id == 1
+        assert store.site_name == "M25/4876A"
+        assert store.nbytes == 6 * 18
+        assert list(store.minute) == [134, 149, 14, 29, 74, 89]
+        assert store[0].end_datetime == datetime(2025, 3, 10, 2, 14)
+        assert store[-1].average_speed == 61.0
+        assert store[-1].vehicle_count == 129
+        assert [o.end_time_minutes_in_day for o in store[1:3]] == [149, 14]
+        with pytest.raises(IndexError):
+            store[6]
+        with pytest.raises(IndexError):
+            store[-7]
+
+    def test_other_site_rejected(self, observation_list):
+        with pytest.raises(ValueError):
+            ObservationStore.from_observations(observation_list, site_id=2)
+        store = ObservationStore.from_observations([], site_id=2)
+        assert store.site_name is None
+        with pytest.raises(ValueError):
+            store.append(observation_list[0])
+
+    def test_sort_and_mutate(self, observation_list):
+        store = ObservationStore.from_observations(observation_list)
+        version = store.version
+        store.sort()
+        assert list(store.minute) == [14, 29, 74, 89, 134, 149]
+        assert store.version > version
+        store[0] = observation_list[0]
+        assert store[0].end_time_minutes_in_day == 134
+        store.append(observation_list[2])
+        assert len(store) == 7
+        copy = store.copy()
+        copy.sort()
+        assert store[0].end_time_minutes_in_day == 134
+        assert copy[0].end_time_minutes_in_day == 14
+
+    def test_from_rows(self):
+        rows = [
+            {
+                "Site Name": "M25/4876A",
+                "Report Date": "2025-03-10T00:00:00",
+                "Time Period Ending": f"00:{minute}:00",
+                "Avg mph": speed,
+                "Total Volume": volume,
+            }
+            for minute, speed, volume in [
+                (29, "65", "136"),
+                (14, "66", "172"),
+                (44, "", "150"),
+                (59, "64", "not an int"),
+                (74, "-1", "100"),
+            ]
+        ]
+        rows.append({"Site Name": "M25/4876A", "Report Date": "not a date"})
+        store, dropped = ObservationStore.from_rows(1, rows)
+        assert dropped == 4
+        assert store.site_name == "M25/4876A"
+        assert list(store.minute) == [14, 29]
+        assert list(store.volume) == [172, 136]
+        assert store[0] == TrafficObservation.from_dict(1, rows[1])
+        store, dropped = ObservationStore.from_rows(1, [])
+        assert (len(store), dropped) == (0, 0)
 
 
 @pytest.fixture
-@patch("webtris_client.DailyReportRequest.send")
+@patch("webtris_client.DailyReportRequest._send_store")
 def normal_site(report_request_send_mock):
     report_request_send_mock.return_value = [
         TrafficObservation(
@@ -492,7 +909,7 @@ def normal_site(report_request_send_mock):
     return Site(1, datetime(2025, 3, 10))
 
 
-@patch("webtris_client.DailyReportRequest.send")
+@patch("webtris_client.DailyReportRequest._send_store")
 class TestSite:
     def test_get_set_attributes(self, mock_report_request_send, normal_site):
         mock_report_request_send.return_value = normal_site.get_observations_list()
@@ -604,6 +1021,55 @@ class TestSite:
         assert len(records_for_hour) == 1
         assert records_for_hour[0].end_datetime.hour == 1
 
+    def test_get_hourly_profile(self, mock_report_request_send, normal_site):
+        mock_report_request_send.return_value = normal_site.get_observations_list()
+        profile = normal_site.get_hourly_profile()
+        assert list(profile.record_count[:3]) == [4, 1, 0]
+        assert list(profile.vehicle_count[:3]) == [558, 100, 0]
+        assert profile.average_speed[0] == normal_site.get_hourly_average_speed(0)
+        assert profile.average_speed[1] == 60.0
+        assert profile.average_speed[2] == 0.0
+        assert profile.peak_hour == 0
+        with pytest.raises(ValueError):
+            profile.vehicle_count[0] = 1
+        # The index is rebuilt once the observations change
+        normal_site._observations.append(
+            TrafficObservation(
+                site_name="M25/4876A",
+                site_id=1,
+                end_time=datetime(2025, 3, 10, 2, 14, 0),
+                average_speed=50.0,
+                vehicle_count=1000,
+            )
+        )
+        assert normal_site.get_hourly_profile() is not profile
+        assert normal_site.get_hourly_vehicle_count(2) == 1000
+        assert normal_site.get_hourly_profile().peak_hour == 2
+        assert normal_site.get_records_for_hour(2)[0].vehicle_count == 1000
+
+    def test_get_observation_at(self, mock_report_request_send, normal_site):
+        mock_report_request_send.return_value = normal_site.get_observations_list()
+        observation = normal_site.get_observation_at(datetime(2025, 3, 10, 0, 20, 30))
+        assert observation.end_time_minutes_in_day == 29
+        # An observation ending exactly at the time no longer covers it
+        observation = normal_site.get_observation_at(datetime(2025, 3, 10, 0, 29))
+        assert observation.end_time_minutes_in_day == 44
+        assert (
+            normal_site.get_observation_at(datetime(2025, 3, 9, 23)) == normal_site[0]
+        )
+        assert normal_site.get_observation_at(datetime(2025, 3, 10, 1, 14)) is None
+
+    def test_get_speed_at(self, mock_report_request_send, normal_site):
+        mock_report_request_send.return_value = normal_site.get_observations_list()
+        assert normal_site.get_speed_at(datetime(2025, 3, 10, 0, 5)) == 66.2
+        assert normal_site.get_speed_at(datetime(2025, 3, 10, 0, 20)) == 65.0
+        # Halfway between the observations ending at 00:59 (64.0 mph) and 01:14 (60.0 mph)
+        speed = normal_site.get_speed_at(
+            datetime(2025, 3, 10, 1, 6, 30), interpolate=True
+        )
+        assert speed == pytest.approx(62.0)
+        assert normal_site.get_speed_at(datetime(2025, 3, 10, 2), True) is None
+
     def test_get_records_for_hour_with_no_observations(self, mock_report_request_send):
         mock_report_request_send.return_value = []
         site = Site(1, datetime(2025, 3, 10))
@@ -657,3 +1123,174 @@ class TestSite:
             if previous_datetime is not None:
                 assert observation.end_datetime >= previous_datetime
             previous_datetime = observation.end_datetime
+
+    def test_lazy(self, mock_report_request_send, normal_site):
+        mock_report_request_send.return_value = normal_site.get_observations_list()
+        mock_report_request_send.reset_mock()
+        site = Site(1, datetime(2025, 3, 10), lazy=True)
+        assert site.pending
+        assert "pending" in repr(site)
+        assert mock_report_request_send.call_count == 0
+        assert site.name == "M25/4876A"
+        assert not site.pending
+        assert len(site) == 5
+        assert mock_report_request_send.call_count == 1
+        # Changing the date of a lazy site waits until it is used again
+        site.date = datetime(2025, 3, 11)
+        assert site.pending
+        assert mock_report_request_send.call_count == 1
+
+    def test_date_memo(self, mock_report_request_send, normal_site):
+        mock_report_request_send.return_value = normal_site.get_observations_list()
+        mock_report_request_send.reset_mock()
+        site = Site(1, datetime(2025, 3, 10), max_dates=2)
+        for day in (11, 10, 11, 10):
+            site.date = datetime(2025, 3, day, 9)
+        # Only the first visit to 2025-03-11 calls the API
+        assert mock_report_request_send.call_count == 2
+        assert site.memo_dates == [datetime(2025, 3, 11).date()]
+        assert len(site) == 5
+        for day in (12, 13):
+            site.date = datetime(2025, 3, day)
+        assert site.evicted_dates == [datetime(2025, 3, 11).date()]
+        assert site.memo_dates == [
+            datetime(2025, 3, 10).date(),
+            datetime(2025, 3, 12).date(),
+        ]
+        site.date = datetime(2025, 3, 11)
+        assert mock_report_request_send.call_count == 5
+        with pytest.raises(ValueError):
+            Site(1, datetime(2025, 3, 10), max_dates=-1)
+
+    def test_observations_view(self, mock_report_request_send, normal_site):
+        view = normal_site.observations_view
+        assert len(view) == 5
+        assert view[0] == normal_site[0]
+        assert [o.end_time_minutes_in_day for o in view[1:3]] == [29, 44]
+        assert next(reversed(view)) == normal_site[4]
+        assert view.index(normal_site[2]) == 2
+        with pytest.raises(TypeError):
+            view[0] = normal_site[1]
+        # The view follows the site instead of copying it
+        normal_site.set_observations(normal_site.get_observations_list()[:2])
+        assert len(view) == 2
+
+    def test_default_date_is_now(self, mock_report_request_send):
+        mock_report_request_send.return_value = []
+        before = datetime.now()
+        site = Site(1, lazy=True)
+        assert before <= site.date <= datetime.now()
+
+
+class TestSiteRefresh:
+    def test_only_new_rows_fetched(self):
+        with StubWebTRISServer() as server:
+            server.intervals_available = 40
+            with WebTRISTransport(base_url=server.url) as transport:
+                site = Site(1, datetime(2025, 3, 10), transport)
+                assert len(site) == 40
+                assert not site.refresh()
+                server.intervals_available = 90
+                start_requests = server.request_count
+                assert site.refresh()
+                # The whole day is one page, however many rows are held
+                assert server.request_count - start_requests == 1
+                assert len(site) == 90
+                assert [o.end_time_minutes_in_day for o in site[38:42]] == [
+                    584,
+                    599,
+                    614,
+                    629,
+                ]
+                assert site.get_hourly_vehicle_count(22) > 0
+                server.intervals_available = 96
+                assert site.refresh()
+                assert len(site) == 96
+                assert not site.refresh()
+
+    def test_caches_updated(self):
+        cache = ReportCache()
+        observation_cache = ObservationCache()
+        set_default_cache(cache)
+        set_default_observation_cache(observation_cache)
+        try:
+            with StubWebTRISServer() as server:
+                server.intervals_available = 40
+                with WebTRISTransport(base_url=server.url) as transport:
+                    site = Site(1, datetime(2025, 3, 10), transport)
+                    server.intervals_available = 90
+                    assert site.refresh()
+                    start_requests = server.request_count
+                    # Later requests for the day see the refreshed rows without calling the API
+                    fresh = Site(1, datetime(2025, 3, 10), transport)
+                    assert server.request_count == start_requests
+        finally:
+            set_default_cache(None)
+            set_default_observation_cache(None)
+        assert len(fresh) == 90
+        assert len(cache.get(1, datetime(2025, 3, 10))) == 90
+        assert len(observation_cache.get(1, datetime(2025, 3, 10))) == 90
+
+    def test_site_caches_updated(self):
+        cache = ReportCache()
+        observation_cache = ObservationCache()
+        with StubWebTRISServer() as server:
+            server.intervals_available = 40
+            with WebTRISTransport(base_url=server.url) as transport:
+                site = Site(
+                    1,
+                    datetime(2025, 3, 10),
+                    transport,
+                    cache=cache,
+                    observation_cache=observation_cache,
+                )
+                server.intervals_available = 90
+                assert site.refresh()
+        assert get_default_cache() is None
+        assert len(cache.get(1, datetime(2025, 3, 10))) == 90
+        assert len(observation_cache.get(1, datetime(2025, 3, 10))) == 90
+
+    def test_pending_site(self):
+        with (
+            StubWebTRISServer() as server,
+            WebTRISTransport(base_url=server.url) as transport,
+        ):
+            site = Site(1, datetime(2025, 3, 10), transport, lazy=True)
+            assert site.refresh()
+            assert len(site) == 96
+            assert server.request_count == 1
+
+
+class TestLoadPendingSites:
+    def test_concurrent(self):
+        with StubWebTRISServer(latency=0.01) as server:
+            server.failing_sites.add(3)
+            with WebTRISTransport(base_url=server.url) as transport:
+                sites = [
+                    Site(site_id, datetime(2025, 3, 10), transport, lazy=True)
+                    for site_id in (1, 2, 3, 2)
+                ]
+                loaded = Site(4, datetime(2025, 3, 10), transport, observations=[])
+                errors = load_pending_sites(sites + [loaded], max_workers=4)
+            # Site 2 is only fetched once and the loaded site is skipped
+            assert server.request_count == 3
+            assert server.peak_in_flight > 1
+        assert list(errors) == [3]
+        assert sites[2].pending
+        assert [len(site) for site in (sites[0], sites[1], sites[3])] == [96] * 3
+
+    def test_batched(self):
+        with StubWebTRISServer() as server:
+            with WebTRISTransport(base_url=server.url) as transport:
+                sites = [
+                    Site(site_id, datetime(2025, 3, 10), transport, lazy=True)
+                    for site_id in range(1, 6)
+                ]
+                errors = load_pending_sites(sites, batched=True)
+            # One call to /sites to map names and one call for the reports
+            assert server.request_count == 2
+        assert errors == {}
+        assert not any(site.pending for site in sites)
+        assert sites[4].name == "STUB/5"
+        with pytest.raises(ValueError):
+            load_pending_sites(sites, max_workers=0)
@@ -0,0 +1,93 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from webtris_archive import RECORD_DTYPE, ObservationArchive
+from webtris_client import DailyReportRequest
+
+
+class TestObservationArchive:
+    def test_write_and_read(self, tmp_path, stub_transport):
+        transport = stub_transport
+        observations = DailyReportRequest(
+            7, datetime(2024, 2, 29), transport=transport
+        ).send()
+        archive = ObservationArchive(str(tmp_path))
+        assert archive.write_day(7, datetime(2024, 2, 29), observations) == 96
+        assert archive.has_day(7, datetime(2024, 2, 29, 12))
+        assert not archive.has_day(7, datetime(2024, 3, 1))
+        assert archive.read_day(8, datetime(2024, 2, 29)) is None
+        # Each site and year is one fixed-width file of 366 days by 96 slots
+        assert (tmp_path / "7" / "2024.bin").stat().st_size == 366 * 96 * 14
+        assert RECORD_DTYPE.itemsize == 14
+        archive.close()
+        store = ObservationArchive(str(tmp_path)).read_day(7, datetime(2024, 2, 29))
+        assert store.site_name == "STUB/7"
+        assert list(store) == observations
+
+    def test_load_site_without_copying(self, tmp_path, stub_transport):
+        transport = stub_transport
+        archive = ObservationArchive(str(tmp_path))
+        observations = DailyReportRequest(
+            7, datetime(2025, 3, 10), transport=transport
+        ).send()
+        archive.write_day(7, datetime(2025, 3, 10), observations)
+        site = archive.load_site(7, datetime(2025, 3, 10, 8, 30))
+        assert site.name == "STUB/7"
+        assert site.get_observations_list() == observations
+        assert np.shares_memory(site._observations.speed, archive._open(7, 2025, False))
+        with pytest.raises(ValueError):
+            site._observations[0] = observations[1]
+        assert archive.load_site(7, datetime(2025, 3, 11)) is None
+
+    def test_partial_day(self, tmp_path, stub_transport):
+        transport = stub_transport
+        archive = ObservationArchive(str(tmp_path))
+        observations = DailyReportRequest(
+            7, datetime(2025, 3, 10), transport=transport
+        ).send()
+        archive.write_day(7, datetime(2025, 3, 10), observations[10:20])
+        store = archive.read_day(7, datetime(2025, 3, 10))
+        assert list(store) == observations[10:20]
+        with pytest.raises(ValueError):
+            archive.write_day(7, datetime(2025, 3, 11), observations)
+
+    def test_import_range(self, tmp_path, stub_server, stub_transport):
+        server, transport = stub_server, stub_transport
+        archive = ObservationArchive(str(tmp_path))
+        errors = archive.import_range(
+            3, datetime(2024, 12, 30), datetime(2025, 1, 2), transport=transport
+        )
+        assert errors == {}
+        assert server.request_count == 4
+        # Days already stored are not fetched again
+        archive.import_range(
+            3, datetime(2024, 12, 30), datetime(2025, 1, 3), transport=transport
+        )
+        assert server.request_count == 5
+        assert len(archive.load_site(3, datetime(2025, 1, 3))) == 96
+        server.failing_sites.add(4)
+        errors = archive.import_range(
+            4, datetime(2025, 1, 1), datetime(2025, 1, 2), transport=transport
+        )
+        assert sorted(errors) == [datetime(2025, 1, 1), datetime(2025, 1, 2)]
+        with pytest.raises(ValueError):
+            archive.import_range(3, datetime(2025, 1, 2), datetime(2025, 1, 1))
+
+    def test_import_range_empty_days(self, tmp_path, stub_server, stub_transport):
+        stub_server.intervals_available = 0
+        archive = ObservationArchive(str(tmp_path))
+        days = (datetime(2025, 1, 1), datetime(2025, 1, 2))
+        assert archive.import_range(5, *days, transport=stub_transport) == {}
+        assert stub_server.request_count == 2
+        assert not archive.has_day(5, days[0])
+        assert archive.read_day(5, days[0]) is None
+        # Past days without data are marked as imported, so they are not fetched again
+        archive.import_range(5, *days, transport=stub_transport)
+        assert stub_server.request_count == 2
+        stub_server.intervals_available = 96
+        archive.write_day(
+            5, days[0], DailyReportRequest(5, days[0], transport=stub_transport).send()
+        )
+        assert len(archive.read_day(5, days[0])) == 96
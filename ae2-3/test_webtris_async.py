@@ -0,0 +1,107 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+
+from webtris_async import AsyncWebTRISClient
+
+
+class TestAsyncWebTRISClient:
+    def test_invalid_arguments(self):
+        with pytest.raises(ValueError):
+            AsyncWebTRISClient(concurrency=0)
+        with pytest.raises(ValueError):
+            AsyncWebTRISClient(timeout=0)
+
+    def test_fetch_many(self, stub_server, stub_transport):
+        stub_server.latency = 0.01
+        pairs = [
+            (site_id, datetime(2025, 3, 1) + timedelta(days=day, hours=9))
+            for site_id in range(1, 11)
+            for day in range(3)
+        ]
+
+        async def run():
+            async with AsyncWebTRISClient(
+                concurrency=8, transport=stub_transport
+            ) as client:
+                return await client.fetch_many(pairs + pairs[:5])
+
+        results = asyncio.run(run())
+        assert len(results) == 30
+        assert stub_server.request_count == 30
+        assert 1 < stub_server.peak_in_flight <= 8
+        observations = results[(3, datetime(2025, 3, 2))]
+        assert len(observations) == 96
+        assert observations[0].site_id == 3
+        assert observations[0].site_name == "STUB/3"
+        assert observations[0].end_datetime == datetime(2025, 3, 2, 0, 14)
+
+    def test_timeout_collected(self, stub_server, stub_transport):
+        stub_server.latency = 0.5
+        pairs = [(site_id, datetime(2025, 3, 1)) for site_id in range(1, 5)]
+
+        async def run():
+            async with AsyncWebTRISClient(
+                concurrency=2, timeout=0.05, transport=stub_transport
+            ) as client:
+                assert client.transport.read_timeout == 0.05
+                assert stub_transport.read_timeout == 30.0
+                return await client.fetch_many(pairs)
+
+        results = asyncio.run(run())
+        assert all(isinstance(results[pair], TimeoutError) for pair in pairs)
+
+    def test_timeout_is_total_deadline(self, stub_transport):
+        def slow_send(request):
+            # Every read is quick, but the request as a whole is not
+            time.sleep(0.5)
+            return []
+
+        async def run():
+            async with AsyncWebTRISClient(
+                timeout=0.1, transport=stub_transport
+            ) as client:
+                start = time.perf_counter()
+                with pytest.raises(TimeoutError):
+                    await client.fetch_report(1, datetime(2025, 3, 1))
+                return time.perf_counter() - start
+
+        with patch("webtris_async.DailyReportRequest.send", slow_send):
+            assert asyncio.run(run()) < 0.4
+
+    def test_cancelled_request_keeps_slot(self, stub_server, stub_transport):
+        stub_server.latency = 0.2
+
+        async def run():
+            async with AsyncWebTRISClient(
+                concurrency=1, transport=stub_transport
+            ) as client:
+                first = asyncio.create_task(
+                    client.fetch_report(1, datetime(2025, 3, 1))
+                )
+                await asyncio.sleep(0.05)
+                first.cancel()
+                # The cancelled request's thread is still running, so this one waits for it
+                await client.fetch_report(2, datetime(2025, 3, 1))
+                assert first.cancelled()
+
+        asyncio.run(run())
+        assert stub_server.peak_in_flight == 1
+        assert stub_server.request_count == 2
+
+    def test_load_sites(self, stub_transport):
+        async def run():
+            async with AsyncWebTRISClient(transport=stub_transport) as client:
+                return await client.load_sites(
+                    [(1, datetime(2025, 3, 1)), (2, datetime(2025, 3, 1))]
+                )
+
+        sites, errors = asyncio.run(run())
+        assert errors == {}
+        site = sites[(2, datetime(2025, 3, 1))]
+        assert site.name == "STUB/2"
+        assert len(site) == 96
+        assert site.get_vehicle_count() > 0
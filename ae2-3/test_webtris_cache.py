@@ -0,0 +1,354 @@
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from unittest.mock import Mock, patch
+
+import pytest
+
+from webtris_cache import (
+    CacheMissError,
+    ObservationCache,
+    QualityCache,
+    ReportCache,
+    SingleFlight,
+    approximate_size,
+)
+from webtris_client import (
+    DailyReportRequest,
+    TrafficObservation,
+    WebTRISTransport,
+    get_default_cache,
+    get_default_observation_cache,
+    set_default_cache,
+    set_default_observation_cache,
+)
+from webtris_stub_server import StubWebTRISServer
+
+ROWS = [
+    {
+        "Site Name": "M25/4876A",
+        "Report Date": "2025-03-10T00:00:00",
+        "Time Period Ending": "00:14:00",
+        "Avg mph": "66",
+        "Total Volume": "172",
+    }
+]
+
+
+class Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+@pytest.fixture
+def mock_response():
+    response = Mock(status_code=200)
+    response.json.return_value = {"Header": {"links": []}, "Rows": ROWS}
+    return response
+
+
+class TestReportCache:
+    def test_past_days_permanent(self, tmp_path):
+        clock = Clock(datetime(2025, 3, 11, 9, 0))
+        cache = ReportCache(str(tmp_path / "cache.db"), now=clock)
+        assert cache.get(1, datetime(2025, 3, 10)) is None
+        cache.put(1, datetime(2025, 3, 10, 13, 0), ROWS)
+        clock.now += timedelta(days=365)
+        assert cache.get(1, datetime(2025, 3, 10)) == ROWS
+        assert (cache.hits, cache.misses) == (1, 1)
+        cache.close()
+        # Reports are kept on disk between runs
+        reopened = ReportCache(str(tmp_path / "cache.db"), now=clock)
+        assert reopened.get(1, datetime(2025, 3, 10)) == ROWS
+        assert len(reopened) == 1
+
+    def test_today_expires(self):
+        clock = Clock(datetime(2025, 3, 10, 9, 0))
+        cache = ReportCache(today_ttl=timedelta(minutes=15), now=clock)
+        cache.put(1, datetime(2025, 3, 10), ROWS)
+        clock.now += timedelta(minutes=14)
+        assert cache.get(1, datetime(2025, 3, 10)) == ROWS
+        clock.now += timedelta(minutes=2)
+        assert cache.get(1, datetime(2025, 3, 10)) is None
+
+    def test_empty_past_day_expires(self):
+        clock = Clock(datetime(2025, 3, 11, 9, 0))
+        cache = ReportCache(now=clock)
+        cache.put(1, datetime(2025, 3, 10), [])
+        assert cache.get(1, datetime(2025, 3, 10)) == []
+        clock.now += timedelta(hours=1)
+        assert cache.get(1, datetime(2025, 3, 10)) is None
+
+    def test_offline(self):
+        clock = Clock(datetime(2025, 3, 10, 9, 0))
+        cache = ReportCache(offline=True, now=clock)
+        cache.put(1, datetime(2025, 3, 10), ROWS)
+        clock.now += timedelta(days=1)
+        # Expired reports are still served when the API cannot be called
+        assert cache.get(1, datetime(2025, 3, 10)) == ROWS
+        with pytest.raises(CacheMissError):
+            cache.get(2, datetime(2025, 3, 10))
+
+    def test_clear(self):
+        cache = ReportCache()
+        cache.put(1, datetime(2025, 3, 10), ROWS)
+        cache.clear()
+        assert len(cache) == 0
+
+
+class TestQualityCache:
+    def test_past_ranges_permanent(self, tmp_path):
+        clock = Clock(datetime(2025, 3, 11, 9, 0))
+        cache = QualityCache(str(tmp_path / "quality.db"), now=clock)
+        start, end = datetime(2025, 3, 1), datetime(2025, 3, 10)
+        assert cache.get(1, start, end) == (False, None)
+        cache.put(1, start, end, 87)
+        cache.put(2, start, end, None)
+        clock.now += timedelta(days=365)
+        # A site with no data is remembered, not mistaken for a miss
+        assert cache.get(1, start, end) == (True, 87)
+        assert cache.get(2, start, end) == (True, None)
+        assert cache.get(1, start, datetime(2025, 3, 9)) == (False, None)
+        assert (cache.hits, cache.misses) == (2, 2)
+        cache.close()
+        assert len(QualityCache(str(tmp_path / "quality.db"), now=clock)) == 2
+
+    def test_ranges_ending_today_expire(self):
+        clock = Clock(datetime(2025, 3, 10, 9, 0))
+        cache = QualityCache(today_ttl=timedelta(minutes=30), now=clock)
+        cache.put(1, datetime(2025, 3, 1), datetime(2025, 3, 10), 40)
+        clock.now += timedelta(minutes=29)
+        assert cache.get(1, datetime(2025, 3, 1), datetime(2025, 3, 10)) == (True, 40)
+        clock.now += timedelta(minutes=2)
+        assert cache.get(1, datetime(2025, 3, 1), datetime(2025, 3, 10)) == (
+            False,
+            None,
+        )
+
+
+class TestDailyReportRequestCache:
+    @patch("requests.Session.send")
+    def test_send_uses_cache(self, mock_send, mock_response):
+        mock_send.return_value = mock_response
+        cache = ReportCache(now=lambda: datetime(2025, 3, 11))
+        for _ in range(3):
+            observations = DailyReportRequest(
+                1, datetime(2025, 3, 10), cache=cache
+            ).send()
+            assert len(observations) == 1
+            assert observations[0].average_speed == 66
+        assert mock_send.call_count == 1
+
+    @patch("requests.Session.send")
+    def test_offline_send(self, mock_send):
+        cache = ReportCache(offline=True)
+        with pytest.raises(CacheMissError):
+            DailyReportRequest(1, datetime(2025, 3, 10), cache=cache).send()
+        assert mock_send.call_count == 0
+
+    @patch("requests.Session.send")
+    def test_default_cache(self, mock_send, mock_response):
+        mock_send.return_value = mock_response
+        cache = ReportCache(now=lambda: datetime(2025, 3, 11))
+        set_default_cache(cache)
+        try:
+            assert get_default_cache() is cache
+            DailyReportRequest(1, datetime(2025, 3, 10)).send()
+            DailyReportRequest(1, datetime(2025, 3, 10)).send()
+        finally:
+            set_default_cache(None)
+        assert mock_send.call_count == 1
+        with pytest.raises(TypeError):
+            set_default_cache("cache.db")
+
+
+def make_observations(site_id: int, count: int = 96) -> list[TrafficObservation]:
+    return [
+        TrafficObservation(
+            site_name=f"STUB/{site_id}",
+            site_id=site_id,
+            end_time=datetime(2025, 3, 10, i // 4, (i % 4) * 15 + 14),
+            average_speed=60.0,
+            vehicle_count=100,
+        )
+        for i in range(count)
+    ]
+
+
+class TestObservationCache:
+    def test_hit_and_miss(self):
+        cache = ObservationCache(now=lambda: datetime(2025, 3, 11))
+        observations = make_observations(1)
+        assert cache.get(1, datetime(2025, 3, 10)) is None
+        cache.put(1, datetime(2025, 3, 10), observations)
+        cached = cache.get(1, datetime(2025, 3, 10, 12))
+        assert cached == observations
+        # Callers get their own list so cannot change the cached one
+        cached.clear()
+        assert len(cache.get(1, datetime(2025, 3, 10))) == 96
+        assert (cache.hits, cache.misses, cache.evictions) == (2, 1, 0)
+        assert cache.size_bytes == approximate_size(observations)
+
+    def test_size_counts_shared_day_once(self):
+        def observation(end_time: datetime) -> TrafficObservation:
+            return TrafficObservation(
+                site_name="STUB/1",
+                site_id=1,
+                end_time=end_time,
+                average_speed=60.0,
+                vehicle_count=100,
+            )
+
+        first = observation(datetime(2025, 3, 10, 0, 14))
+        same_day = observation(datetime(2025, 3, 10, 0, 29))
+        next_day = observation(datetime(2025, 3, 11, 0, 29))
+        # Observations on one day share their date, so it is counted once
+        assert approximate_size([first, next_day]) - approximate_size(
+            [first, same_day]
+        ) == sys.getsizeof(first.date)
+
+    def test_lru_eviction_by_size(self):
+        entry_size = approximate_size(make_observations(1))
+        cache = ObservationCache(
+            max_bytes=entry_size * 2, now=lambda: datetime(2025, 3, 11)
+        )
+        cache.put(1, datetime(2025, 3, 10), make_observations(1))
+        cache.put(2, datetime(2025, 3, 10), make_observations(2))
+        # Using site 1 makes site 2 the least recently used
+        assert cache.get(1, datetime(2025, 3, 10)) is not None
+        cache.put(3, datetime(2025, 3, 10), make_observations(3))
+        assert cache.evictions == 1
+        assert len(cache) == 2
+        assert cache.size_bytes <= cache.max_bytes
+        assert cache.get(2, datetime(2025, 3, 10)) is None
+        assert cache.get(1, datetime(2025, 3, 10)) is not None
+        assert cache.get(3, datetime(2025, 3, 10)) is not None
+
+    def test_oversized_not_stored(self):
+        cache = ObservationCache(max_bytes=1000)
+        cache.put(1, datetime(2025, 3, 10), make_observations(1))
+        assert len(cache) == 0
+        with pytest.raises(ValueError):
+            ObservationCache(max_bytes=0)
+
+    def test_today_expires(self):
+        clock = Clock(datetime(2025, 3, 10, 9, 0))
+        cache = ObservationCache(today_ttl=timedelta(minutes=15), now=clock)
+        cache.put(1, datetime(2025, 3, 10), make_observations(1))
+        assert cache.get(1, datetime(2025, 3, 10)) is not None
+        clock.now += timedelta(minutes=15)
+        assert cache.get(1, datetime(2025, 3, 10)) is None
+        assert cache.size_bytes == 0
+
+    @patch("requests.Session.send")
+    def test_shared_between_requests(self, mock_send, mock_response):
+        mock_send.return_value = mock_response
+        cache = ObservationCache(now=lambda: datetime(2025, 3, 11))
+        set_default_observation_cache(cache)
+        try:
+            assert get_default_observation_cache() is cache
+            first = DailyReportRequest(1, datetime(2025, 3, 10)).send()
+            second = DailyReportRequest(1, datetime(2025, 3, 10)).send()
+        finally:
+            set_default_observation_cache(None)
+        assert mock_send.call_count == 1
+        assert first == second
+        assert first[0] is second[0]
+        assert (cache.hits, cache.misses) == (1, 1)
+
+
+class TestSingleFlight:
+    def test_concurrent_calls_share_one(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def work():
+            calls.append(1)
+            release.wait()
+            return ["result"]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(single_flight.do, "key", work) for _ in range(8)]
+            while single_flight.coalesced < 7:
+                time.sleep(0.001)
+            assert single_flight.in_flight == 1
+            release.set()
+            results = [future.result() for future in futures]
+        assert len(calls) == 1
+        assert sorted(shared for _, shared in results) == [False] + [True] * 7
+        assert all(result == ["result"] for result, _ in results)
+        assert (single_flight.calls, single_flight.coalesced) == (1, 7)
+        # Nothing is kept once the call finishes
+        assert single_flight.do("key", lambda: "again") == ("again", False)
+        assert single_flight.in_flight == 0
+
+    def test_errors_are_shared(self):
+        single_flight = SingleFlight()
+        release = threading.Event()
+
+        def fail():
+            release.wait()
+            raise RuntimeError("down")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            futures = [pool.submit(single_flight.do, 1, fail) for _ in range(4)]
+            while single_flight.coalesced < 3:
+                time.sleep(0.001)
+            release.set()
+        for future in futures:
+            with pytest.raises(RuntimeError):
+                future.result()
+        assert single_flight.calls == 1
+
+    def test_daily_report_requests_coalesce(self):
+        single_flight = SingleFlight()
+        date = datetime(2025, 3, 10)
+        with StubWebTRISServer(latency=0.2) as server:
+            with WebTRISTransport(base_url=server.url) as transport:
+
+                def send(site_id: int) -> list[TrafficObservation]:
+                    return DailyReportRequest(
+                        site_id, date, transport=transport, single_flight=single_flight
+                    ).send()
+
+                with ThreadPoolExecutor(max_workers=8) as pool:
+                    results = list(pool.map(send, [1] * 6 + [2] * 2))
+            assert server.request_count == 2
+        assert (single_flight.calls, single_flight.coalesced) == (2, 6)
+        assert all(result == results[0] for result in results[:6])
+        # Each caller gets its own list to change
+        assert len({id(result) for result in results}) == 8
+
+    def test_different_caches_not_shared(self):
+        single_flight = SingleFlight()
+        date = datetime(2025, 3, 10)
+        offline = ReportCache(offline=True)
+        with StubWebTRISServer(latency=0.2) as server:
+            with WebTRISTransport(base_url=server.url) as transport:
+
+                def send(cache: ReportCache | None) -> list[TrafficObservation]:
+                    return DailyReportRequest(
+                        1,
+                        date,
+                        transport=transport,
+                        cache=cache,
+                        single_flight=single_flight,
+                    ).send()
+
+                with ThreadPoolExecutor(max_workers=4) as pool:
+                    futures = [
+                        pool.submit(send, cache) for cache in (None, None, offline)
+                    ]
+                    assert len(futures[0].result()) == 96
+                    assert len(futures[1].result()) == 96
+                    # The offline request never borrows a result fetched from the API
+                    with pytest.raises(CacheMissError):
+                        futures[2].result()
+            assert server.request_count == 1
+        assert single_flight.calls == 2
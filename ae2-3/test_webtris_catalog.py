@@ -0,0 +1,115 @@
+import math
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from webtris_cache import CacheMissError
+from webtris_catalog import SiteCatalog
+from webtris_client import SiteInfo, WebTRISTransport
+from webtris_stub_server import StubWebTRISServer
+
+
+class Clock:
+    def __init__(self, now: datetime):
+        self.now = now
+
+    def __call__(self) -> datetime:
+        return self.now
+
+
+def random_sites(count: int) -> list[SiteInfo]:
+    rng = random.Random(3)
+    return [
+        SiteInfo(
+            i,
+            f"Site {i}",
+            f"{rng.choice(['M25', 'M1', 'A2'])}/{i}",
+            rng.uniform(-3.0, 1.5),
+            rng.uniform(50.5, 53.5),
+            "Active" if i % 10 else "Inactive",
+        )
+        for i in range(1, count + 1)
+    ]
+
+
+class TestSiteCatalog:
+    def test_cached_locally(self, tmp_path):
+        path = str(tmp_path / "sites.json")
+        clock = Clock(datetime(2025, 3, 10))
+        with StubWebTRISServer() as server:
+            server.inactive_sites.update({3, 4})
+            with WebTRISTransport(base_url=server.url) as transport:
+                catalog = SiteCatalog(path, transport=transport, now=clock)
+                assert server.request_count == 1
+                assert len(catalog) == 98
+                assert catalog.inactive_ids == {3, 4}
+                assert catalog.get(3) is None and 3 not in catalog
+                assert catalog.active_ids([5, 3, 1, 1000]) == [5, 1]
+                # A fresh cache file is used instead of the API
+                clock.now += timedelta(days=6)
+                assert not SiteCatalog(path, transport=transport, now=clock).load()
+                assert server.request_count == 1
+                clock.now += timedelta(days=2)
+                SiteCatalog(path, transport=transport, now=clock)
+                assert server.request_count == 2
+                everything = SiteCatalog(
+                    path, transport=transport, include_inactive=True, now=clock
+                )
+                assert len(everything) == 100
+        offline = SiteCatalog(path, offline=True, now=lambda: datetime(2030, 1, 1))
+        assert offline.get(7).description == "STUB/7"
+        with pytest.raises(CacheMissError):
+            SiteCatalog(str(tmp_path / "missing.json"), offline=True)
+
+    def test_nearest_matches_brute_force(self):
+        sites = random_sites(2000)
+        catalog = SiteCatalog.from_sites(sites, cell_km=3.0)
+        active = [site for site in sites if site.active]
+        assert len(catalog) == len(active)
+        rng = random.Random(4)
+        for _ in range(50):
+            latitude, longitude = rng.uniform(50, 54), rng.uniform(-4, 2)
+            result = catalog.nearest(latitude, longitude, k=5)
+            assert [d for _, d in result] == sorted(d for _, d in result)
+            x, y = catalog._project(latitude, longitude)
+            brute = sorted(
+                math.hypot(sx - x, sy - y)
+                for sx, sy in zip(
+                    *catalog._project(
+                        [s.latitude for s in active], [s.longitude for s in active]
+                    )
+                )
+            )[:5]
+            assert [d for _, d in result] == pytest.approx(brute)
+        # Far from every site the search still finds the closest
+        far = catalog.nearest(60.0, -8.0)
+        assert len(far) == 1
+        assert catalog.nearest(60.0, -8.0, max_km=50) == []
+        with pytest.raises(ValueError):
+            catalog.nearest(51.0, 0.0, k=0)
+
+    def test_distance_is_close_to_great_circle(self):
+        catalog = SiteCatalog.from_sites(
+            [SiteInfo(1, "Site 1", "M25/1", -0.1276, 51.5072, "Active")]
+        )
+        # Central London to Birmingham is about 163 km
+        ((_, distance),) = catalog.nearest(52.4862, -1.8904)
+        assert distance == pytest.approx(163, rel=0.01)
+
+    def test_within_and_search(self):
+        sites = random_sites(500)
+        catalog = SiteCatalog.from_sites(sites)
+        box = catalog.within(51.0, -1.0, 52.0, 0.5)
+        expected = {
+            s.site_id
+            for s in sites
+            if s.active and 51.0 <= s.latitude <= 52.0 and -1.0 <= s.longitude <= 0.5
+        }
+        assert {s.site_id for s in box} == expected
+        assert [s.latitude for s in box] == sorted(s.latitude for s in box)
+        with pytest.raises(ValueError):
+            catalog.within(52.0, -1.0, 51.0, 0.5)
+        m25 = catalog.search("m25/")
+        assert m25 and all(s.description.startswith("M25/") for s in m25)
+        assert [s.site_id for s in m25] == sorted(s.site_id for s in m25)
@@ -0,0 +1,81 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from webtris_client import DailyReportRequest, ObservationStore
+from webtris_codec import (
+    BITMAP_BYTES,
+    SPEED_FLOAT,
+    VOLUME_WIDE,
+    SiteDayFleet,
+    decode_day,
+    encode_day,
+)
+
+
+@pytest.fixture
+def observations(stub_transport):
+    return DailyReportRequest(7, datetime(2025, 3, 10), transport=stub_transport).send()
+
+
+class TestCodec:
+    @pytest.mark.parametrize("delta", [False, True])
+    @pytest.mark.parametrize("compress", [False, True])
+    def test_round_trip(self, observations, delta, compress):
+        block = encode_day(observations, delta=delta, compress=compress)
+        if not compress:
+            # Flags, bitmap, then one byte of speed and two of volume per slot
+            assert len(block) == 1 + BITMAP_BYTES + 96 * 3
+        store = decode_day(block, 7, datetime(2025, 3, 10), "STUB/7")
+        assert list(store) == observations
+
+    def test_missing_slots(self, observations):
+        kept = observations[:10] + observations[50:]
+        store = decode_day(encode_day(kept), 7, datetime(2025, 3, 10), "STUB/7")
+        assert list(store) == kept
+        empty = decode_day(encode_day([]), 7, datetime(2025, 3, 10))
+        assert len(empty) == 0
+
+    def test_wide_values_are_lossless(self, observations):
+        store = ObservationStore.from_observations(observations)
+        store.speed[0] = 66.2
+        store.volume[1] = 100000
+        block = encode_day(store)
+        assert block[0] & SPEED_FLOAT and block[0] & VOLUME_WIDE
+        decoded = decode_day(block, 7, datetime(2025, 3, 10), "STUB/7")
+        assert np.array_equal(decoded.speed, store.speed)
+        assert np.array_equal(decoded.volume, store.volume)
+
+    def test_invalid(self, observations):
+        store = ObservationStore.from_observations(observations)
+        store.minute[0] = 3
+        with pytest.raises(ValueError):
+            encode_day(store)
+        block = encode_day(observations)
+        with pytest.raises(ValueError):
+            decode_day(block[:-4], 7, datetime(2025, 3, 10))
+        with pytest.raises(ValueError):
+            decode_day(block[:5], 7, datetime(2025, 3, 10))
+
+
+class TestSiteDayFleet:
+    def test_site_aggregates(self, observations):
+        fleet = SiteDayFleet()
+        size = fleet.put(7, datetime(2025, 3, 10), observations)
+        assert fleet.nbytes == fleet.bytes_per_site_day == size
+        assert (7, datetime(2025, 3, 10, 12)) in fleet
+        assert fleet.site(7, datetime(2025, 3, 11)) is None
+        with pytest.raises(ValueError):
+            fleet.put(7, datetime(2025, 3, 11), observations)
+        site = fleet.site(7, datetime(2025, 3, 10))
+        assert not site.pending
+        assert site.name == "STUB/7"
+        expected = sum(o.average_speed * o.vehicle_count for o in observations) / sum(
+            o.vehicle_count for o in observations
+        )
+        assert site.get_average_speed() == pytest.approx(expected)
+        # Replacing a day does not count its old block
+        fleet.put(7, datetime(2025, 3, 10), observations[:4])
+        assert len(fleet) == 1
+        assert fleet.nbytes < size
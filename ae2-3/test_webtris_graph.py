@@ -1,3 +1,5 @@
+import pytest
+
 from webtris_graph import (
     BreadthFirstSearch,
     RouteSegment,
@@ -5,8 +7,14 @@ from webtris_graph import (
     DijkstrasAlgoSearch,
     RouteSegmentExternal,
     SearchStrategy,
+    collect_segments,
+    hydrate_graph,
 )
 from datetime import datetime
+from webtris_client import WebTRISTransport
+from webtris_planner import RequestPlanner
+from webtris_quality import LowQualityError, QualityFilter
+from webtris_stub_server import StubWebTRISServer
 
 test_data = {
     "7-12": [
@@ -108,6 +116,189 @@ def test_make_routesegment():
     assert True
 
 
+def test_make_routesegment_batched():
+    with StubWebTRISServer() as server:
+        with WebTRISTransport(base_url=server.url) as transport:
+            site_ids = [site["id"] for site in test_data["7-12"]]
+            segment = RouteSegment(
+                name="segment",
+                site_ids=site_ids,
+                date=datetime(2025, 3, 10, 12, 45, 0),
+                length=23,
+                transport=transport,
+                batched=True,
+            )
+        assert server.request_count == 2
+    assert [site.site_id for site in segment.sites] == site_ids
+    assert all(len(site) == 96 for site in segment.sites)
+    assert segment.get_average_speed() > 0
+
+
+def test_make_routesegment_thread_pool():
+    with StubWebTRISServer(latency=0.01) as server:
+        server.failing_sites.add(479)
+        with WebTRISTransport(base_url=server.url) as transport:
+            segment = RouteSegment(
+                name="segment",
+                site_ids=[138, 144, 479, 544],
+                date=datetime(2025, 3, 10, 12, 45, 0),
+                length=3,
+                transport=transport,
+                max_workers=4,
+            )
+        assert server.peak_in_flight > 1
+    assert list(segment.hydration_errors) == [479]
+    assert [len(site) for site in segment.sites] == [96, 96, 0, 96]
+    assert segment.get_average_speed() > 0
+
+
+def test_hydrate_graph():
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    with StubWebTRISServer() as server:
+        server.failing_sites.add(778)
+        with WebTRISTransport(base_url=server.url) as transport:
+            segA = RouteSegment("segA", [138, 144], date, 3, transport, hydrate=False)
+            segB = RouteSegment("segB", [144, 547], date, 3, transport, hydrate=False)
+            segC = RouteSegment("segC", [699, 778], date, 3, transport, hydrate=False)
+            segA.next_segments.append(segB)
+            segA.next_segments.append(segC)
+            segB.next_segments.append(segC)
+            assert server.request_count == 0
+            assert collect_segments(segA) == [segA, segB, segC]
+            errors = hydrate_graph(segA, max_workers=8)
+        # Site 144 is shared by two segments but only fetched once
+        assert server.request_count == 5
+    assert list(errors) == [(778, datetime(2025, 3, 10))]
+    assert list(segC.hydration_errors) == [778]
+    assert segB.hydration_errors == {}
+    assert all(len(site) == 96 for site in segA.sites + segB.sites)
+
+
+def test_lazy_search():
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    with (
+        StubWebTRISServer() as server,
+        WebTRISTransport(base_url=server.url) as transport,
+    ):
+        segA = RouteSegment("segA", [138, 144], date, 3, transport, lazy=True)
+        segB = RouteSegment("segB", [544, 547], date, 3, transport, lazy=True)
+        segC = RouteSegment("segC", [699, 752], date, 3, transport, lazy=True)
+        segD = RouteSegment("segD", [885, 1069], date, 3, transport, lazy=True)
+        segA.next_segments.append(segB)
+        segB.next_segments.append(segC)
+        segA.next_segments.append(segD)
+        # Searches that never need speeds never call the API
+        assert DepthFirstSearch().search(segA, segC) == [segA, segB, segC]
+        assert BreadthFirstSearch().search(segA, segC) == [segA, segB, segC]
+        assert server.request_count == 0
+        DijkstrasAlgoSearch().search(segA, segB)
+        # Only the sites of segments whose speed was needed are fetched
+        assert server.request_count == 6
+        assert all(site.pending for site in segC.sites)
+
+
+def test_lazy_failing_site(stub_server, stub_transport):
+    stub_server.failing_sites.add(2)
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    seg = RouteSegment("seg", [1, 2], date, 3, stub_transport, lazy=True)
+    # The failed site is recorded and left empty, as when hydrating with max_workers
+    assert seg.get_traversal_time() > 0
+    assert list(seg.hydration_errors) == [2]
+    assert not any(site.pending for site in seg.sites)
+    requests = stub_server.request_count
+    seg.get_traversal_time()
+    assert stub_server.request_count == requests
+
+
+def test_quality_skips_sites():
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    with StubWebTRISServer() as server:
+        server.site_quality.update({144: 20, 547: None, 699: 0, 752: None})
+        with WebTRISTransport(base_url=server.url) as transport:
+            quality = QualityFilter(50, transport=transport)
+            segA = RouteSegment("segA", [138, 144], date, 3, transport, quality=quality)
+            segB = RouteSegment(
+                "segB", [544, 547], date, 3, transport, lazy=True, quality=quality
+            )
+            segC = RouteSegment("segC", [699, 752], date, 3, transport, hydrate=False)
+            segA.next_segments.append(segB)
+            segA.next_segments.append(segC)
+            # 2 quality checks and 1 report for segA
+            assert server.request_count == 3
+            assert DijkstrasAlgoSearch().search(segA, segB) == [segA, segB]
+            assert server.request_count == 6
+            errors = hydrate_graph(segA, quality=quality)
+    assert isinstance(segA.hydration_errors[144], LowQualityError)
+    assert list(segB.hydration_errors) == [547]
+    assert sorted(errors) == [
+        (site_id, datetime(2025, 3, 10)) for site_id in (144, 547, 699, 752)
+    ]
+    assert [len(site) for site in segA.sites] == [96, 0]
+    assert not any(site.pending for site in segB.sites)
+    # A segment without any data is avoided instead of dividing by zero
+    assert segC.get_average_speed() == 0
+    assert segC.get_traversal_time() == float("inf")
+
+
+def test_quality_keeps_site_order(stub_server, stub_transport):
+    stub_server.site_quality[1] = 20
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    quality = QualityFilter(50, transport=stub_transport)
+    segment = RouteSegment("seg", [1, 2], date, 3, stub_transport, quality=quality)
+    assert [site.site_id for site in segment.sites] == [1, 2]
+    assert [len(site) for site in segment.sites] == [0, 96]
+    assert list(segment.hydration_errors) == [1]
+
+
+def test_hydrate_graph_planned():
+    dates = [datetime(2025, 3, 10, 8, 0), datetime(2025, 3, 11, 17, 30)]
+    with StubWebTRISServer() as server:
+        with WebTRISTransport(base_url=server.url) as transport:
+            segments = [
+                RouteSegment(name, site_ids, date, 3, transport, hydrate=False)
+                for date in dates
+                for name, site_ids in (("segA", [138, 144]), ("segB", [144, 547]))
+            ]
+            for segment in segments[1:]:
+                segments[0].next_segments.append(segment)
+            planner = RequestPlanner(transport=transport)
+            errors = hydrate_graph(segments[0], max_workers=4, planner=planner)
+        # One /sites lookup and one report for three sites over both days, instead of six reports
+        assert server.request_count == 2
+    assert errors == {}
+    assert all(len(site) == 96 for segment in segments for site in segment.sites)
+    assert segments[2].sites[0].get_speed_at(dates[1]) is not None
+
+
+def test_refresh_routesegment():
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    with StubWebTRISServer() as server:
+        server.intervals_available = 52
+        with WebTRISTransport(base_url=server.url) as transport:
+            segment = RouteSegment("segment", [138, 144], date, 3, transport)
+            speed = segment.get_average_speed()
+            assert not segment.refresh()
+            assert segment.get_average_speed() == speed
+            segment.date = datetime(2025, 3, 10, 13, 5, 0)
+            server.intervals_available = 56
+            assert segment.refresh()
+        # 13:05 is covered by the 13:14 interval, which was only just added
+        assert segment.get_average_speed() != speed
+        assert all(len(site) == 56 for site in segment.sites)
+
+
+def test_sites_view():
+    date = datetime(2025, 3, 10, 12, 45, 0)
+    segment = RouteSegment("segment", [138, 144, 479], date, 3, hydrate=False)
+    view = segment.sites_view
+    assert [site.site_id for site in view] == [138, 144, 479]
+    with pytest.raises(TypeError):
+        view[0] = view[1]
+    segment.remove_site_by_id(144)
+    assert [site.site_id for site in view] == [138, 479]
+    assert len(segment.sites) == 2
+
+
 def test_dfs():
     date = datetime(2025, 3, 10, 12, 45, 0)
     segA = RouteSegment(name="segA", site_ids=[138, 144, 479], date=date, length=3)
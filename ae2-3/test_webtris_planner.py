@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from webtris_cache import CacheMissError, ObservationCache, ReportCache
+from webtris_client import DailyReportRequest, ObservationStore, WebTRISTransport
+from webtris_planner import RequestPlanner
+
+DATE = datetime(2025, 3, 10)
+
+
+def day(offset: int) -> datetime:
+    return DATE + timedelta(days=offset)
+
+
+class TestRequestPlanner:
+    def test_plan_groups_runs(self):
+        planner = RequestPlanner(transport=WebTRISTransport(), max_sites_per_call=3)
+        needs = [(site_id, day(d)) for site_id in (1, 2, 3, 4) for d in (0, 1, 2, 5)]
+        # Site 5 needs a different run so cannot join the others, and a second need of site 1 on the first day is planned once
+        needs += [(5, day(0)), (5, day(1)), (1, day(0) + timedelta(hours=8))]
+        plan = planner.plan(needs)
+        assert [(call.site_ids, call.start_date, call.end_date) for call in plan] == [
+            ([5], day(0), day(1)),
+            ([1, 2, 3], day(0), day(2)),
+            ([4], day(0), day(2)),
+            ([1, 2, 3], day(5), day(5)),
+            ([4], day(5), day(5)),
+        ]
+        assert plan.naive_call_count == 18
+        assert plan.lookup_calls == 1
+        assert plan.call_count == 6
+        assert "/reports/daily 3 sites, 2025-03-10 to 2025-03-12" in plan.describe()
+
+    def test_calls_fit_one_page(self):
+        planner = RequestPlanner(transport=WebTRISTransport(), page_size=96 * 10)
+        plan = planner.plan(
+            [(site_id, day(d)) for site_id in range(1, 5) for d in range(12)]
+        )
+        assert all(call.site_days <= 10 for call in plan)
+        assert sum(call.site_days for call in plan) == 48
+        with pytest.raises(ValueError):
+            RequestPlanner(page_size=95)
+        with pytest.raises(TypeError):
+            planner.plan([("1", DATE)])
+
+    def test_execute_matches_daily_requests(self, stub_server, stub_transport):
+        stub_server.failing_sites.add(9)
+        needs = [(site_id, day(d)) for site_id in (1, 2, 3) for d in (0, 1, 3)]
+        needs += [(9, day(0))]
+        planner = RequestPlanner(transport=stub_transport)
+        plan = planner.plan(needs)
+        results = planner.execute(plan, max_workers=4)
+        assert stub_server.request_count == plan.call_count == 4
+        expected = {
+            need: DailyReportRequest(*need, transport=stub_transport).send()
+            for need in needs[:-1]
+        }
+        assert results == expected
+        assert list(planner.errors) == [(9, day(0))]
+        assert planner.dropped_rows == 0
+
+    def test_execute_keeps_stores(self, stub_server, stub_transport):
+        cache = ReportCache()
+        planner = RequestPlanner(transport=stub_transport, cache=cache)
+        planner.fetch([(1, day(0))])
+        plan = planner.plan([(1, day(0)), (2, day(0))])
+        stores = planner._execute(plan, max_workers=2)
+        assert all(isinstance(store, ObservationStore) for store in stores.values())
+        assert {need: list(store) for need, store in stores.items()} == planner.execute(
+            plan
+        )
+        # Executing the plan again gives new stores
+        assert planner._execute(plan, 1)[(1, day(0))] is not stores[(1, day(0))]
+
+    def test_skips_cached(self, stub_server, stub_transport):
+        cache = ReportCache()
+        observation_cache = ObservationCache()
+        planner = RequestPlanner(
+            transport=stub_transport, cache=cache, observation_cache=observation_cache
+        )
+        first = planner.fetch([(1, day(0)), (1, day(1))])
+        assert stub_server.request_count == 1
+        plan = planner.plan([(1, day(0)), (1, day(1)), (1, day(2))])
+        assert list(plan.cached) == [(1, day(0)), (1, day(1))]
+        assert len(plan) == 1
+        second = planner.execute(plan)
+        assert stub_server.request_count == 2
+        assert {need: second[need] for need in first} == first
+        assert len(cache) == 3
+
+    def test_offline_cache(self):
+        cache = ReportCache(offline=True)
+        planner = RequestPlanner(transport=WebTRISTransport(), cache=cache)
+        plan = planner.plan([(1, DATE)])
+        assert len(plan) == 0
+        assert planner.execute(plan) == {}
+        assert isinstance(planner.errors[(1, DATE)], CacheMissError)
+
+    def test_unmapped_site_not_cached(self, stub_server, stub_transport):
+        cache = ReportCache()
+        # Site 2 is given a name its rows do not use, so none of them can be matched to it
+        planner = RequestPlanner(
+            transport=stub_transport,
+            cache=cache,
+            site_names={1: "STUB/1", 2: "Wrong name"},
+        )
+        results = planner.fetch([(1, DATE), (2, DATE)])
+        assert stub_server.request_count == 1
+        assert list(results) == [(1, DATE)]
+        assert isinstance(planner.errors[(2, DATE)], ValueError)
+        assert planner.dropped_rows == 96
+        assert cache.get(2, DATE) is None
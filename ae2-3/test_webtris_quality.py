@@ -0,0 +1,61 @@
+from datetime import datetime
+
+import pytest
+
+from webtris_cache import QualityCache
+from webtris_quality import LowQualityError, QualityFilter, QualityRequest
+
+START = datetime(2025, 3, 1)
+END = datetime(2025, 3, 10)
+
+
+@pytest.fixture
+def stub_server(stub_server):
+    stub_server.site_quality.update({2: 30, 3: None, 4: 80})
+    return stub_server
+
+
+class TestQualityRequest:
+    def test_send(self, stub_transport):
+        transport = stub_transport
+        assert QualityRequest(1, START, END, transport=transport).send() == 100
+        assert QualityRequest(2, START, END, transport=transport).send() == 30
+        # A 204 means the API holds nothing for the site
+        assert QualityRequest(3, START, END, transport=transport).send() is None
+        with pytest.raises(ValueError):
+            QualityRequest(1, END, START)
+        with pytest.raises(TypeError):
+            QualityRequest("1", START, END)
+
+    def test_cached(self, stub_server, stub_transport):
+        cache = QualityCache()
+        for _ in range(3):
+            request = QualityRequest(
+                3, START, END, transport=stub_transport, cache=cache
+            )
+            assert request.send() is None
+        assert stub_server.request_count == 1
+
+
+class TestQualityFilter:
+    def test_usable_and_rank(self, stub_server, stub_transport):
+        stub_server.failing_sites.add(5)
+        quality = QualityFilter(50, transport=stub_transport)
+        assert quality.usable([1, 2, 3, 4, 5], START, END) == [1, 4, 5]
+        # Sites that could not be checked are kept but ranked last
+        assert list(quality.errors) == [5]
+        assert quality.rank([5, 4, 3, 2, 1], START, END) == [1, 4, 5]
+        skipped = quality.skipped([2, 3], START, END)
+        assert {site_id: error.quality for site_id, error in skipped.items()} == {
+            2: 30,
+            3: None,
+        }
+        assert all(isinstance(error, LowQualityError) for error in skipped.values())
+        # Each site was only fetched once, the failing site again on every check of it
+        assert stub_server.request_count == 6
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            QualityFilter(101)
+        with pytest.raises(ValueError):
+            QualityFilter(max_workers=0)
@@ -0,0 +1,112 @@
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from webtris_client import (
+    DailyReportRangeRequest,
+    ObservationStore,
+    Site,
+    WebTRISTransport,
+)
+from webtris_sketch import HourlySpeedSketches, QuantileSketch
+from webtris_stub_server import StubWebTRISServer
+
+
+def weighted_quantile(values, weights, q):
+    order = np.argsort(values)
+    cumulative = np.cumsum(weights[order])
+    return values[order][np.searchsorted(cumulative, q * cumulative[-1])]
+
+
+class TestQuantileSketch:
+    def test_accuracy_and_bounded_memory(self):
+        rng = np.random.default_rng(1)
+        values = rng.normal(60, 8, 200_000)
+        sketch = QuantileSketch(compression=100)
+        for chunk in np.array_split(values, 500):
+            sketch.add(chunk)
+        assert sketch.count == len(values)
+        assert sketch.centroid_count <= 100
+        for q in (0.01, 0.5, 0.85, 0.95, 0.99):
+            assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), abs=0.1)
+        assert sketch.quantile(0) == values.min()
+        assert sketch.quantile(1) == values.max()
+
+    def test_merge(self):
+        rng = np.random.default_rng(2)
+        values = rng.gamma(9, 7, 50_000)
+        weights = rng.integers(1, 300, len(values))
+        sketches = []
+        for part_values, part_weights in zip(
+            np.array_split(values, 7), np.array_split(weights, 7)
+        ):
+            sketch = QuantileSketch()
+            sketch.add(part_values, part_weights)
+            sketches.append(sketch)
+        merged = sketches[0].copy()
+        for sketch in sketches[1:]:
+            merged.merge(sketch)
+        assert merged.count == weights.sum()
+        assert sketches[0].count == np.array_split(weights, 7)[0].sum()
+        for q in (0.5, 0.85, 0.95):
+            expected = weighted_quantile(values, weights, q)
+            assert merged.quantile(q) == pytest.approx(expected, rel=0.01)
+
+    def test_invalid(self):
+        sketch = QuantileSketch()
+        with pytest.raises(ValueError):
+            sketch.quantile(0.5)
+        sketch.add([50.0, np.nan, 70.0], [1, 1, 0])
+        assert sketch.count == 1
+        assert sketch.quantile(0.95) == 50.0
+        with pytest.raises(ValueError):
+            sketch.quantile(1.5)
+        with pytest.raises(ValueError):
+            sketch.add([1.0, 2.0], [1])
+        with pytest.raises(ValueError):
+            QuantileSketch(compression=5)
+        with pytest.raises(TypeError):
+            sketch.merge([1.0])
+
+
+class TestHourlySpeedSketches:
+    def test_per_site_and_hour(self):
+        with (
+            StubWebTRISServer() as server,
+            WebTRISTransport(base_url=server.url) as transport,
+        ):
+            observations = list(
+                DailyReportRangeRequest(
+                    7,
+                    datetime(2025, 3, 1),
+                    datetime(2025, 3, 31),
+                    transport=transport,
+                ).send()
+            )
+            site = Site(8, datetime(2025, 3, 10), transport=transport)
+        sketches = HourlySpeedSketches()
+        sketches.add(observations)
+        other = HourlySpeedSketches()
+        other.add_site(site)
+        sketches.merge(other)
+        assert sketches.site_ids == [7, 8]
+        assert len(sketches) == 48
+
+        store = ObservationStore.from_observations(observations)
+        in_hour = store.minute // 60 == 8
+        result = sketches.quantiles(8, site_ids=[7])
+        assert list(result) == [0.5, 0.85, 0.95]
+        for q, estimate in result.items():
+            expected = weighted_quantile(store.speed[in_hour], store.volume[in_hour], q)
+            assert estimate == pytest.approx(expected, abs=1.0)
+        # Merged across sites, the hour covers every vehicle of both
+        both = sketches.sketch(8)
+        assert both.count == store.volume[
+            in_hour
+        ].sum() + site.get_hourly_vehicle_count(8)
+        assert sketches.quantiles(8, site_ids=[9]) is None
+        with pytest.raises(ValueError):
+            sketches.quantiles(24)
+        with pytest.raises(ValueError):
+            sketches.merge(HourlySpeedSketches(weighted=False))
@@ -0,0 +1,354 @@
+"""A memory-mapped binary archive of WebTRIS daily observations for fast multi-year analysis"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Self
+
+import numpy as np
+
+from webtris_client import (
+    FETCH_ERRORS,
+    DailyReportRequest,
+    ObservationStore,
+    Site,
+    TrafficObservation,
+    WebTRISTransport,
+)
+
+SLOTS_PER_DAY = 96  # Fifteen minute intervals in a day
+DAYS_PER_FILE = 366  # Every year file has room for a leap day
+
+# One fixed-width record per fifteen minute slot. Fields use the same types as `ObservationStore` columns so they can be read without conversion.
+# An empty slot has a minute of -1. A past day imported without any observations has `EMPTY_DAY_MINUTE` in its first slot.
+RECORD_DTYPE = np.dtype([("speed", "<f8"), ("volume", "<i4"), ("minute", "<i2")])
+EMPTY_DAY_MINUTE = -2
+
+
+class ObservationArchive:
+    """
+    A class to store observations on disk in fixed-width binary files, one per site and year, laid out as
+    366 days by 96 fifteen minute slots of `RECORD_DTYPE`. Files are read through `numpy.memmap`, so opening one
+    reads nothing and a stored day is loaded as a slice of the file, without parsing or copying.
+    Safe to share between threads.
+
+    Attributes
+    ----------
+    root: str, readonly
+        The directory holding the archive. Each site has a sub-directory holding one `<year>.bin` file per year
+        and a `site_name.txt` file.
+
+    Methods
+    -------
+    write_day(site_id: int, date: datetime, observations: Iterable[TrafficObservation]) -> int
+        Stores one day of observations for a site.
+    read_day(site_id: int, date: datetime) -> `ObservationStore | None`
+        Gets one day of observations for a site, as views of the file when the day is complete.
+    has_day(site_id: int, date: datetime) -> bool
+        Checks whether a day is stored.
+    load_site(site_id: int, date: datetime) -> `Site | None`
+        Creates a `Site` from a stored day without calling the API.
+    import_range(site_id: int, start_date: datetime, end_date: datetime) -> `dict[datetime, Exception]`
+        Fetches and stores every day in a range that is not already stored.
+    close() -> None
+        Closes every open file.
+    """
+
+    def __init__(self, root: str):
+        """
+        Parameters
+        ----------
+        root : str
+            The directory holding the archive. Created if it does not exist.
+        """
+        self._root = root
+        os.makedirs(root, exist_ok=True)
+        self._maps: dict[tuple[int, int], np.memmap] = {}
+        self._names: dict[int, str | None] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def root(self) -> str:
+        return self._root
+
+    def path(self, site_id: int, year: int) -> str:
+        """
+        Gets the file holding a site's observations for a year.
+        """
+        return os.path.join(self._root, str(site_id), f"{year}.bin")
+
+    def _open(self, site_id: int, year: int, create: bool) -> np.memmap | None:
+        """
+        Gets the map of a site's year, opening the file if needed. Returns None if the file does not exist and `create` is False.
+        """
+        key = (site_id, year)
+        with self._lock:
+            records = self._maps.get(key)
+            if records is not None:
+                return records
+            path = self.path(site_id, year)
+            if not os.path.exists(path):
+                if not create:
+                    return None
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                records = np.memmap(
+                    path,
+                    dtype=RECORD_DTYPE,
+                    mode="w+",
+                    shape=(DAYS_PER_FILE, SLOTS_PER_DAY),
+                )
+                records["minute"] = -1
+                records.flush()
+            else:
+                records = np.memmap(
+                    path,
+                    dtype=RECORD_DTYPE,
+                    mode="r+",
+                    shape=(DAYS_PER_FILE, SLOTS_PER_DAY),
+                )
+            self._maps[key] = records
+            return records
+
+    def _site_name(self, site_id: int) -> str | None:
+        if site_id not in self._names:
+            path = os.path.join(self._root, str(site_id), "site_name.txt")
+            try:
+                with open(path, encoding="utf-8") as file:
+                    self._names[site_id] = file.read() or None
+            except FileNotFoundError:
+                self._names[site_id] = None
+        return self._names[site_id]
+
+    def write_day(
+        self,
+        site_id: int,
+        date: datetime,
+        observations: list[TrafficObservation] | ObservationStore,
+    ) -> int:
+        """
+        Stores one day of observations for a site, replacing anything stored for that day before.
+
+        Parameters
+        ----------
+        site_id : int
+            The site of the observations
+        date : datetime
+            The day of the observations. Time of day is ignored.
+        observations : list[TrafficObservation] | ObservationStore
+            The observations, i.e. as returned by `DailyReportRequest.send()`. Each fills the fifteen minute slot it ends in.
+
+        Raises
+        ------
+        ValueError
+            If any observation is from another site or day
+
+        Returns
+        -------
+        int
+            The number of slots filled
+        """
+        store = ObservationStore.from_observations(observations, site_id=site_id)
+        if np.any(store.day != date.toordinal()):
+            raise ValueError(f"Cannot archive observations not on {date.date()}")
+        records = self._open(site_id, date.year, create=True)
+        row = date.timetuple().tm_yday - 1
+        slots = store.minute // 15
+        with self._lock:
+            day = records[row]
+            day["minute"] = -1
+            day["speed"][slots] = store.speed
+            day["volume"][slots] = store.volume
+            day["minute"][slots] = store.minute
+            records.flush()
+            if store.site_name is not None and self._site_name(site_id) is None:
+                path = os.path.join(self._root, str(site_id), "site_name.txt")
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(store.site_name)
+                self._names[site_id] = store.site_name
+        return int(np.count_nonzero(day["minute"] >= 0))
+
+    def read_day(self, site_id: int, date: datetime) -> ObservationStore | None:
+        """
+        Gets one day of observations for a site. When every slot is filled, the columns of the store are views of
+        the file, so nothing is copied. Such a store cannot be changed in place.
+
+        Parameters
+        ----------
+        site_id : int
+            The site to read
+        date : datetime
+            The day to read. Time of day is ignored.
+
+        Returns
+        -------
+        ObservationStore | None
+            The observations in chronological order, or None if nothing is stored for that day
+        """
+        records = self._open(site_id, date.year, create=False)
+        if records is None:
+            return None
+        day = records[date.timetuple().tm_yday - 1]
+        filled = day["minute"] >= 0
+        if not filled.any():
+            return None
+        if not filled.all():
+            day = day[filled]  # Partly filled days are copied without their empty slots
+        speed, volume, minute = day["speed"], day["volume"], day["minute"]
+        for column in (speed, volume, minute):
+            column.flags.writeable = False
+        return ObservationStore(
+            site_id,
+            self._site_name(site_id),
+            np.broadcast_to(np.int32(date.toordinal()), minute.shape),
+            minute,
+            speed,
+            volume,
+        )
+
+    def has_day(self, site_id: int, date: datetime) -> bool:
+        """
+        Checks whether any observations are stored for a site on a day.
+        """
+        records = self._open(site_id, date.year, create=False)
+        if records is None:
+            return False
+        return bool((records[date.timetuple().tm_yday - 1]["minute"] >= 0).any())
+
+    def _imported(self, site_id: int, date: datetime) -> bool:
+        """
+        Checks whether a day is stored, or was imported and had no observations.
+        """
+        records = self._open(site_id, date.year, create=False)
+        if records is None:
+            return False
+        return bool((records[date.timetuple().tm_yday - 1]["minute"] != -1).any())
+
+    def _mark_empty(self, site_id: int, date: datetime) -> None:
+        """
+        Records that a day was imported and had no observations, so `import_range()` does not fetch it again.
+        """
+        records = self._open(site_id, date.year, create=True)
+        with self._lock:
+            day = records[date.timetuple().tm_yday - 1]
+            day["minute"] = -1
+            day["minute"][0] = EMPTY_DAY_MINUTE
+            records.flush()
+
+    def load_site(
+        self,
+        site_id: int,
+        date: datetime,
+        transport: WebTRISTransport | None = None,
+    ) -> Site | None:
+        """
+        Creates a `Site` from a stored day without calling the API or copying the stored observations.
+
+        Parameters
+        ----------
+        site_id : int
+            The site to load
+        date : datetime
+            The date to give the site. Date and time components are kept.
+        transport : WebTRISTransport | None
+            The transport the site uses if it later calls the API, i.e. when its date is changed.
+
+        Returns
+        -------
+        Site | None
+            The site, or None if nothing is stored for that day
+        """
+        store = self.read_day(site_id, date)
+        if store is None:
+            return None
+        site = Site(site_id, date, transport=transport, lazy=True)
+        site.set_observations(store, copy=False)
+        return site
+
+    def import_range(
+        self,
+        site_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        transport: WebTRISTransport | None = None,
+        max_workers: int = 8,
+    ) -> dict[datetime, Exception]:
+        """
+        Fetches every day in a range with `DailyReportRequest` and stores it. Days already stored are skipped.
+        Days are fetched concurrently and written as they arrive. A past day without any observations is marked as
+        imported, so it is skipped too; today or later is fetched again as the API may still be filling it in.
+
+        Parameters
+        ----------
+        site_id : int
+            The site to import
+        start_date : datetime
+            The first day to import, inclusive
+        end_date : datetime
+            The last day to import, inclusive
+        transport : WebTRISTransport | None
+            The pooled transport to fetch through
+        max_workers : int
+            The number of days fetched at once
+
+        Raises
+        ------
+        ValueError
+            If `end_date` is before `start_date` or `max_workers` is not a positive int
+
+        Returns
+        -------
+        dict[datetime, Exception]
+            Errors raised while fetching, keyed by day. Those days are left unstored.
+        """
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError("Cannot import with non-int/<=0 max_workers")
+        start = start_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        end = end_date.replace(hour=0, minute=0, second=0, microsecond=0)
+        if end < start:
+            raise ValueError("Cannot import a range with end_date before start_date")
+        days = [
+            start + timedelta(days=i)
+            for i in range((end - start).days + 1)
+            if not self._imported(site_id, start + timedelta(days=i))
+        ]
+        errors: dict[datetime, Exception] = {}
+        if not days:
+            return errors
+        today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(days))) as pool:
+            futures = {
+                pool.submit(
+                    DailyReportRequest(site_id, day, transport=transport).send
+                ): day
+                for day in days
+            }
+            for future in as_completed(futures):
+                day = futures[future]
+                try:
+                    observations = future.result()
+                    if observations or day >= today:
+                        self.write_day(site_id, day, observations)
+                    else:
+                        self._mark_empty(site_id, day)
+                except FETCH_ERRORS as e:
+                    errors[day] = e
+        return errors
+
+    def close(self) -> None:
+        """
+        Writes any changes and closes every open file. The archive can still be used afterwards and reopens files as needed.
+        """
+        with self._lock:
+            for records in self._maps.values():
+                records.flush()
+            self._maps.clear()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"ObservationArchive(root='{self.root}')"
@@ -0,0 +1,228 @@
+"""An asyncio interface to the WebTRIS client for fetching many sites and dates concurrently"""
+
+import asyncio
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Self
+
+from requests import Timeout
+
+from webtris_client import (
+    DailyReportRequest,
+    Site,
+    TrafficObservation,
+    WebTRISTransport,
+)
+
+
+class AsyncWebTRISClient:
+    """
+    A class to fetch daily reports for hundreds of (site, date) pairs concurrently from asyncio code.
+    At most `concurrency` requests are in flight at once. Each request is made with `DailyReportRequest.send()` on a worker
+    thread sharing one pooled transport, so results are parsed exactly as the blocking client parses them.
+    `timeout` is a deadline for each whole request, also passed to the transport as its read timeout. A worker thread
+    cannot be interrupted, so a request that times out or whose awaiting task is cancelled keeps its slot until its
+    thread has finished.
+    Use as an async context manager, or call `close()` when finished.
+
+    Attributes
+    ----------
+    concurrency: int, readonly
+        The most requests that can be in flight at the same time.
+    timeout: float, readonly
+        Seconds each request may take in total, once it has a slot, before it fails with `TimeoutError`.
+    transport: WebTRISTransport, readonly
+        The pooled transport shared by every request, waiting for `timeout`. Sized to `concurrency` when created by this client.
+
+    Methods
+    -------
+    fetch_report(site_id: int, date: datetime) -> `list[TrafficObservation]`
+        Fetches one day of observations for one site. Can raise errors.
+    fetch_many(pairs: Iterable[tuple[int, datetime]]) -> `dict[tuple[int, datetime], list[TrafficObservation] | Exception]`
+        Fetches every pair concurrently, collecting errors instead of raising them.
+    load_sites(pairs: Iterable[tuple[int, datetime]]) -> `tuple[dict, dict]`
+        Fetches every pair concurrently and builds a `Site` from each successful result.
+    """
+
+    @property
+    def concurrency(self) -> int:
+        return self._concurrency
+
+    @property
+    def timeout(self) -> float:
+        return self._timeout
+
+    @property
+    def transport(self) -> WebTRISTransport:
+        return self._transport
+
+    def __init__(
+        self,
+        concurrency: int = 50,
+        timeout: float = 30.0,
+        transport: WebTRISTransport | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        concurrency : int
+            The most requests that can be in flight at the same time.
+        timeout : float
+            Seconds each request may take in total, once it has a slot, before it fails with `TimeoutError`.
+        transport : WebTRISTransport | None
+            The transport to send requests through. Its connections are shared but its timeouts are replaced by `timeout`.
+            A new transport with `pool_size=concurrency` is created and owned if not given.
+        """
+        if not isinstance(concurrency, int) or concurrency <= 0:
+            raise ValueError(
+                "Cannot initialize AsyncWebTRISClient with <=0 concurrency!"
+            )
+        if timeout <= 0:
+            raise ValueError("Cannot initialize AsyncWebTRISClient with <=0 timeout!")
+        self._concurrency = concurrency
+        self._timeout = timeout
+        self._owns_transport = transport is None
+        connect_timeout = min(timeout, 5.0)
+        self._transport = (
+            transport.with_timeouts(connect_timeout, timeout)
+            if transport is not None
+            else WebTRISTransport(
+                pool_size=concurrency,
+                connect_timeout=connect_timeout,
+                read_timeout=timeout,
+            )
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="webtris"
+        )
+        self._semaphore: asyncio.Semaphore | None = None
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Created lazily so that it belongs to the running event loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        return self._semaphore
+
+    async def fetch_report(
+        self, site_id: int, date: datetime
+    ) -> list[TrafficObservation]:
+        """
+        Fetches one day of observations for one site, waiting for a free slot if `concurrency` requests are already in flight.
+
+        Parameters
+        ----------
+        site_id : int
+            The site to fetch
+        date : datetime
+            The day to fetch
+
+        Returns
+        -------
+        list[TrafficObservation]
+            The observations, as returned by `DailyReportRequest.send()`
+
+        Raises
+        ------
+        TimeoutError
+            If the request takes longer than `timeout` in total, however many reads it makes
+        requests.HTTPError
+            Raised in the case that the fetch does not return a res.ok
+        """
+        request = DailyReportRequest(site_id, date, transport=self._transport)
+        semaphore = self._get_semaphore()
+        await semaphore.acquire()
+        try:
+            future = asyncio.get_running_loop().run_in_executor(
+                self._executor, request.send
+            )
+        except BaseException:
+            semaphore.release()
+            raise
+
+        def finished(future: asyncio.Future) -> None:
+            # The thread keeps running after a timeout or cancellation, so its slot is only given back once it finishes
+            semaphore.release()
+            if not future.cancelled():
+                future.exception()  # Retrieved even if nobody awaits it any more
+
+        future.add_done_callback(finished)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self._timeout)
+        except (TimeoutError, Timeout) as e:
+            raise TimeoutError(
+                f"Site {site_id} on {date.date()} took longer than {self._timeout}s"
+            ) from e
+
+    async def fetch_many(
+        self, pairs: Iterable[tuple[int, datetime]]
+    ) -> dict[tuple[int, datetime], list[TrafficObservation] | Exception]:
+        """
+        Fetches every (site, date) pair concurrently. Duplicate pairs are only fetched once.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[int, datetime]]
+            The (site_id, date) pairs to fetch. Times of day are ignored.
+
+        Returns
+        -------
+        dict[tuple[int, datetime], list[TrafficObservation] | Exception]
+            The observations for each pair, keyed by (site_id, midnight of date). Failed pairs hold the exception raised instead.
+        """
+        keys = list(
+            dict.fromkeys(
+                (site_id, date.replace(hour=0, minute=0, second=0, microsecond=0))
+                for site_id, date in pairs
+            )
+        )
+        results = await asyncio.gather(
+            *(self.fetch_report(site_id, date) for site_id, date in keys),
+            return_exceptions=True,
+        )
+        return dict(zip(keys, results))
+
+    async def load_sites(
+        self, pairs: Iterable[tuple[int, datetime]]
+    ) -> tuple[dict[tuple[int, datetime], Site], dict[tuple[int, datetime], Exception]]:
+        """
+        Fetches every (site, date) pair concurrently and builds a `Site` for each one without further API calls.
+
+        Parameters
+        ----------
+        pairs : Iterable[tuple[int, datetime]]
+            The (site_id, date) pairs to load. Times of day are ignored.
+
+        Returns
+        -------
+        tuple[dict[tuple[int, datetime], Site], dict[tuple[int, datetime], Exception]]
+            The loaded sites and the errors of any pairs that failed, both keyed by (site_id, midnight of date).
+        """
+        sites: dict[tuple[int, datetime], Site] = {}
+        errors: dict[tuple[int, datetime], Exception] = {}
+        for key, result in (await self.fetch_many(pairs)).items():
+            if isinstance(result, Exception):
+                errors[key] = result
+                continue
+            site_id, date = key
+            sites[key] = Site(
+                site_id, date, transport=self._transport, observations=result
+            )
+        return sites, errors
+
+    def close(self) -> None:
+        """
+        Shuts down the worker threads, and the transport if it was created by this client.
+        """
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._owns_transport:
+            self._transport.close()
+
+    async def __aenter__(self) -> Self:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"AsyncWebTRISClient(concurrency={self.concurrency}, timeout={self.timeout})"
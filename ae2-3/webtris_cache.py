@@ -0,0 +1,662 @@
+"""Caches of WebTRIS daily reports: a persistent SQLite cache of responses, an in-memory LRU cache of parsed observations,
+a persistent cache of site data quality, and a coalescer of identical requests in flight"""
+
+import json
+import sqlite3
+import sys
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from datetime import datetime, timedelta
+
+
+class CacheMissError(LookupError):
+    """
+    Raised by an offline `ReportCache` when a report is not stored, as the API cannot be called instead.
+    """
+
+
+class ReportCache:
+    """
+    A class to store the raw rows of `/reports/daily` responses on disk, keyed by (site_id, date).
+    Reports for past days never change so are kept permanently. Reports for today (or later) are still being
+    filled in by the API, so they expire after `today_ttl`. Safe to share between threads.
+
+    Attributes
+    ----------
+    path: str, readonly
+        The SQLite database file. ":memory:" keeps the cache for the life of the object only.
+    today_ttl: timedelta
+        How long a report for today or a future day is served before it is fetched again.
+    offline: bool
+        If True, the API is never called. Expired reports are still served and missing ones raise `CacheMissError`.
+    hits: int, readonly
+        The number of lookups served from the cache.
+    misses: int, readonly
+        The number of lookups not served from the cache.
+
+    Methods
+    -------
+    get(site_id: int, date: datetime) -> `list[dict] | None`
+        Gets the stored rows for a site and day, or None if they must be fetched.
+    put(site_id: int, date: datetime, rows: list[dict]) -> None
+        Stores the rows returned by the API for a site and day.
+    clear() -> None
+        Removes every stored report.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        today_ttl: timedelta = timedelta(minutes=15),
+        offline: bool = False,
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Parameters
+        ----------
+        path : str
+            The SQLite database file to use. Created if it does not exist.
+        today_ttl : timedelta
+            How long a report for today or a future day is served before it is fetched again.
+        offline : bool
+            If True, never allow the API to be called.
+        now : Callable[[], datetime]
+            The clock used to decide which day is today and when reports expire.
+        """
+        self._path = path
+        self.today_ttl = today_ttl
+        self.offline = offline
+        self._now = now
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS daily_reports ("
+                "site_id INTEGER NOT NULL, "
+                "date TEXT NOT NULL, "
+                "fetched_at TEXT NOT NULL, "
+                "rows TEXT NOT NULL, "
+                "PRIMARY KEY (site_id, date))"
+            )
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def _is_fresh(self, date: datetime, fetched_at: datetime, row_count: int) -> bool:
+        """
+        Checks whether a stored report can still be served. Past days are permanent unless the API had no data for them yet.
+        """
+        now = self._now()
+        if date.date() < now.date() and row_count > 0:
+            return True
+        return now - fetched_at < self.today_ttl
+
+    def get(self, site_id: int, date: datetime) -> list[dict] | None:
+        """
+        Gets the stored rows for a site and day.
+
+        Parameters
+        ----------
+        site_id : int
+            The site of the report
+        date : datetime
+            The day of the report. Time of day is ignored.
+
+        Returns
+        -------
+        list[dict] | None
+            The rows as returned by the API, or None if nothing fresh is stored
+
+        Raises
+        ------
+        CacheMissError
+            If `offline` and nothing is stored
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fetched_at, rows FROM daily_reports WHERE site_id = ? AND date = ?",
+                (site_id, date.date().isoformat()),
+            ).fetchone()
+        if row is not None:
+            rows = json.loads(row[1])
+            if self.offline or self._is_fresh(
+                date, datetime.fromisoformat(row[0]), len(rows)
+            ):
+                with self._lock:
+                    self._hits += 1
+                return rows
+        with self._lock:
+            self._misses += 1
+        if self.offline:
+            raise CacheMissError(
+                f"No cached report for site {site_id} on {date.date()} while offline"
+            )
+        return None
+
+    def put(self, site_id: int, date: datetime, rows: list[dict]) -> None:
+        """
+        Stores the rows returned by the API for a site and day, replacing any stored before.
+
+        Parameters
+        ----------
+        site_id : int
+            The site of the report
+        date : datetime
+            The day of the report. Time of day is ignored.
+        rows : list[dict]
+            The "Rows" returned by the API. An empty list records that the API had no data.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO daily_reports VALUES (?, ?, ?, ?)",
+                (
+                    site_id,
+                    date.date().isoformat(),
+                    self._now().isoformat(),
+                    json.dumps(rows),
+                ),
+            )
+
+    def clear(self) -> None:
+        """
+        Removes every stored report.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM daily_reports")
+
+    def close(self) -> None:
+        """
+        Closes the database. The cache should not be used afterwards.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute(
+                "SELECT COUNT(*) FROM daily_reports"
+            ).fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"ReportCache(path='{self.path}', today_ttl={self.today_ttl}, offline={self.offline})"
+
+
+def approximate_size(observations: list) -> int:
+    """
+    Approximates the bytes held by a list of observations, including each object's attributes.
+    Only the first observation is measured in full, as every observation in a list has the same shape.
+    Attribute values shared between observations, such as the interned day, are counted once.
+
+    Parameters
+    ----------
+    observations : list
+        The observations to measure
+
+    Returns
+    -------
+    int
+        The approximate size in bytes
+    """
+    size = sys.getsizeof(observations)
+    if not observations:
+        return size
+    sample = observations[0]
+    per_item = sys.getsizeof(sample)
+    attributes = getattr(sample, "__dict__", None)
+    if attributes is not None:
+        per_item += sys.getsizeof(attributes)
+        values = dict(attributes)
+    else:
+        slots = getattr(type(sample), "__slots__", ())
+        values = {slot: getattr(sample, slot) for slot in slots}
+    shared = 0
+    for name, value in values.items():
+        if all(
+            getattr(observation, name, None) is value for observation in observations
+        ):
+            shared += sys.getsizeof(value)
+        else:
+            per_item += sys.getsizeof(value)
+    return size + per_item * len(observations) + shared
+
+
+class ObservationCache:
+    """
+    A class to keep parsed observation lists in memory, keyed by (site_id, date), so that sites and segments
+    asking for the same report in one process share one download and parse.
+    The least recently used entries are evicted once the approximate size of all entries exceeds `max_bytes`.
+    Reports for today or later expire after `today_ttl` as the API is still filling them in. Safe to share between threads.
+
+    Attributes
+    ----------
+    max_bytes: int, readonly
+        The approximate size all entries are kept under.
+    today_ttl: timedelta
+        How long a report for today or a future day is served before it is fetched again.
+    size_bytes: int, readonly
+        The approximate size of all entries currently held.
+    hits: int, readonly
+        The number of lookups served from the cache.
+    misses: int, readonly
+        The number of lookups not served from the cache.
+    evictions: int, readonly
+        The number of entries removed to stay under `max_bytes`.
+
+    Methods
+    -------
+    get(site_id: int, date: datetime) -> `list | None`
+        Gets a copy of the stored observations, or None if they must be fetched.
+    put(site_id: int, date: datetime, observations: list) -> None
+        Stores parsed observations, evicting the least recently used entries if needed.
+    clear() -> None
+        Removes every entry. Counters are kept.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 64 * 1024 * 1024,
+        today_ttl: timedelta = timedelta(minutes=15),
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Parameters
+        ----------
+        max_bytes : int
+            The approximate size all entries are kept under.
+        today_ttl : timedelta
+            How long a report for today or a future day is served before it is fetched again.
+        now : Callable[[], datetime]
+            The clock used to decide which day is today and when reports expire.
+        """
+        if not isinstance(max_bytes, int) or max_bytes <= 0:
+            raise ValueError("Cannot initialize ObservationCache with <=0 max_bytes!")
+        self._max_bytes = max_bytes
+        self.today_ttl = today_ttl
+        self._now = now
+        self._entries: OrderedDict[tuple[int, str], tuple[list, int, datetime]] = (
+            OrderedDict()
+        )
+        self._size_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def max_bytes(self) -> int:
+        return self._max_bytes
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size_bytes
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    @property
+    def evictions(self) -> int:
+        return self._evictions
+
+    def get(self, site_id: int, date: datetime) -> list | None:
+        """
+        Gets the stored observations for a site and day and marks them as recently used.
+
+        Parameters
+        ----------
+        site_id : int
+            The site of the report
+        date : datetime
+            The day of the report. Time of day is ignored.
+
+        Returns
+        -------
+        list | None
+            A shallow copy of the stored observations, or None if nothing fresh is stored
+        """
+        key = (site_id, date.date().isoformat())
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                observations, size, stored_at = entry
+                now = self._now()
+                if date.date() < now.date() or now - stored_at < self.today_ttl:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return observations.copy()
+                del self._entries[key]
+                self._size_bytes -= size
+            self._misses += 1
+            return None
+
+    def put(self, site_id: int, date: datetime, observations: list) -> None:
+        """
+        Stores parsed observations for a site and day. Lists larger than `max_bytes` are not stored.
+
+        Parameters
+        ----------
+        site_id : int
+            The site of the report
+        date : datetime
+            The day of the report. Time of day is ignored.
+        observations : list
+            The parsed observations. A shallow copy is stored.
+        """
+        key = (site_id, date.date().isoformat())
+        size = approximate_size(observations)
+        if size > self._max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._size_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (list(observations), size, self._now())
+            self._size_bytes += size
+            while self._size_bytes > self._max_bytes:
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._size_bytes -= evicted_size
+                self._evictions += 1
+
+    def clear(self) -> None:
+        """
+        Removes every entry. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._size_bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __repr__(self) -> str:
+        return f"ObservationCache(max_bytes={self.max_bytes}, size_bytes={self.size_bytes}, entries={len(self)}, hits={self.hits}, misses={self.misses}, evictions={self.evictions})"
+
+
+class QualityCache:
+    """
+    A class to store the data quality the `/quality/overall` endpoint reports for a site over a range of days,
+    keyed by (site_id, start_date, end_date). Quality of a range that ended before today never changes so is kept
+    permanently. Ranges including today (or later) expire after `today_ttl`. Safe to share between threads.
+
+    Attributes
+    ----------
+    path: str, readonly
+        The SQLite database file. ":memory:" keeps the cache for the life of the object only.
+    today_ttl: timedelta
+        How long the quality of a range including today is served before it is fetched again.
+    hits: int, readonly
+        The number of lookups served from the cache.
+    misses: int, readonly
+        The number of lookups not served from the cache.
+
+    Methods
+    -------
+    get(site_id: int, start_date: datetime, end_date: datetime) -> `tuple[bool, int | None]`
+        Gets whether a quality is stored, and the quality.
+    put(site_id: int, start_date: datetime, end_date: datetime, quality: int | None) -> None
+        Stores the quality reported by the API.
+    clear() -> None
+        Removes every stored quality.
+    """
+
+    def __init__(
+        self,
+        path: str = ":memory:",
+        today_ttl: timedelta = timedelta(hours=1),
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Parameters
+        ----------
+        path : str
+            The SQLite database file to use. Created if it does not exist.
+        today_ttl : timedelta
+            How long the quality of a range including today is served before it is fetched again.
+        now : Callable[[], datetime]
+            The clock used to decide which day is today and when qualities expire.
+        """
+        self._path = path
+        self.today_ttl = today_ttl
+        self._now = now
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._connection:
+            if path != ":memory:":
+                self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS quality ("
+                "site_id INTEGER NOT NULL, "
+                "start_date TEXT NOT NULL, "
+                "end_date TEXT NOT NULL, "
+                "fetched_at TEXT NOT NULL, "
+                "quality INTEGER, "
+                "PRIMARY KEY (site_id, start_date, end_date))"
+            )
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        return self._misses
+
+    def get(
+        self, site_id: int, start_date: datetime, end_date: datetime
+    ) -> tuple[bool, int | None]:
+        """
+        Gets the stored quality of a site over a range of days.
+
+        Parameters
+        ----------
+        site_id : int
+            The site
+        start_date : datetime
+            The first day of the range. Time of day is ignored.
+        end_date : datetime
+            The last day of the range, inclusive. Time of day is ignored.
+
+        Returns
+        -------
+        tuple[bool, int | None]
+            Whether a fresh quality is stored, and the quality as a percentage, or None if the API had no data
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT fetched_at, quality FROM quality WHERE site_id = ? AND start_date = ? AND end_date = ?",
+                (site_id, start_date.date().isoformat(), end_date.date().isoformat()),
+            ).fetchone()
+        if row is not None:
+            now = self._now()
+            if (
+                end_date.date() < now.date()
+                or now - datetime.fromisoformat(row[0]) < self.today_ttl
+            ):
+                with self._lock:
+                    self._hits += 1
+                return True, row[1]
+        with self._lock:
+            self._misses += 1
+        return False, None
+
+    def put(
+        self,
+        site_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        quality: int | None,
+    ) -> None:
+        """
+        Stores the quality reported by the API for a site over a range of days, replacing any stored before.
+
+        Parameters
+        ----------
+        site_id : int
+            The site
+        start_date : datetime
+            The first day of the range. Time of day is ignored.
+        end_date : datetime
+            The last day of the range, inclusive. Time of day is ignored.
+        quality : int | None
+            The quality as a percentage. None records that the API had no data.
+        """
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO quality VALUES (?, ?, ?, ?, ?)",
+                (
+                    site_id,
+                    start_date.date().isoformat(),
+                    end_date.date().isoformat(),
+                    self._now().isoformat(),
+                    quality,
+                ),
+            )
+
+    def clear(self) -> None:
+        """
+        Removes every stored quality.
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM quality")
+
+    def close(self) -> None:
+        """
+        Closes the database. The cache should not be used afterwards.
+        """
+        with self._lock:
+            self._connection.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM quality").fetchone()[
+                0
+            ]
+
+    def __repr__(self) -> str:
+        return f"QualityCache(path='{self.path}', today_ttl={self.today_ttl})"
+
+
+class _Flight:
+    """
+    One call in flight in a `SingleFlight`, waited on by every caller after the first.
+    """
+
+    __slots__ = ("done", "error", "result")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    A class to coalesce identical calls made at the same time, so that only the first caller for a key does the work
+    and every caller arriving while it runs waits for and shares its result or exception. Nothing is kept once a call
+    finishes, so it complements caches rather than replacing them. Safe to share between threads.
+
+    Attributes
+    ----------
+    calls: int, readonly
+        The number of calls made, one per key per flight.
+    coalesced: int, readonly
+        The number of callers that shared a call already in flight instead of making their own.
+    in_flight: int, readonly
+        The number of calls currently running.
+
+    Methods
+    -------
+    do(key: Hashable, function: Callable[[], object]) -> `tuple[object, bool]`
+        Calls `function`, or waits for the call already in flight for `key`.
+    """
+
+    def __init__(self):
+        self._flights: dict[Hashable, _Flight] = {}
+        self._calls = 0
+        self._coalesced = 0
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self) -> int:
+        return self._calls
+
+    @property
+    def coalesced(self) -> int:
+        return self._coalesced
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._flights)
+
+    def do(self, key: Hashable, function: Callable[[], object]) -> tuple[object, bool]:
+        """
+        Calls `function` unless a call for `key` is already in flight, in which case its outcome is waited for and shared.
+
+        Parameters
+        ----------
+        key : Hashable
+            Identifies calls that would return the same result, i.e. (transport, site_id, date)
+        function : Callable[[], object]
+            The call to make if none is in flight for `key`
+
+        Raises
+        ------
+        Exception
+            Whatever `function` raised, in every caller that shared the call
+
+        Returns
+        -------
+        tuple[object, bool]
+            The result, and True if it was shared from another caller's call. Shared results are the same object
+            for every caller, so copy mutable results before changing them.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight()
+                self._calls += 1
+                leader = True
+            else:
+                self._coalesced += 1
+                leader = False
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result, True
+        try:
+            flight.result = function()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def __repr__(self) -> str:
+        return f"SingleFlight(calls={self.calls}, coalesced={self.coalesced}, in_flight={self.in_flight})"
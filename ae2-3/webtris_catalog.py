@@ -0,0 +1,440 @@
+"""A locally cached catalog of WebTRIS sites from the `/sites` endpoint, indexed for nearest-site and bounding-box queries"""
+
+import json
+import math
+import os
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from webtris_cache import CacheMissError
+from webtris_client import SiteInfo, SitesRequest, WebTRISTransport
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _site_to_dict(site: SiteInfo) -> dict:
+    """
+    Converts a site back to the format of one entry of the "sites" list returned by the API.
+    """
+    return {
+        "Id": str(site.site_id),
+        "Name": site.name,
+        "Description": site.description,
+        "Longitude": site.longitude,
+        "Latitude": site.latitude,
+        "Status": site.status,
+    }
+
+
+class SiteCatalog:
+    """
+    A class to hold the list of WebTRIS sites, fetched from `/sites` at most once per `max_age` and kept in a
+    local JSON file between runs. Inactive sites are left out by default so no requests are spent on them.
+    Sites are indexed by a uniform grid of `cell_km` square cells for nearest-site queries and by latitude for
+    bounding-box queries. Distances are in km on a sinusoidal projection centred on the sites, which is within
+    about 1% of great-circle distance over the size of Great Britain. Safe to share between threads.
+
+    Attributes
+    ----------
+    path: str | None, readonly
+        The JSON file the site list is cached in. None keeps it in memory only.
+    max_age: timedelta
+        How long a cached site list is used before it is fetched again.
+    offline: bool
+        If True, the API is never called. A cached list is used however old it is, and a missing one raises `CacheMissError`.
+    include_inactive: bool, readonly
+        Whether inactive sites are kept.
+    cell_km: float, readonly
+        The side of each grid cell in km.
+    fetched_at: datetime | None, readonly
+        When the site list was fetched from the API. None if the catalog was built from a list of sites.
+    inactive_ids: set[int], readonly
+        The IDs of inactive sites, whether or not they are kept.
+
+    Methods
+    -------
+    from_sites(sites: Iterable[SiteInfo]) -> `SiteCatalog`
+        Builds a catalog from sites already fetched, without calling the API.
+    load(force: bool = False) -> bool
+        Loads the site list from the cache file or the API and rebuilds the index.
+    get(site_id: int) -> `SiteInfo | None`
+        Gets a site by ID.
+    search(text: str) -> `list[SiteInfo]`
+        Finds sites whose name or description contains some text, i.e. a road such as "M25".
+    nearest(latitude: float, longitude: float, k: int = 1, max_km: float | None = None) -> `list[tuple[SiteInfo, float]]`
+        Finds the sites closest to a point.
+    within(min_latitude: float, min_longitude: float, max_latitude: float, max_longitude: float) -> `list[SiteInfo]`
+        Finds the sites inside a bounding box.
+    active_ids(site_ids: Iterable[int]) -> `list[int]`
+        Removes inactive and unknown sites from a list of IDs.
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        max_age: timedelta = timedelta(days=7),
+        offline: bool = False,
+        transport: WebTRISTransport | None = None,
+        include_inactive: bool = False,
+        cell_km: float = 5.0,
+        lazy: bool = False,
+        now: Callable[[], datetime] = datetime.now,
+    ):
+        """
+        Parameters
+        ----------
+        path : str | None
+            The JSON file the site list is cached in. Created when first fetched.
+        max_age : timedelta
+            How long a cached site list is used before it is fetched again.
+        offline : bool
+            If True, never allow the API to be called.
+        transport : WebTRISTransport | None
+            The pooled transport to fetch through. Defaults to the shared transport.
+        include_inactive : bool
+            If True, keep inactive sites.
+        cell_km : float
+            The side of each grid cell in km.
+        lazy : bool
+            If True, nothing is loaded until `load()` is called.
+        now : Callable[[], datetime]
+            The clock used to decide when the cached list expires.
+        """
+        if not isinstance(cell_km, (int, float)) or cell_km <= 0:
+            raise ValueError("Cannot initialize SiteCatalog with <=0 cell_km!")
+        self._path = path
+        self.max_age = max_age
+        self.offline = offline
+        self.transport = transport
+        self._include_inactive = include_inactive
+        self._cell_km = float(cell_km)
+        self._now = now
+        self._fetched_at: datetime | None = None
+        self._lock = threading.Lock()
+        self._build([])
+        if not lazy:
+            self.load()
+
+    @classmethod
+    def from_sites(
+        cls,
+        sites: Iterable[SiteInfo],
+        include_inactive: bool = False,
+        cell_km: float = 5.0,
+    ) -> "SiteCatalog":
+        """
+        Builds an in-memory catalog from sites already fetched, i.e. by `SitesRequest`, without calling the API.
+        """
+        catalog = cls(
+            include_inactive=include_inactive, cell_km=cell_km, offline=True, lazy=True
+        )
+        catalog._build(list(sites))
+        return catalog
+
+    @property
+    def path(self) -> str | None:
+        return self._path
+
+    @property
+    def include_inactive(self) -> bool:
+        return self._include_inactive
+
+    @property
+    def cell_km(self) -> float:
+        return self._cell_km
+
+    @property
+    def fetched_at(self) -> datetime | None:
+        return self._fetched_at
+
+    @property
+    def inactive_ids(self) -> set[int]:
+        return set(self._inactive_ids)
+
+    def _read_file(self) -> tuple[datetime, list[SiteInfo]] | None:
+        if self._path is None:
+            return None
+        try:
+            with open(self._path, encoding="utf-8") as file:
+                data = json.load(file)
+            fetched_at = datetime.fromisoformat(data["fetched_at"])
+            entries = data["sites"]
+        except (OSError, ValueError, KeyError, TypeError):
+            return None  # A missing or corrupt file is fetched again
+        sites: list[SiteInfo] = []
+        for entry in entries:
+            try:
+                sites.append(SiteInfo.from_dict(entry))
+            except (ValueError, TypeError):
+                continue
+        return fetched_at, sites
+
+    def _write_file(self, fetched_at: datetime, sites: list[SiteInfo]) -> None:
+        if self._path is None:
+            return
+        directory = os.path.dirname(self._path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Written to a temporary file first so a crash never leaves half a catalog behind
+        temporary = f"{self._path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "fetched_at": fetched_at.isoformat(),
+                    "sites": [_site_to_dict(site) for site in sites],
+                },
+                file,
+            )
+        os.replace(temporary, self._path)
+
+    def load(self, force: bool = False) -> bool:
+        """
+        Loads the site list and rebuilds the index. The cache file is used while it is younger than `max_age`,
+        otherwise every site is fetched with one `SitesRequest` and the file is replaced.
+
+        Parameters
+        ----------
+        force : bool
+            If True, fetch from the API even if the cache file is fresh.
+
+        Raises
+        ------
+        CacheMissError
+            If `offline` and there is no cache file
+        requests.HTTPError
+            Raised in the case that the fetch does not return a res.ok
+
+        Returns
+        -------
+        bool
+            True if the API was called
+        """
+        with self._lock:
+            cached = self._read_file()
+            if cached is not None and (
+                self.offline or (not force and self._now() - cached[0] < self.max_age)
+            ):
+                self._fetched_at = cached[0]
+                self._build(cached[1])
+                return False
+            if self.offline:
+                raise CacheMissError(
+                    f"No cached site list at {self._path} while offline"
+                )
+            sites = SitesRequest(transport=self.transport).send()
+            self._fetched_at = self._now()
+            self._write_file(self._fetched_at, sites)
+            self._build(sites)
+            return True
+
+    def _build(self, sites: list[SiteInfo]) -> None:
+        """
+        Replaces the sites held and rebuilds the grid and latitude indexes.
+        """
+        self._inactive_ids = frozenset(
+            site.site_id for site in sites if not site.active
+        )
+        if not self._include_inactive:
+            sites = [site for site in sites if site.active]
+        self._sites = sites
+        self._by_id = {site.site_id: site for site in sites}
+        latitude = np.array([site.latitude for site in sites], dtype=np.float64)
+        longitude = np.array([site.longitude for site in sites], dtype=np.float64)
+        self._latitude = latitude
+        self._longitude = longitude
+        self._central_longitude = float(longitude.mean()) if len(sites) else 0.0
+        self._x, self._y = self._project(latitude, longitude)
+        # Grid cells hold the positions of their sites, grouped with one sort
+        cell_x = np.floor(self._x / self._cell_km).astype(np.int64)
+        cell_y = np.floor(self._y / self._cell_km).astype(np.int64)
+        order = np.lexsort((cell_y, cell_x))
+        self._cells: dict[tuple[int, int], np.ndarray] = {}
+        if len(sites):
+            keys = np.stack((cell_x[order], cell_y[order]), axis=1)
+            starts = np.flatnonzero(np.any(np.diff(keys, axis=0) != 0, axis=1)) + 1
+            for group in np.split(order, starts):
+                self._cells[(int(cell_x[group[0]]), int(cell_y[group[0]]))] = group
+            self._cell_bounds = (
+                int(cell_x.min()),
+                int(cell_x.max()),
+                int(cell_y.min()),
+                int(cell_y.max()),
+            )
+        else:
+            self._cell_bounds = (0, -1, 0, -1)
+        # Positions sorted by latitude, so a bounding box only scans its band of latitude
+        self._latitude_order = np.argsort(latitude, kind="stable")
+        self._sorted_latitude = latitude[self._latitude_order]
+
+    def _project(self, latitude, longitude) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Projects coordinates to km with a sinusoidal projection centred on the catalog's mean longitude.
+        """
+        latitude = np.asarray(latitude, dtype=np.float64)
+        longitude = np.asarray(longitude, dtype=np.float64)
+        phi = np.radians(latitude)
+        x = (
+            EARTH_RADIUS_KM
+            * np.radians(longitude - self._central_longitude)
+            * np.cos(phi)
+        )
+        return x, EARTH_RADIUS_KM * phi
+
+    def get(self, site_id: int) -> SiteInfo | None:
+        """
+        Gets a site by ID, or None if it is unknown or inactive and not kept.
+        """
+        return self._by_id.get(site_id)
+
+    def search(self, text: str) -> list[SiteInfo]:
+        """
+        Finds sites whose name or description contains some text, ignoring case, i.e. "M25" for every site on the M25.
+
+        Returns
+        -------
+        list[SiteInfo]
+            The matching sites in ascending ID order
+        """
+        needle = text.casefold()
+        return sorted(
+            (
+                site
+                for site in self._sites
+                if needle in site.description.casefold()
+                or needle in site.name.casefold()
+            ),
+            key=lambda site: site.site_id,
+        )
+
+    def nearest(
+        self,
+        latitude: float,
+        longitude: float,
+        k: int = 1,
+        max_km: float | None = None,
+    ) -> list[tuple[SiteInfo, float]]:
+        """
+        Finds the sites closest to a point by searching grid cells in rings outward from the point's cell,
+        stopping once no unsearched cell can hold a closer site.
+
+        Parameters
+        ----------
+        latitude : float
+            The latitude of the point
+        longitude : float
+            The longitude of the point
+        k : int
+            The number of sites to find
+        max_km : float | None
+            Sites further away than this are not returned
+
+        Raises
+        ------
+        ValueError
+            If `k` is not a positive int
+
+        Returns
+        -------
+        list[tuple[SiteInfo, float]]
+            Up to `k` sites with their distances in km, closest first
+        """
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("Cannot find non-int/<=0 k nearest sites")
+        if not self._sites:
+            return []
+        x, y = (float(v) for v in self._project(latitude, longitude))
+        cx = math.floor(x / self._cell_km)
+        cy = math.floor(y / self._cell_km)
+        min_x, max_x, min_y, max_y = self._cell_bounds
+        last_ring = max(cx - min_x, max_x - cx, cy - min_y, max_y - cy, 0)
+        found: list[np.ndarray] = []
+        found_count = 0
+        distances = np.empty(0)
+        positions = np.empty(0, dtype=np.int64)
+        for ring in range(last_ring + 1):
+            if ring == 0:
+                cells = [(cx, cy)]
+            else:
+                cells = [(cx + d, cy - ring) for d in range(-ring, ring + 1)]
+                cells += [(cx + d, cy + ring) for d in range(-ring, ring + 1)]
+                cells += [(cx - ring, cy + d) for d in range(-ring + 1, ring)]
+                cells += [(cx + ring, cy + d) for d in range(-ring + 1, ring)]
+            for cell in cells:
+                group = self._cells.get(cell)
+                if group is not None:
+                    found.append(group)
+                    found_count += len(group)
+            # Any site in a cell outside this ring is at least `ring` cells away
+            reach = ring * self._cell_km
+            if found_count >= k or (max_km is not None and reach >= max_km):
+                positions = np.concatenate(found) if found else positions
+                distances = np.hypot(self._x[positions] - x, self._y[positions] - y)
+                if max_km is not None and reach >= max_km:
+                    break
+                if found_count >= k and np.partition(distances, k - 1)[k - 1] <= reach:
+                    break
+        else:
+            positions = np.concatenate(found)
+            distances = np.hypot(self._x[positions] - x, self._y[positions] - y)
+        order = np.argsort(distances, kind="stable")[:k]
+        return [
+            (self._sites[int(positions[i])], float(distances[i]))
+            for i in order
+            if max_km is None or distances[i] <= max_km
+        ]
+
+    def within(
+        self,
+        min_latitude: float,
+        min_longitude: float,
+        max_latitude: float,
+        max_longitude: float,
+    ) -> list[SiteInfo]:
+        """
+        Finds the sites inside a bounding box, edges included.
+
+        Raises
+        ------
+        ValueError
+            If a minimum is greater than its maximum
+
+        Returns
+        -------
+        list[SiteInfo]
+            The sites inside the box, from south to north
+        """
+        if min_latitude > max_latitude or min_longitude > max_longitude:
+            raise ValueError("Cannot search a bounding box with min > max")
+        start = np.searchsorted(self._sorted_latitude, min_latitude, side="left")
+        end = np.searchsorted(self._sorted_latitude, max_latitude, side="right")
+        band = self._latitude_order[start:end]
+        inside = band[
+            (self._longitude[band] >= min_longitude)
+            & (self._longitude[band] <= max_longitude)
+        ]
+        return [self._sites[int(i)] for i in inside]
+
+    def active_ids(self, site_ids: Iterable[int]) -> list[int]:
+        """
+        Removes inactive and unknown sites from a list of IDs, keeping the order, so no requests are spent on them.
+        """
+        return [
+            site_id
+            for site_id in site_ids
+            if site_id in self._by_id and site_id not in self._inactive_ids
+        ]
+
+    def __contains__(self, site_id: int) -> bool:
+        return site_id in self._by_id
+
+    def __len__(self) -> int:
+        return len(self._sites)
+
+    def __iter__(self) -> Iterator[SiteInfo]:
+        return iter(self._sites)
+
+    def __repr__(self) -> str:
+        return f"SiteCatalog(path={self.path!r}, sites={len(self)}, include_inactive={self.include_inactive}, cell_km={self.cell_km})"
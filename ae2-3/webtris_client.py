@@ -1,18 +1,271 @@
 """All classes for the application"""
 
-from datetime import datetime
-from collections.abc import Iterator
-from requests import request
+import copy
+from abc import ABC, abstractmethod
+from bisect import bisect_right
+from datetime import date as Date, datetime, timedelta
+from collections import OrderedDict, deque
+from collections.abc import Iterable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import threading
+from typing import Self
+import numpy as np
+from requests import RequestException, Response, Session
+from requests.adapters import HTTPAdapter
+from webtris_cache import CacheMissError, ObservationCache, ReportCache, SingleFlight
 
 
 API_URL = "https://webtris.nationalhighways.co.uk/api/v1.0"
+# The errors a request for a report can raise, which functions fetching many reports collect instead of raising
+FETCH_ERRORS = (RequestException, ValueError, CacheMissError)
+
+
+class WebTRISTransport:
+    """
+    A pooled HTTP transport used to make requests to the WebTRIS API.
+    Wraps a `requests.Session` so that TCP/TLS connections are kept alive and reused between requests instead of
+    paying for a new handshake on every fetch. One transport can be shared between any number of requests, sites and segments.
+
+    Attributes
+    ----------
+    base_url: str
+        The URL that endpoints are appended to. Defaults to `API_URL`, can be pointed at a local server for testing.
+    pool_size: int, readonly
+        The maximum number of connections kept open to the API host.
+    connect_timeout: float
+        Seconds to wait for a connection to be established before raising.
+    read_timeout: float
+        Seconds to wait for the server to send data before raising.
+
+    Methods
+    -------
+    get(endpoint: str, params: dict) -> `requests.Response`
+        Makes a GET request to `base_url + endpoint` through the pooled session.
+    with_timeouts(connect_timeout: float, read_timeout: float) -> `WebTRISTransport`
+        Gets a transport sharing this one's connections with different timeouts.
+    close() -> None
+        Closes all pooled connections. The transport should not be used afterwards.
+    """
+
+    _pool_size: int
+    _session: Session
+
+    @property
+    def pool_size(self) -> int:
+        return self._pool_size
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 5.0,
+        read_timeout: float = 30.0,
+        base_url: str = API_URL,
+    ):
+        if not isinstance(pool_size, int) or pool_size <= 0:
+            raise ValueError("Cannot initialize WebTRISTransport with <=0 pool_size!")
+        self._pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.base_url = base_url
+        self._session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def get(self, endpoint: str, params: dict) -> Response:
+        """
+        Makes a GET request to the API through the pooled session.
+
+        Parameters
+        ----------
+        endpoint : str
+            The endpoint to request, i.e. `DailyReportRequest.ENDPOINT`
+        params : dict
+            Query string parameters for the request
+
+        Returns
+        -------
+        requests.Response
+            The unchecked response from the API
+        """
+        return self._session.get(
+            self.base_url + endpoint,
+            params=params,
+            timeout=(self.connect_timeout, self.read_timeout),
+        )
+
+    def with_timeouts(
+        self, connect_timeout: float, read_timeout: float
+    ) -> "WebTRISTransport":
+        """
+        Gets a transport that shares this one's pooled connections but waits for different timeouts.
+        Closing either closes the connections of both.
+
+        Parameters
+        ----------
+        connect_timeout : float
+            Seconds to wait for a connection to be established before raising.
+        read_timeout : float
+            Seconds to wait for the server to send data before raising.
+
+        Returns
+        -------
+        WebTRISTransport
+            The new transport
+        """
+        transport = copy.copy(self)
+        transport.connect_timeout = connect_timeout
+        transport.read_timeout = read_timeout
+        return transport
+
+    def close(self) -> None:
+        """
+        Closes all pooled connections held by this transport.
+        """
+        self._session.close()
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __repr__(self) -> str:
+        return (
+            f"WebTRISTransport(base_url='{self.base_url}', pool_size={self.pool_size})"
+        )
+
+
+_default_transport: WebTRISTransport | None = None
+
+
+def get_default_transport() -> WebTRISTransport:
+    """
+    Gets the transport shared by every request that is not given one explicitly. Created on first use.
+
+    Returns
+    -------
+    WebTRISTransport
+        The shared transport
+    """
+    global _default_transport
+    if _default_transport is None:
+        _default_transport = WebTRISTransport()
+    return _default_transport
+
+
+def set_default_transport(transport: WebTRISTransport) -> None:
+    """
+    Replaces the transport shared by every request that is not given one explicitly.
+
+    Parameters
+    ----------
+    transport : WebTRISTransport
+        The new shared transport. The previous one is not closed.
+    """
+    global _default_transport
+    if not isinstance(transport, WebTRISTransport):
+        raise TypeError("Cannot set non-WebTRISTransport as default transport")
+    _default_transport = transport
+
+
+_default_cache: ReportCache | None = None
+
+
+def get_default_cache() -> ReportCache | None:
+    """
+    Gets the report cache used by every `DailyReportRequest` that is not given one explicitly.
+
+    Returns
+    -------
+    ReportCache | None
+        The shared cache, or None if responses are not cached
+    """
+    return _default_cache
+
+
+def set_default_cache(cache: ReportCache | None) -> None:
+    """
+    Sets the report cache used by every `DailyReportRequest` that is not given one explicitly.
+
+    Parameters
+    ----------
+    cache : ReportCache | None
+        The new shared cache. None turns caching off.
+    """
+    global _default_cache
+    if cache is not None and not isinstance(cache, ReportCache):
+        raise TypeError("Cannot set non-ReportCache as default cache")
+    _default_cache = cache
+
+
+_default_observation_cache: ObservationCache | None = None
+
+
+def get_default_observation_cache() -> ObservationCache | None:
+    """
+    Gets the in-memory observation cache shared by every `DailyReportRequest` in this process that is not given one explicitly.
+
+    Returns
+    -------
+    ObservationCache | None
+        The shared cache, or None if parsed observations are not cached
+    """
+    return _default_observation_cache
+
+
+def set_default_observation_cache(cache: ObservationCache | None) -> None:
+    """
+    Sets the in-memory observation cache shared by every `DailyReportRequest` in this process that is not given one explicitly.
+
+    Parameters
+    ----------
+    cache : ObservationCache | None
+        The new shared cache. None turns in-memory caching off.
+    """
+    global _default_observation_cache
+    if cache is not None and not isinstance(cache, ObservationCache):
+        raise TypeError("Cannot set non-ObservationCache as default observation cache")
+    _default_observation_cache = cache
+
+
+_default_single_flight: SingleFlight | None = SingleFlight()
+
+
+def get_default_single_flight() -> SingleFlight | None:
+    """
+    Gets the coalescer shared by every `DailyReportRequest` in this process that is not given one explicitly.
+    On by default, so identical requests sent at the same time from different threads share one download and parse.
+
+    Returns
+    -------
+    SingleFlight | None
+        The shared coalescer, or None if identical requests are sent separately
+    """
+    return _default_single_flight
+
+
+def set_default_single_flight(single_flight: SingleFlight | None) -> None:
+    """
+    Sets the coalescer shared by every `DailyReportRequest` in this process that is not given one explicitly.
+
+    Parameters
+    ----------
+    single_flight : SingleFlight | None
+        The new shared coalescer. None turns coalescing off.
+    """
+    global _default_single_flight
+    if single_flight is not None and not isinstance(single_flight, SingleFlight):
+        raise TypeError("Cannot set non-SingleFlight as default single flight")
+    _default_single_flight = single_flight
 
 
 class ReportRequest:
     """
     A class to request a list of traffic observations aggregated at different scales from the /reports endpoint.\
     This class must be subclassed to implement methods and return types as each level of aggregation returns different data.
-    Aggregation levels are daily, monthly, and annualy. Only daily has been implemented. 
+    Aggregation levels are daily, monthly, and annualy. Daily reports return fifteen minute observations, monthly reports
+    return one summary per day (`MonthlyReportRequest`), and annual reports return one summary per month (`AnnualReportRequest`).
     
     
     
@@ -38,6 +291,16 @@ class DailyReportRequest(ReportRequest):
         The ID of the site this object handles. All requests using this object will be made using `site_id`
     date: datetime
         The datetime object representing what day requests should be made to. Strips hours, minutes, seconds, and microseconds on assignment for comparability.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    cache: ReportCache | None
+        The cache responses are served from and stored in. Defaults to the shared cache from `get_default_cache()`.
+    observation_cache: ObservationCache | None
+        The in-memory cache of parsed observations, checked before `cache`. Defaults to `get_default_observation_cache()`.
+    single_flight: SingleFlight | None
+        Coalesces this request with identical ones already in flight on other threads. Defaults to `get_default_single_flight()`.
+    dropped_rows: int, readonly
+        The number of faulty rows excluded by the last `send()`. 0 if it was served from `observation_cache`.
 
     Methods
     -------
@@ -74,17 +337,37 @@ class DailyReportRequest(ReportRequest):
             hour=0, minute=0, second=0, microsecond=0
         )  # Ignore time and set to midnight of date
 
+    @property
+    def dropped_rows(self) -> int:
+        return self._dropped_rows
+
     def __init__(
         self,
         site_id: int,
         date: datetime,
+        transport: WebTRISTransport | None = None,
+        cache: ReportCache | None = None,
+        observation_cache: ObservationCache | None = None,
+        single_flight: SingleFlight | None = None,
     ):
         self.site_id = site_id
         self.date = date
+        self.transport = transport if transport is not None else get_default_transport()
+        self._dropped_rows = 0
+        self.cache = cache if cache is not None else get_default_cache()
+        self.observation_cache = (
+            observation_cache
+            if observation_cache is not None
+            else get_default_observation_cache()
+        )
+        self.single_flight = (
+            single_flight if single_flight is not None else get_default_single_flight()
+        )
 
     def send(self) -> list["TrafficObservation"]:
         """
         Sends a request to the WebTRIS API. Gets the `/reports/daiy` endpoint and returns formatted data based on the API's response.
+        If an identical request is already in flight on another thread, its response is shared instead.
 
         Returns
         -------
@@ -98,11 +381,82 @@ class DailyReportRequest(ReportRequest):
             Raised in the case that the fetch does not return a res.ok
         ValueError
             Raised if "Rows" not in returned data dictionary
+        webtris_cache.CacheMissError
+            Raised if `cache` is offline and does not hold this report
+        """
+        if self.observation_cache is not None:
+            observations = self.observation_cache.get(self.site_id, self.date)
+            if observations is not None:
+                self._dropped_rows = 0
+                return observations
+        store, observations = self._fetch_shared()
+        # The observations put in `observation_cache` are returned, so later hits share them
+        return list(observations if observations is not None else store)
+
+    def _send_store(self) -> "ObservationStore":
+        """
+        Sends the request like `send()`, but returns the parsed columns so no `TrafficObservation` objects are made
+        unless `observation_cache` needs them. The store is not shared, so it can be kept with `Site.set_observations(store, copy=False)`.
+        """
+        if self.observation_cache is not None:
+            observations = self.observation_cache.get(self.site_id, self.date)
+            if observations is not None:
+                self._dropped_rows = 0
+                return ObservationStore.from_observations(
+                    observations, site_id=self.site_id
+                )
+        return self._fetch_shared()[0]
+
+    def _fetch_shared(
+        self,
+    ) -> tuple["ObservationStore", list["TrafficObservation"] | None]:
+        """
+        Fetches the report with `_fetch_and_store()`, sharing the response of an identical request already in flight.
+        Returns the store with the observations put in `observation_cache`, if any.
+        """
+        if self.single_flight is None:
+            store, observations, _ = self._fetch_and_store()
+            return store, observations
+        # Keyed on the transport and caches too, so requests that would be answered differently are never shared
+        key = (
+            id(self.transport),
+            id(self.cache),
+            id(self.observation_cache),
+            getattr(self.cache, "offline", False),
+            self.site_id,
+            self.date.toordinal(),
+        )
+        (store, observations, self._dropped_rows), shared = self.single_flight.do(
+            key, self._fetch_and_store
+        )
+        # Every caller sharing a flight gets its own store, as stores can be extended
+        return (store.copy() if shared else store), observations
+
+    def _fetch_and_store(
+        self,
+    ) -> tuple["ObservationStore", list["TrafficObservation"] | None, int]:
         """
+        Fetches the report with `_fetch()` and stores it in `observation_cache`, returning it with the observations
+        stored, if any, and the rows dropped.
+        """
+        store = self._fetch()
+        observations = None
+        if self.observation_cache is not None:
+            observations = list(store)
+            self.observation_cache.put(self.site_id, self.date, observations)
+        return store, observations, self._dropped_rows
+
+    def _fetch(self) -> "ObservationStore":
+        """
+        Gets the report from `cache` or the API and parses it, bypassing `observation_cache`.
+        """
+        if self.cache is not None:
+            rows = self.cache.get(self.site_id, self.date)
+            if rows is not None:
+                return self._parse_rows(rows)
 
-        res = request(
-            method="GET",
-            url=API_URL + DailyReportRequest.ENDPOINT,
+        res = self.transport.get(
+            DailyReportRequest.ENDPOINT,
             params={
                 "sites": self.site_id,
                 "start_date": self.date.strftime("%d%m%Y"),
@@ -113,22 +467,24 @@ class DailyReportRequest(ReportRequest):
         )
         res.raise_for_status()
         if res.status_code == 204:
-            return []
-        data = res.json()
-        if "Rows" not in data:
-            raise ValueError(
-                "`Rows` not found in `DailyReportReportRequest.send()`. Required field to form data."
-            )
-        observation_list: list[TrafficObservation] = []
-        for observation in data["Rows"]:
-            try:
-                observation_list.append(
-                    TrafficObservation.from_dict(self.site_id, observation)
+            rows = []
+        else:
+            data = res.json()
+            if "Rows" not in data:
+                raise ValueError(
+                    "`Rows` not found in `DailyReportReportRequest.send()`. Required field to form data."
                 )
-            except (ValueError, TypeError):
-                # Silently exclude any faulty observations not containing full amounts of data
-                continue
-        return observation_list
+            rows = data["Rows"]
+        if self.cache is not None:
+            self.cache.put(self.site_id, self.date, rows)
+        return self._parse_rows(rows)
+
+    def _parse_rows(self, rows: list[dict]) -> "ObservationStore":
+        """
+        Parses the "Rows" of a `/reports/daily` response into observations in chronological order, excluding faulty rows.
+        """
+        store, self._dropped_rows = ObservationStore.from_rows(self.site_id, rows)
+        return store
 
     def __repr__(self):
         return f"DailyReportRequest(site_id={self.site_id}, date={self.date.strftime('%Y-%m-%d')})"
@@ -137,242 +493,1694 @@ class DailyReportRequest(ReportRequest):
         return f"DailyReportRequest for site {self.site_id} on {self.date.strftime('%Y-%m-%d')}"
 
 
-class TrafficObservation:
+def _iter_report_pages(
+    transport: WebTRISTransport,
+    sites: str,
+    start_date: datetime,
+    end_date: datetime,
+    page_size: int,
+    endpoint: str = DailyReportRequest.ENDPOINT,
+) -> Iterator[list[dict]]:
     """
-    A class to represent a fifteen minute measurement of traffic data from the WebTRIS API.
-
-
-    Attributes
-    ----------
-    site_name: str
-        The site name returned in WebTRIS API.
-    site_id: int
-        The site name returned in WebTRIS API.
-    end_time: datetime
-        A datetime.datetime object representing the ending time of the observation. Units smaller than minute should be 0.
-    date: datetime
-        A datetime.datetime object representing the date of the observation. Hours, minutes, seconds, and microseconds are 0.
-    end_time_minutes_in_day: int
-        An int representing how many minutes into the day the observation is. For example, 01:15:00 would be 75.
-    average_speed: float
-        A float containing the average speed in miles per hour (mph) of vehicles in the observation time.
-    vehicle_count: int
-        The int count of all vehicles passing through the observation point.
+    Requests pages of a `/reports` endpoint until the API stops advertising a `nextPage` link, yielding the raw "Rows" of each page.
 
     Raises
     ------
+    requests.HTTPError
+        Raised in the case that a fetch does not return a res.ok
     ValueError
-        If trying to initialize with no/empty `name`
-    ValueError
-        If trying to initialize with no/<=0 `id`
-    ValueError
-        If trying to initialize with no/<=0 `end_time`
-    ValueError
-        If trying to initialize with no/<0 `average_speed`
-    ValueError
-        If trying to initialize with no/<0 `vehicle_count`
+        Raised if "Rows" not in a returned data dictionary
     """
+    page = 1
+    while True:
+        res = transport.get(
+            endpoint,
+            params={
+                "sites": sites,
+                "start_date": start_date.strftime("%d%m%Y"),
+                "end_date": end_date.strftime("%d%m%Y"),
+                "page": page,
+                "page_size": page_size,
+            },
+        )
+        res.raise_for_status()
+        if res.status_code == 204:
+            return
+        data = res.json()
+        if "Rows" not in data:
+            raise ValueError(
+                f"`Rows` not found in `{endpoint}` page. Required field to form data."
+            )
+        yield data["Rows"]
+        links = data.get("Header", {}).get("links", [])
+        if not data["Rows"] or not any(link.get("rel") == "nextPage" for link in links):
+            return
+        page += 1
 
-    @classmethod
-    def from_dict(cls, site_id: int, data: dict) -> "TrafficObservation":
-        """
-        Creates a new `FifteenMinutesObservation` object using key-value dictionary in the format provided by WebTRIS API.
 
-        Parameters
-        ----------
-        data : dict
-            Data in the format:
-            "Site Name": "7001/1",
-            "Report Date": "2025-03-07T00:00:00",
-            "Time Period Ending": "00:14:00",
-            "Avg mph": "66",
-            "Total Volume": "7"
+class DailyReportRangeRequest(ReportRequest):
+    """
+    A class to request fifteen minute observations for one site over a range of days from the `/reports/daily` endpoint.
+    The API splits long ranges into pages. Pages are requested one at a time as the results are consumed,
+    so only one page of observations is held in memory however long the range is.
 
-        Raises
-        ------
-        ValueError
-            If trying to initialize with no/empty "Time Period Ending"
-        ValueError
-            If trying to initialize with non-numeric "Avg mph" or "Total Volume"
+    Attributes
+    ----------
+    ENDPOINT: str, static, readonly
+        The endpoint used to make requests to the API. Do not change this.
+    site_id: int
+        The ID of the site this object handles.
+    start_date: datetime
+        The first day of the range, inclusive. Strips hours, minutes, seconds, and microseconds on assignment.
+    end_date: datetime
+        The last day of the range, inclusive. Strips hours, minutes, seconds, and microseconds on assignment.
+    page_size: int
+        The number of rows requested per page.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    dropped_rows: int, readonly
+        The number of faulty rows excluded from the pages yielded so far.
 
-        Returns
-        -------
-        DailyReportRequest.TrafficObservation
-            A new `FifteenMinutesObservation` containing the data given.
-        """
-        dt = datetime.fromisoformat(data["Report Date"])
-        if "Time Period Ending" not in data:
-            raise ValueError(
-                "Cannot construct `TrafficObservation` from dict without valid timestamp"
-            )
+    Methods
+    -------
+    iter_pages() -> `Iterator[list[TrafficObservation]]`
+        Yields the observations of each page as it is fetched. Can raise errors.
+    send() -> `Iterator[TrafficObservation]`
+        Yields every observation in the range in the order the API returns them. Can raise errors.
+    """
 
-        time: list[int] = [
-            int(n) for n in data["Time Period Ending"].split(":")
-        ]  # Split "00:11:22" time into int array of [0, 11, 22] for [hour, minute, second]
-        dt = dt.replace(
-            hour=time[0], minute=time[1], second=time[2], microsecond=0
-        )  # Set time of datetime to time given in "Time Period Ending"
-        # print(f"making w data: {data}")
-        return cls(
-            site_name=data.get("Site Name"),
-            site_id=site_id,
-            end_time=dt,
-            average_speed=float(data.get("Avg mph")),
-            vehicle_count=int(data.get("Total Volume")),
-        )
+    ENDPOINT = DailyReportRequest.ENDPOINT
 
-    # Internal storage of properties
-    _site_name: str
     _site_id: int
-    _observation_end_datetime: datetime
-    _average_speed: float
-    _vehicle_count: int
-
-    # Exposed read-only public properties
-    @property
-    def site_name(self) -> str:
-        return self._site_name
+    _start_date: datetime
+    _end_date: datetime
+    _page_size: int
 
     @property
     def site_id(self) -> int:
         return self._site_id
 
-    @property
-    def end_datetime(self) -> datetime:
-        return self._observation_end_datetime
+    @site_id.setter
+    def site_id(self, new: int) -> None:
+        if not isinstance(new, int):
+            raise TypeError("Cannot assign non-int to site_id")
+        self._site_id = new
 
     @property
-    def date(self) -> datetime:
-        return datetime(
-            self._observation_end_datetime.year,
-            self._observation_end_datetime.month,
-            self._observation_end_datetime.day,
-        )
+    def start_date(self) -> datetime:
+        return self._start_date
 
-    @property
-    def end_time_minutes_in_day(self) -> int:
-        return (
-            self._observation_end_datetime.hour * 60
-            + self._observation_end_datetime.minute
-        )
+    @start_date.setter
+    def start_date(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to start_date")
+        self._start_date = new.replace(hour=0, minute=0, second=0, microsecond=0)
 
     @property
-    def average_speed(self) -> float:
-        return self._average_speed
+    def end_date(self) -> datetime:
+        return self._end_date
+
+    @end_date.setter
+    def end_date(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to end_date")
+        self._end_date = new.replace(hour=0, minute=0, second=0, microsecond=0)
 
     @property
-    def vehicle_count(self) -> int:
-        return self._vehicle_count
+    def page_size(self) -> int:
+        return self._page_size
+
+    @page_size.setter
+    def page_size(self, new: int) -> None:
+        if not isinstance(new, int) or new <= 0:
+            raise ValueError("Cannot assign non-int/<=0 to page_size")
+        self._page_size = new
 
     def __init__(
         self,
-        site_name: str,
         site_id: int,
-        end_time: datetime,
-        average_speed: float,
-        vehicle_count: int,
+        start_date: datetime,
+        end_date: datetime,
+        page_size: int = 500,
+        transport: WebTRISTransport | None = None,
     ):
-        if not isinstance(site_name, str) or site_name == "":
-            raise ValueError("Cannot initialize TrafficObservation with no/empty name!")
-        self._site_name = site_name
+        self.site_id = site_id
+        self.start_date = start_date
+        self.end_date = end_date
+        if self.end_date < self.start_date:
+            raise ValueError("Cannot request a range with end_date before start_date")
+        self.page_size = page_size
+        self.transport = transport if transport is not None else get_default_transport()
+        self._dropped_rows = 0
 
-        if not isinstance(site_id, int) or site_id <= 0:
+    @property
+    def dropped_rows(self) -> int:
+        return self._dropped_rows
+
+    def iter_pages(self) -> Iterator[list["TrafficObservation"]]:
+        """
+        Requests pages from the API until it reports there are no more, yielding each page's observations before the next is requested.
+
+        Returns
+        -------
+        Iterator[list[TrafficObservation]]
+            The observations of each page. Faulty rows are excluded the same way as `DailyReportRequest.send()`.
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised in the case that a fetch does not return a res.ok
+        ValueError
+            Raised if "Rows" not in a returned data dictionary
+        """
+        for rows in _iter_report_pages(
+            self.transport,
+            str(self.site_id),
+            self.start_date,
+            self.end_date,
+            self.page_size,
+        ):
+            store, dropped = ObservationStore.from_rows(self.site_id, rows)
+            self._dropped_rows += dropped
+            yield list(store)
+
+    def send(self) -> Iterator["TrafficObservation"]:
+        """
+        Yields every observation in the range. Pages are only requested once the previous page has been consumed.
+
+        Returns
+        -------
+        Iterator[TrafficObservation]
+            The observations in the order returned by the API (chronological for a single site)
+        """
+        for page in self.iter_pages():
+            yield from page
+
+    def __repr__(self):
+        return f"DailyReportRangeRequest(site_id={self.site_id}, start_date={self.start_date.strftime('%Y-%m-%d')}, end_date={self.end_date.strftime('%Y-%m-%d')})"
+
+    def __str__(self):
+        return f"DailyReportRangeRequest for site {self.site_id} from {self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}"
+
+
+MAX_PAGE_SIZE = 40000  # The largest page_size accepted by the /reports endpoints
+
+
+class MultiSiteDailyReportRequest(ReportRequest):
+    """
+    A class to request a day of fifteen minute observations for many sites with as few calls to `/reports/daily` as possible.
+    Sites are sent together as a comma-separated `sites` parameter and the combined rows are split back out per site.
+    Rows only carry a "Site Name", so names are mapped back to IDs using the `/sites` endpoint unless a mapping is given.
+
+    Attributes
+    ----------
+    ENDPOINT: str, static, readonly
+        The endpoint used to make requests to the API. Do not change this.
+    site_ids: list[int], readonly
+        The IDs of the sites this object handles, without duplicates.
+    date: datetime
+        The day requests should be made for. Strips hours, minutes, seconds, and microseconds on assignment.
+    page_size: int
+        The number of rows requested per page. Defaults to `MAX_PAGE_SIZE` so most batches need a single call.
+    max_sites_per_call: int
+        The most site IDs sent in one call, to keep request URLs within server limits.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    dropped_rows: int, readonly
+        The number of rows excluded by the last `send()`, either faulty or not from a requested site.
+
+    Methods
+    -------
+    send() -> `dict[int, list[TrafficObservation]]`
+        Fetches all sites and returns their observations keyed by site ID. Can raise errors.
+    fill_sites(sites: list[Site]) -> None
+        Fetches all sites and loads the observations directly into the given `Site` objects.
+    """
+
+    ENDPOINT = DailyReportRequest.ENDPOINT
+
+    _site_ids: list[int]
+    _date: datetime
+
+    @property
+    def site_ids(self) -> list[int]:
+        return self._site_ids.copy()
+
+    @property
+    def date(self) -> datetime:
+        return self._date
+
+    @date.setter
+    def date(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to date")
+        self._date = new.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def __init__(
+        self,
+        site_ids: list[int],
+        date: datetime,
+        site_names: dict[int, str] | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_sites_per_call: int = 100,
+        transport: WebTRISTransport | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        site_ids : list[int]
+            The sites to fetch.
+        date : datetime
+            The day to fetch.
+        site_names : dict[int, str] | None
+            The "Site Name" each site's rows are reported under. Looked up with `SitesRequest` when not given.
+        page_size : int
+            The number of rows requested per page.
+        max_sites_per_call : int
+            The most site IDs sent in one call.
+        transport : WebTRISTransport | None
+            The pooled transport to send requests through.
+        """
+        if any(not isinstance(site_id, int) for site_id in site_ids):
+            raise TypeError("Cannot assign non-int to site_ids")
+        if not isinstance(page_size, int) or page_size <= 0:
+            raise ValueError("Cannot assign non-int/<=0 to page_size")
+        if not isinstance(max_sites_per_call, int) or max_sites_per_call <= 0:
+            raise ValueError("Cannot assign non-int/<=0 to max_sites_per_call")
+        self._site_ids = list(dict.fromkeys(site_ids))
+        self.date = date
+        self.site_names = site_names
+        self.page_size = page_size
+        self.max_sites_per_call = max_sites_per_call
+        self.transport = transport if transport is not None else get_default_transport()
+        self._dropped_rows = 0
+
+    @property
+    def dropped_rows(self) -> int:
+        return self._dropped_rows
+
+    def _resolve_site_ids(self) -> dict[str, int]:
+        """
+        Builds the mapping of reported "Site Name" to site ID, calling `/sites` if no names were given.
+        """
+        if self.site_names is not None:
+            return {name: site_id for site_id, name in self.site_names.items()}
+        by_name: dict[str, int] = {}
+        for info in SitesRequest(self._site_ids, transport=self.transport).send():
+            # Report rows use the short description (i.e. "M25/4876A") as the site name
+            by_name.setdefault(info.name, info.site_id)
+            by_name[info.description] = info.site_id
+        return by_name
+
+    def send(self) -> dict[int, list["TrafficObservation"]]:
+        """
+        Fetches the day for every site, following pages until the API runs out.
+
+        Returns
+        -------
+        dict[int, list[TrafficObservation]]
+            Observations keyed by site ID. Every requested site has an entry, empty if no data was returned.
+            Rows with a "Site Name" that cannot be mapped to a requested site are excluded, as are faulty rows.
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised in the case that a fetch does not return a res.ok
+        ValueError
+            Raised if "Rows" not in a returned data dictionary
+        """
+        self._dropped_rows = 0
+        site_rows: dict[int, list[dict]] = {site_id: [] for site_id in self._site_ids}
+        if not self._site_ids:
+            return {}
+        by_name = self._resolve_site_ids()
+        for i in range(0, len(self._site_ids), self.max_sites_per_call):
+            chunk = self._site_ids[i : i + self.max_sites_per_call]
+            for rows in _iter_report_pages(
+                self.transport,
+                ",".join(str(site_id) for site_id in chunk),
+                self.date,
+                self.date,
+                self.page_size,
+            ):
+                for row in rows:
+                    site_id = by_name.get(row.get("Site Name"))
+                    if site_id not in site_rows:
+                        self._dropped_rows += 1
+                        continue
+                    site_rows[site_id].append(row)
+        results: dict[int, list[TrafficObservation]] = {}
+        for site_id, rows in site_rows.items():
+            # Silently exclude any faulty observations not containing full amounts of data
+            store, dropped = ObservationStore.from_rows(site_id, rows)
+            self._dropped_rows += dropped
+            results[site_id] = list(store)
+        return results
+
+    def fill_sites(self, sites: list["Site"]) -> None:
+        """
+        Fetches every site and loads each one's observations directly into the matching `Site`, without further API calls.
+
+        Parameters
+        ----------
+        sites : list[Site]
+            The sites to fill. Each must be one of `site_ids` and on the same day as `date`.
+
+        Raises
+        ------
+        ValueError
+            If a site is not part of this request or is on a different day
+        """
+        for site in sites:
+            if site.site_id not in self._site_ids:
+                raise ValueError(f"Site {site.site_id} is not part of this request")
+            if site.date.date() != self.date.date():
+                raise ValueError(f"Site {site.site_id} is not on {self.date.date()}")
+        results = self.send()
+        for site in sites:
+            site.set_observations(results[site.site_id])
+
+    def __repr__(self):
+        return f"MultiSiteDailyReportRequest(site_ids={self._site_ids}, date={self.date.strftime('%Y-%m-%d')})"
+
+    def __str__(self):
+        return f"MultiSiteDailyReportRequest for {len(self._site_ids)} sites on {self.date.strftime('%Y-%m-%d')}"
+
+
+class _SummaryReportRequest(ReportRequest, ABC):
+    """
+    Shared implementation of `MonthlyReportRequest` and `AnnualReportRequest`, which both page one row per period
+    for one site and parse the rows into `ReportSummary` subclasses.
+    """
+
+    _site_id: int
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @site_id.setter
+    def site_id(self, new: int) -> None:
+        if not isinstance(new, int):
+            raise TypeError("Cannot assign non-int to site_id")
+        self._site_id = new
+
+    @property
+    def page_size(self) -> int:
+        return self._page_size
+
+    @page_size.setter
+    def page_size(self, new: int) -> None:
+        if not isinstance(new, int) or not 0 < new <= MAX_PAGE_SIZE:
+            raise ValueError(f"Cannot assign non-int/<=0/>{MAX_PAGE_SIZE} to page_size")
+        self._page_size = new
+
+    @property
+    def dropped_rows(self) -> int:
+        return self._dropped_rows
+
+    @abstractmethod
+    def _query_range(self) -> tuple[datetime, datetime]:
+        """
+        Gets the first and last day sent to the API.
+        """
+
+    @abstractmethod
+    def _summary_type(self) -> type["ReportSummary"]:
+        """
+        Gets the class each row is parsed into.
+        """
+
+    def _parse_rows(self, rows: list[dict]) -> list["ReportSummary"]:
+        """
+        Parses report rows into summaries in chronological order, excluding faulty rows.
+        """
+        summaries = []
+        for row in rows:
+            try:
+                summaries.append(self._summary_type().from_dict(self.site_id, row))
+            except (KeyError, TypeError, ValueError):
+                self._dropped_rows += 1
+        summaries.sort()
+        return summaries
+
+    def send(self) -> list["ReportSummary"]:
+        """
+        Requests every page of the report and returns the summaries.
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised in the case that a fetch does not return a res.ok
+        ValueError
+            Raised if "Rows" not in a returned data dictionary
+        """
+        self._dropped_rows = 0
+        start, end = self._query_range()
+        rows: list[dict] = []
+        for page in _iter_report_pages(
+            self.transport,
+            str(self.site_id),
+            start,
+            end,
+            self.page_size,
+            endpoint=self.ENDPOINT,
+        ):
+            rows.extend(page)
+        return self._parse_rows(rows)
+
+
+class MonthlyReportRequest(_SummaryReportRequest):
+    """
+    A class to request daily totals for one site over whole months from the `/reports/monthly` endpoint.
+    Each day is one row instead of the 96 fifteen minute rows of `/reports/daily`, so long ranges move far less data.
+    Make a request by calling `.send()`
+
+    Attributes
+    ----------
+    ENDPOINT: str, static, readonly
+        The endpoint used to make requests to the API. Do not change this.
+    site_id: int
+        The ID of the site this object handles.
+    start_month: datetime
+        The first month of the range. Set to midnight on the first of the month on assignment.
+    end_month: datetime
+        The last month of the range, inclusive. Set to midnight on the first of the month on assignment.
+    page_size: int
+        The number of rows requested per page.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    dropped_rows: int, readonly
+        The number of faulty rows excluded by the last `send()`.
+
+    Methods
+    -------
+    send() -> `list[DailySummary]`
+        Fetches the report and returns one summary per day in chronological order. Can raise errors.
+    """
+
+    ENDPOINT = f"{ReportRequest.ENDPOINT}/monthly"
+
+    def _summary_type(self) -> type["ReportSummary"]:
+        return DailySummary
+
+    _start_month: datetime
+
+    @property
+    def start_month(self) -> datetime:
+        return self._start_month
+
+    @start_month.setter
+    def start_month(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to start_month")
+        self._start_month = MonthlySummary._normalise(new)
+
+    _end_month: datetime
+
+    @property
+    def end_month(self) -> datetime:
+        return self._end_month
+
+    @end_month.setter
+    def end_month(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to end_month")
+        self._end_month = MonthlySummary._normalise(new)
+
+    def __init__(
+        self,
+        site_id: int,
+        start_month: datetime,
+        end_month: datetime,
+        page_size: int = MAX_PAGE_SIZE,
+        transport: WebTRISTransport | None = None,
+    ):
+        self.site_id = site_id
+        self.start_month = start_month
+        self.end_month = end_month
+        if self.end_month < self.start_month:
+            raise ValueError("Cannot request a range with end_month before start_month")
+        self.page_size = page_size
+        self.transport = transport if transport is not None else get_default_transport()
+        self._dropped_rows = 0
+
+    def _query_range(self) -> tuple[datetime, datetime]:
+        return self.start_month, MonthlySummary._next(self.end_month) - timedelta(
+            days=1
+        )
+
+    def __repr__(self):
+        return f"MonthlyReportRequest(site_id={self.site_id}, start_month={self.start_month.strftime('%Y-%m')}, end_month={self.end_month.strftime('%Y-%m')})"
+
+    def __str__(self):
+        return f"MonthlyReportRequest for site {self.site_id} from {self.start_month.strftime('%Y-%m')} to {self.end_month.strftime('%Y-%m')}"
+
+
+class AnnualReportRequest(_SummaryReportRequest):
+    """
+    A class to request monthly totals for one site over whole years from the `/reports/annual` endpoint.
+    Each month is one row, so a year is 12 rows instead of about 35,000 from `/reports/daily`.
+    Make a request by calling `.send()`
+
+    Attributes
+    ----------
+    ENDPOINT: str, static, readonly
+        The endpoint used to make requests to the API. Do not change this.
+    site_id: int
+        The ID of the site this object handles.
+    start_year: int
+        The first year of the range.
+    end_year: int
+        The last year of the range, inclusive.
+    page_size: int
+        The number of rows requested per page.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    dropped_rows: int, readonly
+        The number of faulty rows excluded by the last `send()`.
+
+    Methods
+    -------
+    send() -> `list[MonthlySummary]`
+        Fetches the report and returns one summary per month in chronological order. Can raise errors.
+    """
+
+    ENDPOINT = f"{ReportRequest.ENDPOINT}/annual"
+
+    def _summary_type(self) -> type["ReportSummary"]:
+        return MonthlySummary
+
+    _start_year: int
+
+    @property
+    def start_year(self) -> int:
+        return self._start_year
+
+    @start_year.setter
+    def start_year(self, new: int) -> None:
+        if not isinstance(new, int) or not 1970 <= new <= 9999:
+            raise ValueError("Cannot assign non-int/<1970/>9999 to start_year")
+        self._start_year = new
+
+    _end_year: int
+
+    @property
+    def end_year(self) -> int:
+        return self._end_year
+
+    @end_year.setter
+    def end_year(self, new: int) -> None:
+        if not isinstance(new, int) or not 1970 <= new <= 9999:
+            raise ValueError("Cannot assign non-int/<1970/>9999 to end_year")
+        self._end_year = new
+
+    def __init__(
+        self,
+        site_id: int,
+        start_year: int,
+        end_year: int,
+        page_size: int = MAX_PAGE_SIZE,
+        transport: WebTRISTransport | None = None,
+    ):
+        self.site_id = site_id
+        self.start_year = start_year
+        self.end_year = end_year
+        if self.end_year < self.start_year:
+            raise ValueError("Cannot request a range with end_year before start_year")
+        self.page_size = page_size
+        self.transport = transport if transport is not None else get_default_transport()
+        self._dropped_rows = 0
+
+    def _query_range(self) -> tuple[datetime, datetime]:
+        return datetime(self.start_year, 1, 1), datetime(self.end_year, 12, 31)
+
+    def __repr__(self):
+        return f"AnnualReportRequest(site_id={self.site_id}, start_year={self.start_year}, end_year={self.end_year})"
+
+    def __str__(self):
+        return f"AnnualReportRequest for site {self.site_id} from {self.start_year} to {self.end_year}"
+
+
+# One shared midnight datetime per day seen, forgetting the earliest interned past the bound
+_MAX_INTERNED_DAYS = 4096
+_INTERNED_DAYS: dict[datetime, datetime] = {}
+_INTERNED_DAYS_LOCK = threading.Lock()
+
+
+class TrafficObservation:
+    """
+    A class to represent a fifteen minute measurement of traffic data from the WebTRIS API.
+
+
+    Attributes
+    ----------
+    site_name: str
+        The site name returned in WebTRIS API.
+    site_id: int
+        The site name returned in WebTRIS API.
+    end_datetime: datetime
+        A datetime.datetime object representing the ending time of the observation. Created on access. Units smaller than minute are dropped.
+    date: datetime
+        A datetime.datetime object representing the date of the observation. Hours, minutes, seconds, and microseconds are 0.
+        The same object is shared by every observation on that day.
+    end_time_minutes_in_day: int
+        An int representing how many minutes into the day the observation is. For example, 01:15:00 would be 75.
+    average_speed: float
+        A float containing the average speed in miles per hour (mph) of vehicles in the observation time.
+    vehicle_count: int
+        The int count of all vehicles passing through the observation point.
+
+    Raises
+    ------
+    ValueError
+        If trying to initialize with no/empty `name`
+    ValueError
+        If trying to initialize with no/<=0 `id`
+    ValueError
+        If trying to initialize with no/<=0 `end_time`
+    ValueError
+        If trying to initialize with no/<0 `average_speed`
+    ValueError
+        If trying to initialize with no/<0 `vehicle_count`
+    """
+
+    @classmethod
+    def from_dict(cls, site_id: int, data: dict) -> "TrafficObservation":
+        """
+        Creates a new `FifteenMinutesObservation` object using key-value dictionary in the format provided by WebTRIS API.
+
+        Parameters
+        ----------
+        data : dict
+            Data in the format:
+            "Site Name": "7001/1",
+            "Report Date": "2025-03-07T00:00:00",
+            "Time Period Ending": "00:14:00",
+            "Avg mph": "66",
+            "Total Volume": "7"
+
+        Raises
+        ------
+        ValueError
+            If trying to initialize with no/empty "Time Period Ending"
+        ValueError
+            If trying to initialize with non-numeric "Avg mph" or "Total Volume"
+
+        Returns
+        -------
+        DailyReportRequest.TrafficObservation
+            A new `FifteenMinutesObservation` containing the data given.
+        """
+        dt = datetime.fromisoformat(data["Report Date"])
+        if "Time Period Ending" not in data:
+            raise ValueError(
+                "Cannot construct `TrafficObservation` from dict without valid timestamp"
+            )
+
+        time: list[int] = [
+            int(n) for n in data["Time Period Ending"].split(":")
+        ]  # Split "00:11:22" time into int array of [0, 11, 22] for [hour, minute, second]
+        dt = dt.replace(
+            hour=time[0], minute=time[1], second=time[2], microsecond=0
+        )  # Set time of datetime to time given in "Time Period Ending"
+        # print(f"making w data: {data}")
+        return cls(
+            site_name=data.get("Site Name"),
+            site_id=site_id,
+            end_time=dt,
+            average_speed=float(data.get("Avg mph")),
+            vehicle_count=int(data.get("Total Volume")),
+        )
+
+    # Internal storage of properties. Slots avoid a per-object __dict__, and the end time is kept as the
+    # day (shared between every observation on that day) and an int minute of the day
+    __slots__ = (
+        "_average_speed",
+        "_day",
+        "_minute",
+        "_site_id",
+        "_site_name",
+        "_vehicle_count",
+    )
+    _site_name: str
+    _site_id: int
+    _day: datetime
+    _minute: int
+    _average_speed: float
+    _vehicle_count: int
+
+    @staticmethod
+    def _intern_day(day: datetime) -> datetime:
+        """
+        Returns the one shared midnight `datetime` for a day so that observations do not each hold their own.
+        At most `_MAX_INTERNED_DAYS` days are kept; a forgotten day is interned again as a new object.
+        """
+        interned = _INTERNED_DAYS.get(day)
+        if interned is not None:
+            return interned
+        with _INTERNED_DAYS_LOCK:
+            interned = _INTERNED_DAYS.setdefault(day, day)
+            if len(_INTERNED_DAYS) > _MAX_INTERNED_DAYS:
+                del _INTERNED_DAYS[next(iter(_INTERNED_DAYS))]
+            return interned
+
+    @classmethod
+    def _from_parts(
+        cls,
+        site_name: str,
+        site_id: int,
+        day: datetime,
+        minute: int,
+        average_speed: float,
+        vehicle_count: int,
+    ) -> "TrafficObservation":
+        """
+        Creates an observation from already validated parts without checking them again. `day` must be a midnight `datetime`.
+        """
+        observation = cls.__new__(cls)
+        observation._site_name = site_name
+        observation._site_id = site_id
+        observation._day = TrafficObservation._intern_day(day)
+        observation._minute = minute
+        observation._average_speed = average_speed
+        observation._vehicle_count = vehicle_count
+        return observation
+
+    # Exposed read-only public properties
+    @property
+    def site_name(self) -> str:
+        return self._site_name
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @property
+    def end_datetime(self) -> datetime:
+        # Built on demand from the shared day and minute of the day
+        return self._day.replace(hour=self._minute // 60, minute=self._minute % 60)
+
+    @property
+    def _observation_end_datetime(self) -> datetime:
+        return self.end_datetime
+
+    @_observation_end_datetime.setter
+    def _observation_end_datetime(self, end_time: datetime) -> None:
+        self._day = TrafficObservation._intern_day(
+            end_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        )
+        self._minute = end_time.hour * 60 + end_time.minute
+
+    @property
+    def date(self) -> datetime:
+        return self._day
+
+    @property
+    def end_time_minutes_in_day(self) -> int:
+        return self._minute
+
+    @property
+    def average_speed(self) -> float:
+        return self._average_speed
+
+    @property
+    def vehicle_count(self) -> int:
+        return self._vehicle_count
+
+    def __init__(
+        self,
+        site_name: str,
+        site_id: int,
+        end_time: datetime,
+        average_speed: float,
+        vehicle_count: int,
+    ):
+        if not isinstance(site_name, str) or site_name == "":
+            raise ValueError("Cannot initialize TrafficObservation with no/empty name!")
+        self._site_name = site_name
+
+        if not isinstance(site_id, int) or site_id <= 0:
             raise ValueError(
                 "Cannot initialize TrafficObservation with no/<=0 site_id!"
             )
         self._site_id = site_id
 
-        if not isinstance(end_time, datetime) or end_time.timestamp() <= 0:
-            raise ValueError(
-                "Cannot initialize TrafficObservation with no/<=0 end_time!"
-            )
-        self._observation_end_datetime = end_time
+        if not isinstance(end_time, datetime) or end_time.timestamp() <= 0:
+            raise ValueError(
+                "Cannot initialize TrafficObservation with no/<=0 end_time!"
+            )
+        self._observation_end_datetime = end_time
+
+        if not isinstance(average_speed, (int, float)) or average_speed < 0:
+            raise ValueError(
+                "Cannot initialize TrafficObservation with no/<0 average_speed!"
+            )
+        self._average_speed = average_speed
+
+        if not isinstance(vehicle_count, int) or vehicle_count < 0:
+            raise ValueError(
+                "Cannot initialize TrafficObservation with no/<0 vehicle_count!"
+            )
+        self._vehicle_count = vehicle_count
+
+    def __lt__(self, other: "TrafficObservation") -> bool:
+        """
+        Less-than operator for TrafficObservation. Compares based on end_datetime.
+
+        Parameters
+        ----------
+        other : TrafficObservation
+            The other observation to compare to
+
+        Returns
+        -------
+        bool
+            True if this observation's end_datetime is less than the other observation's end_datetime, False otherwise
+        """
+        return (self._day, self._minute) < (other._day, other._minute)
+
+    def __gt__(self, other: "TrafficObservation") -> bool:
+        """
+        Greater-than operator for TrafficObservation. Compares based on end_datetime.
+
+        Parameters
+        ----------
+        other : TrafficObservation
+            The other observation to compare to
+
+        Returns
+        bool
+            True if this observation's end_datetime is greater than the other observation's end_datetime, False otherwise
+        """
+        return (self._day, self._minute) > (other._day, other._minute)
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Equality operator for TrafficObservation. Compares based on end_datetime.
+
+        Parameters
+        ----------
+        other : object
+            The other observation to compare to
+
+        Returns
+        -------
+        bool
+            True if this observation's end_datetime is equal to the other observation's end_datetime, False otherwise
+        """
+        if isinstance(other, TrafficObservation):
+            return self._day == other._day and self._minute == other._minute
+        return self.end_datetime == other.end_datetime
+
+    def __repr__(self) -> str:
+        return f"TrafficObservation(site_name='{self.site_name}', site_id={self.site_id}, end_time='{self.end_datetime.strftime('%Y-%m-%d %H:%M:%S')}', average_speed={self.average_speed}, vehicle_count={self.vehicle_count})"
+
+    def __str__(self) -> str:
+        return f"Observation at site {self.site_name} (ID {self.site_id}) on {self.end_datetime.strftime('%Y-%m-%d %H:%M:%S')}: average speed {self.average_speed} mph, vehicle count {self.vehicle_count}"
+
+
+class ReportSummary(ABC):
+    """
+    A class to represent the total traffic at a site over a period longer than fifteen minutes.
+    Subclassed by `DailySummary` and `MonthlySummary`, which differ in the length of the period.
+
+    Attributes
+    ----------
+    site_name: str
+        The site name returned in WebTRIS API.
+    site_id: int
+        The site ID this summary is for.
+    period_start: datetime
+        Midnight at the start of the period.
+    period_end: datetime
+        Midnight at the start of the next period.
+    average_speed: float
+        The average speed in miles per hour (mph) of vehicles in the period.
+    vehicle_count: int
+        The int count of all vehicles passing through the site in the period.
+
+    Raises
+    ------
+    ValueError
+        If trying to initialize with no/empty `site_name`
+    ValueError
+        If trying to initialize with no/<=0 `site_id`
+    TypeError
+        If trying to initialize with a non-datetime `period_start`
+    ValueError
+        If trying to initialize with no/<0 `average_speed`
+    ValueError
+        If trying to initialize with no/<0 `vehicle_count`
+    """
+
+    @classmethod
+    def from_dict(cls, site_id: int, data: dict) -> "ReportSummary":
+        """
+        Creates a new summary using a key-value dictionary in the format of a `/reports/monthly` or `/reports/annual` row.
+
+        Parameters
+        ----------
+        site_id : int
+            The site the row is for
+        data : dict
+            Data in the format:
+            "Site Name": "7001/1",
+            "Report Date": "2025-03-07T00:00:00",
+            "Avg mph": "66",
+            "Total Volume": "15437"
+
+        Raises
+        ------
+        KeyError
+            If "Report Date" is missing
+        ValueError
+            If any field is invalid
+
+        Returns
+        -------
+        ReportSummary
+            A new summary of the subclass it is called on
+        """
+        return cls(
+            site_name=data.get("Site Name"),
+            site_id=site_id,
+            period_start=datetime.fromisoformat(data["Report Date"]),
+            average_speed=float(data.get("Avg mph")),
+            vehicle_count=int(data.get("Total Volume")),
+        )
+
+    __slots__ = (
+        "_average_speed",
+        "_period_start",
+        "_site_id",
+        "_site_name",
+        "_vehicle_count",
+    )
+    _site_name: str
+    _site_id: int
+    _period_start: datetime
+    _average_speed: float
+    _vehicle_count: int
+
+    @staticmethod
+    @abstractmethod
+    def _normalise(when: datetime) -> datetime:
+        """
+        Gets the start of the period holding `when`.
+        """
+
+    @staticmethod
+    @abstractmethod
+    def _next(period_start: datetime) -> datetime:
+        """
+        Gets the start of the period after the one starting at `period_start`.
+        """
+
+    @property
+    def site_name(self) -> str:
+        return self._site_name
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @property
+    def period_start(self) -> datetime:
+        return self._period_start
+
+    @property
+    def period_end(self) -> datetime:
+        return self._next(self._period_start)
+
+    @property
+    def average_speed(self) -> float:
+        return self._average_speed
+
+    @property
+    def vehicle_count(self) -> int:
+        return self._vehicle_count
+
+    def __init__(
+        self,
+        site_name: str,
+        site_id: int,
+        period_start: datetime,
+        average_speed: float,
+        vehicle_count: int,
+    ):
+        name = type(self).__name__
+        if not isinstance(site_name, str) or site_name == "":
+            raise ValueError(f"Cannot initialize {name} with no/empty name!")
+        self._site_name = site_name
+
+        if not isinstance(site_id, int) or site_id <= 0:
+            raise ValueError(f"Cannot initialize {name} with no/<=0 site_id!")
+        self._site_id = site_id
+
+        if not isinstance(period_start, datetime):
+            raise TypeError(f"Cannot initialize {name} with non-datetime period_start!")
+        self._period_start = self._normalise(period_start)
 
-        if not isinstance(average_speed, (int, float)) or average_speed < 0:
-            raise ValueError(
-                "Cannot initialize TrafficObservation with no/<0 average_speed!"
-            )
+        if not isinstance(average_speed, (int, float)) or not average_speed >= 0:
+            raise ValueError(f"Cannot initialize {name} with no/<0 average_speed!")
         self._average_speed = average_speed
 
         if not isinstance(vehicle_count, int) or vehicle_count < 0:
-            raise ValueError(
-                "Cannot initialize TrafficObservation with no/<0 vehicle_count!"
-            )
+            raise ValueError(f"Cannot initialize {name} with no/<0 vehicle_count!")
         self._vehicle_count = vehicle_count
 
-    def __lt__(self, other: "TrafficObservation") -> bool:
+    def __lt__(self, other: "ReportSummary") -> bool:
+        return self._period_start < other._period_start
+
+    def __gt__(self, other: "ReportSummary") -> bool:
+        return self._period_start > other._period_start
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ReportSummary):
+            return NotImplemented
+        return (
+            type(self) is type(other)
+            and self._site_id == other._site_id
+            and self._period_start == other._period_start
+        )
+
+    def __hash__(self) -> int:
+        return hash((type(self), self._site_id, self._period_start))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(site_name='{self.site_name}', site_id={self.site_id}, period_start='{self.period_start.strftime('%Y-%m-%d')}', average_speed={self.average_speed}, vehicle_count={self.vehicle_count})"
+
+
+class DailySummary(ReportSummary):
+    """
+    A `ReportSummary` of one day, as returned by `MonthlyReportRequest`. `period_start` is midnight of the day.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _normalise(when: datetime) -> datetime:
+        return when.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _next(period_start: datetime) -> datetime:
+        return period_start + timedelta(days=1)
+
+    def __str__(self) -> str:
+        return f"Summary of site {self.site_name} (ID {self.site_id}) on {self.period_start.strftime('%Y-%m-%d')}: average speed {self.average_speed} mph, vehicle count {self.vehicle_count}"
+
+
+class MonthlySummary(ReportSummary):
+    """
+    A `ReportSummary` of one calendar month, as returned by `AnnualReportRequest`. `period_start` is midnight on the first of the month.
+    """
+
+    __slots__ = ()
+
+    @staticmethod
+    def _normalise(when: datetime) -> datetime:
+        return when.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def _next(period_start: datetime) -> datetime:
+        if period_start.month == 12:
+            return period_start.replace(year=period_start.year + 1, month=1)
+        return period_start.replace(month=period_start.month + 1)
+
+    def __str__(self) -> str:
+        return f"Summary of site {self.site_name} (ID {self.site_id}) in {self.period_start.strftime('%Y-%m')}: average speed {self.average_speed} mph, vehicle count {self.vehicle_count}"
+
+
+_EPOCH_ORDINAL = datetime(1970, 1, 1).toordinal()
+
+
+def _parse_report_date(text) -> int:
+    """
+    Parses a "Report Date" into a day ordinal, or 0 if it is not a date.
+    """
+    try:
+        return datetime.fromisoformat(text).toordinal()
+    except (ValueError, TypeError):
+        return 0
+
+
+def _parse_time_period_ending(text) -> int:
+    """
+    Parses a "Time Period Ending" (i.e. "00:14:00") into a minute of the day, or -1 if it is not a time.
+    """
+    try:
+        hour, minute, _ = (int(n) for n in text.split(":"))
+    except (ValueError, TypeError, AttributeError):
+        return -1
+    if not (0 <= hour < 24 and 0 <= minute < 60):
+        return -1
+    return hour * 60 + minute
+
+
+def _parse_column(values: list, dtype: type, invalid) -> np.ndarray:
+    """
+    Converts a column of API values to an array in one call. If any value cannot be converted,
+    the values are converted one by one instead and the faulty ones are set to `invalid`.
+    """
+    try:
+        return np.array(values, dtype=dtype)
+    except (ValueError, TypeError, OverflowError):
+        convert = float if dtype is np.float64 else int
+        parsed = []
+        for value in values:
+            try:
+                parsed.append(convert(value))
+            except (ValueError, TypeError, OverflowError):
+                parsed.append(invalid)
+        return np.array(parsed, dtype=dtype)
+
+
+class ObservationStore:
+    """
+    A class to hold the observations of one site in columns rather than as a list of objects.
+    Each row costs 18 bytes (day, minute of day, speed, and volume) and aggregates can be computed with vectorized operations.
+    Behaves as a mutable sequence of `TrafficObservation`: objects are only created when rows are indexed or iterated over.
+
+    Attributes
+    ----------
+    site_id: int, readonly
+        The site every row belongs to.
+    site_name: str | None, readonly
+        The site name reported by the API, or None if there are no rows.
+    day: numpy.ndarray, readonly
+        The proleptic Gregorian ordinal (`datetime.toordinal()`) of each row's day, as int32.
+    minute: numpy.ndarray, readonly
+        The minute of the day each row's observation ends at, as int16.
+    speed: numpy.ndarray, readonly
+        The average speed of each row in mph, as float64.
+    volume: numpy.ndarray, readonly
+        The vehicle count of each row, as int32.
+    version: int, readonly
+        Increased whenever rows are changed, so derived data can tell when it is out of date.
+    nbytes: int, readonly
+        The bytes held by the columns.
+    """
+
+    @classmethod
+    def from_observations(
+        cls,
+        observations: Iterable["TrafficObservation"],
+        site_id: int | None = None,
+    ) -> "ObservationStore":
         """
-        Less-than operator for TrafficObservation. Compares based on end_datetime.
+        Creates a new store holding the given observations in the same order.
 
         Parameters
         ----------
-        other : TrafficObservation
-            The other observation to compare to
+        observations : Iterable[TrafficObservation]
+            The observations to store. Must all be from one site.
+        site_id : int | None
+            The site of the store. Taken from the observations if not given.
+
+        Raises
+        ------
+        ValueError
+            If the observations are from more than one site, or a different site to `site_id`
 
         Returns
         -------
-        bool
-            True if this observation's end_datetime is less than the other observation's end_datetime, False otherwise
+        ObservationStore
+            A new store containing the data given
         """
-        return self.end_datetime < other.end_datetime
+        if isinstance(observations, ObservationStore):
+            if site_id is not None and observations.site_id != site_id:
+                raise ValueError("Cannot store observations from more than one site")
+            return observations.copy()
+        observations = list(observations)
+        if site_id is None:
+            if not observations:
+                raise ValueError(
+                    "Cannot create an empty ObservationStore without site_id"
+                )
+            site_id = observations[0].site_id
+        if any(o.site_id != site_id for o in observations):
+            raise ValueError("Cannot store observations from more than one site")
+        n = len(observations)
+        return cls(
+            site_id,
+            observations[0].site_name if observations else None,
+            np.fromiter(
+                (o.end_datetime.toordinal() for o in observations), np.int32, n
+            ),
+            np.fromiter((o.end_time_minutes_in_day for o in observations), np.int16, n),
+            np.fromiter((o.average_speed for o in observations), np.float64, n),
+            np.fromiter((o.vehicle_count for o in observations), np.int32, n),
+        )
 
-    def __gt__(self, other: "TrafficObservation") -> bool:
+    @classmethod
+    def from_rows(
+        cls, site_id: int, rows: list[dict]
+    ) -> tuple["ObservationStore", int]:
         """
-        Greater-than operator for TrafficObservation. Compares based on end_datetime.
+        Parses the "Rows" of a `/reports/daily` response for one site in a single pass, without creating `TrafficObservation` objects.
+        Rows are checked the same way as `TrafficObservation.from_dict()`, but all at once after parsing, and faulty rows are dropped.
+        Rows are sorted into chronological order, unless they already are.
 
         Parameters
         ----------
-        other : TrafficObservation
-            The other observation to compare to
+        site_id : int
+            The site the rows belong to
+        rows : list[dict]
+            The rows as returned by the API
 
         Returns
-        bool
-            True if this observation's end_datetime is greater than the other observation's end_datetime, False otherwise
+        -------
+        tuple[ObservationStore, int]
+            The parsed rows, and the number of faulty rows that were dropped
         """
-        return self.end_datetime > other.end_datetime
+        n = len(rows)
+        site_names = [row.get("Site Name") for row in rows]
+        speeds = [row.get("Avg mph") for row in rows]
+        volumes = [row.get("Total Volume") for row in rows]
+        report_dates = [row.get("Report Date") for row in rows]
+        end_times = [row.get("Time Period Ending") for row in rows]
+        # Every row of a report shares its "Report Date", and there are only 96 "Time Period Ending" values, so each is parsed once
+        days = {text: _parse_report_date(text) for text in set(report_dates)}
+        minutes = {text: _parse_time_period_ending(text) for text in set(end_times)}
+        day = np.fromiter((days[text] for text in report_dates), np.int32, n)
+        minute = np.fromiter((minutes[text] for text in end_times), np.int16, n)
+
+        speed = _parse_column(speeds, np.float64, np.nan)
+        volume = _parse_column(volumes, np.int64, -1)
+        valid = (
+            (day > _EPOCH_ORDINAL)
+            & (minute >= 0)
+            & (speed >= 0)  # False for NaN
+            & (volume >= 0)
+            & np.fromiter(
+                (isinstance(name, str) and name != "" for name in site_names),
+                bool,
+                n,
+            )
+        )
+        if site_id <= 0:
+            valid[:] = False
+        dropped = n - int(np.count_nonzero(valid))
+        if dropped:
+            day, minute, speed, volume = (
+                day[valid],
+                minute[valid],
+                speed[valid],
+                volume[valid],
+            )
+        first = int(np.argmax(valid)) if len(day) else None
+        store = cls(
+            site_id,
+            site_names[first] if first is not None else None,
+            day,
+            minute,
+            speed,
+            volume,
+        )
+        store.sort()
+        return store, dropped
 
-    def __eq__(self, other: object) -> bool:
+    def __init__(
+        self,
+        site_id: int,
+        site_name: str | None,
+        day: np.ndarray,
+        minute: np.ndarray,
+        speed: np.ndarray,
+        volume: np.ndarray,
+    ):
+        if not len(day) == len(minute) == len(speed) == len(volume):
+            raise ValueError(
+                "Cannot initialize ObservationStore with columns of different lengths!"
+            )
+        self._site_id = site_id
+        self._site_name = site_name
+        self._day = np.asarray(day, dtype=np.int32)
+        self._minute = np.asarray(minute, dtype=np.int16)
+        self._speed = np.asarray(speed, dtype=np.float64)
+        self._volume = np.asarray(volume, dtype=np.int32)
+        self._version = 0
+        self._keys: np.ndarray | None = None
+        self._keys_version = -1
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @property
+    def site_name(self) -> str | None:
+        return self._site_name
+
+    @property
+    def day(self) -> np.ndarray:
+        return self._day
+
+    @property
+    def minute(self) -> np.ndarray:
+        return self._minute
+
+    @property
+    def speed(self) -> np.ndarray:
+        return self._speed
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._volume
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            self._day.nbytes
+            + self._minute.nbytes
+            + self._speed.nbytes
+            + self._volume.nbytes
+        )
+
+    def _observation(self, i: int) -> "TrafficObservation":
         """
-        Equality operator for TrafficObservation. Compares based on end_datetime.
+        Creates the `TrafficObservation` for row `i`.
+        """
+        return TrafficObservation._from_parts(
+            self._site_name,
+            self._site_id,
+            datetime.fromordinal(int(self._day[i])),
+            int(self._minute[i]),
+            float(self._speed[i]),
+            int(self._volume[i]),
+        )
+
+    def _time_keys(self) -> np.ndarray:
+        """
+        The minute since day 1 each row ends at, used to order and search rows. Cached until the rows change.
+        """
+        if self._keys is None or self._keys_version != self._version:
+            self._keys = self._day.astype(np.int64) * 1440 + self._minute
+            self._keys_version = self._version
+        return self._keys
+
+    def bisect_right(self, when: datetime) -> int:
+        """
+        Finds the first row ending after `when` with a binary search. Rows must be in chronological order (see `sort()`).
 
         Parameters
         ----------
-        other : object
-            The other observation to compare to
+        when : datetime
+            The time to search for. Units smaller than minutes are ignored, as rows end on whole minutes.
 
         Returns
         -------
-        bool
-            True if this observation's end_datetime is equal to the other observation's end_datetime, False otherwise
+        int
+            The position of the first row ending after `when`, or `len(self)` if there is none
         """
-        return self.end_datetime == other.end_datetime
+        key = when.toordinal() * 1440 + when.hour * 60 + when.minute
+        return int(np.searchsorted(self._time_keys(), key, side="right"))
+
+    def _check_site(self, observation: "TrafficObservation") -> None:
+        if observation.site_id != self._site_id:
+            raise ValueError("Cannot store observations from more than one site")
+        if self._site_name is None:
+            self._site_name = observation.site_name
+
+    def append(self, observation: "TrafficObservation") -> None:
+        """
+        Adds an observation to the end of the store.
+
+        Parameters
+        ----------
+        observation : TrafficObservation
+            The observation to add. Must be from `site_id`.
+        """
+        self.extend([observation])
+
+    def extend(self, observations: Iterable["TrafficObservation"]) -> None:
+        """
+        Adds observations to the end of the store in the order given.
+
+        Parameters
+        ----------
+        observations : Iterable[TrafficObservation]
+            The observations to add. Must be from `site_id`.
+        """
+        other = ObservationStore.from_observations(observations, site_id=self._site_id)
+        if self._site_name is None:
+            self._site_name = other.site_name
+        self._day = np.concatenate((self._day, other._day))
+        self._minute = np.concatenate((self._minute, other._minute))
+        self._speed = np.concatenate((self._speed, other._speed))
+        self._volume = np.concatenate((self._volume, other._volume))
+        self._version += 1
+
+    def sort(self) -> None:
+        """
+        Sorts rows in chronological order. Rows ending at the same time keep their order.
+        Does nothing if the rows are already in order.
+        """
+        key = self._time_keys()
+        if np.all(key[1:] >= key[:-1]):
+            return
+        order = np.argsort(key, kind="stable")
+        self._day = self._day[order]
+        self._minute = self._minute[order]
+        self._speed = self._speed[order]
+        self._volume = self._volume[order]
+        self._version += 1
+
+    def copy(self) -> "ObservationStore":
+        """
+        Returns a copy of the store that does not share columns with this one.
+        """
+        return ObservationStore(
+            self._site_id,
+            self._site_name,
+            self._day.copy(),
+            self._minute.copy(),
+            self._speed.copy(),
+            self._volume.copy(),
+        )
+
+    def __getitem__(
+        self, key: int | slice
+    ) -> "TrafficObservation | list[TrafficObservation]":
+        if isinstance(key, slice):
+            return [self._observation(i) for i in range(*key.indices(len(self)))]
+        n = len(self)
+        if key < -n or key >= n:
+            raise IndexError("ObservationStore index out of range")
+        return self._observation(key % n)
+
+    def __setitem__(self, key: int, observation: "TrafficObservation") -> None:
+        self._check_site(observation)
+        self._day[key] = observation.end_datetime.toordinal()
+        self._minute[key] = observation.end_time_minutes_in_day
+        self._speed[key] = observation.average_speed
+        self._volume[key] = observation.vehicle_count
+        self._version += 1
+
+    def __len__(self) -> int:
+        return len(self._day)
+
+    def __iter__(self) -> Iterator["TrafficObservation"]:
+        for i in range(len(self)):
+            yield self._observation(i)
 
     def __repr__(self) -> str:
-        return f"TrafficObservation(site_name='{self.site_name}', site_id={self.site_id}, end_time='{self.end_datetime.strftime('%Y-%m-%d %H:%M:%S')}', average_speed={self.average_speed}, vehicle_count={self.vehicle_count})"
+        return f"ObservationStore(site_id={self.site_id}, site_name='{self.site_name}', rows={len(self)})"
+
+
+class HourlyIndex:
+    """
+    A class to hold per hour aggregates of an `ObservationStore`, so hourly queries do not scan every row.
+    Built in one pass over the store. Arrays are indexed by hour (0-23) and cannot be changed.
+
+    Attributes
+    ----------
+    version: int, readonly
+        The `ObservationStore.version` the index was built from.
+    weighted_speed: numpy.ndarray, readonly
+        The sum of average speed multiplied by vehicle count of each hour's observations.
+    vehicle_count: numpy.ndarray, readonly
+        The total vehicle count of each hour, as int64.
+    record_count: numpy.ndarray, readonly
+        The number of observations in each hour.
+    average_speed: numpy.ndarray, readonly
+        The average speed of each hour in mph, weighted by vehicle count. 0 for hours without vehicles.
+    peak_hour: int, readonly
+        The earliest hour with the most vehicles, ignoring hours without observations. 0 if there are no observations.
+
+    Methods
+    -------
+    rows(hour: int) -> `numpy.ndarray`
+        Gets the store positions of the observations in an hour, in store order.
+    """
+
+    def __init__(self, store: ObservationStore):
+        """
+        Parameters
+        ----------
+        store : ObservationStore
+            The observations to index.
+        """
+        self._version = store.version
+        hours = store.minute // 60
+        self._record_count = np.bincount(hours, minlength=24)
+        self._weighted_speed = np.bincount(
+            hours, weights=store.speed * store.volume, minlength=24
+        )
+        self._vehicle_count = np.bincount(
+            hours, weights=store.volume, minlength=24
+        ).astype(np.int64)
+        self._average_speed = np.divide(
+            self._weighted_speed,
+            self._vehicle_count,
+            out=np.zeros(24),
+            where=self._vehicle_count > 0,
+        )
+        if len(store) == 0:
+            self._peak_hour = 0
+        else:
+            # Hours without any observations can never be the peak, even if every count is 0
+            counts = np.where(self._record_count > 0, self._vehicle_count, -1)
+            self._peak_hour = int(np.argmax(counts))  # Earliest hour with most vehicles
+        # Row positions grouped by hour, so each hour's rows are one slice
+        self._order = np.argsort(hours, kind="stable")
+        self._offsets = np.concatenate(([0], np.cumsum(self._record_count)))
+        for array in (
+            self._record_count,
+            self._weighted_speed,
+            self._vehicle_count,
+            self._average_speed,
+            self._order,
+        ):
+            array.setflags(write=False)
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    @property
+    def weighted_speed(self) -> np.ndarray:
+        return self._weighted_speed
+
+    @property
+    def vehicle_count(self) -> np.ndarray:
+        return self._vehicle_count
+
+    @property
+    def record_count(self) -> np.ndarray:
+        return self._record_count
+
+    @property
+    def average_speed(self) -> np.ndarray:
+        return self._average_speed
+
+    @property
+    def peak_hour(self) -> int:
+        return self._peak_hour
+
+    def rows(self, hour: int) -> np.ndarray:
+        """
+        Gets the store positions of the observations in an hour.
+
+        Parameters
+        ----------
+        hour : int
+            24 hour (0-23) time to get
+
+        Returns
+        -------
+        numpy.ndarray
+            The positions, in the order the observations are stored
+        """
+        return self._order[self._offsets[hour] : self._offsets[hour + 1]]
+
+    def __repr__(self) -> str:
+        return f"HourlyIndex(version={self.version}, peak_hour={self.peak_hour})"
 
-    def __str__(self) -> str:
-        return f"Observation at site {self.site_name} (ID {self.site_id}) on {self.end_datetime.strftime('%Y-%m-%d %H:%M:%S')}: average speed {self.average_speed} mph, vehicle count {self.vehicle_count}"
+
+class SequenceView(Sequence):
+    """
+    A read-only view of a sequence, i.e. the observations of a `Site` or the sites of a `RouteSegment`, that does not copy it.
+    Changes to the sequence are seen through the view, but the view cannot change it.
+
+    Methods
+    -------
+    Supports `len()`, indexing, slicing, iteration, `in`, `reversed()`, `.index()`, and `.count()`.
+    """
+
+    __slots__ = ("_sequence",)
+
+    def __init__(self, sequence: Sequence):
+        """
+        Parameters
+        ----------
+        sequence : Sequence
+            The sequence to view.
+        """
+        self._sequence = sequence
+
+    def __getitem__(self, key):
+        return self._sequence[key]
+
+    def __len__(self) -> int:
+        return len(self._sequence)
+
+    def __iter__(self) -> Iterator:
+        return iter(self._sequence)
+
+    def __repr__(self) -> str:
+        return f"SequenceView(len={len(self)})"
 
 
 class Site:
     """
     A class to represent one traffic camera and corresponding data in WebTRIS.
-    Objects can be indexed into to reach FifteenMinuteObeservation elements. A shallow copy can be obtained instead via `.get_observations_list()`
+    Objects can be indexed into to reach FifteenMinuteObeservation elements. A shallow copy can be obtained instead via `.get_observations_list()`,
+    or a read-only view that does not copy via `.observations_view`
 
     Attributes
     ----------
     date: datetime
-        The date on which the observations are recorded. May have errounious hours, minutes, and seconds. Calls `.update_data()` on change.
+        The date on which the observations are recorded. May have errounious hours, minutes, and seconds.
+        Calls `.update_data()` on change, or marks a lazy site as pending.
     site_id: int, readonly
         The site identifier which this object corresponds to.
     name: str, readonly
         The name of the site this object corresponds to. Obtained from the API when `.update_data()` is called.
+    transport: WebTRISTransport | None
+        The transport used for API calls. `None` uses the shared transport from `get_default_transport()`.
+    cache: ReportCache | None
+        The cache reports are served from and stored in. `None` uses the shared cache from `get_default_cache()`.
+    observation_cache: ObservationCache | None
+        The in-memory cache of parsed observations. `None` uses the shared cache from `get_default_observation_cache()`.
+    lazy: bool, readonly
+        If True, the API is not called until observations are first needed.
+    pending: bool, readonly
+        True if the site is lazy and its observations have not been fetched yet. See `load_pending_sites()`.
+    max_dates: int, readonly
+        The number of previous days whose observations are remembered, so changing `date` back to one does not call the API.
+        A remembered day is restored as it was, so call `refresh()` to follow a remembered today.
+    memo_dates: list[date], readonly
+        The previous days currently remembered, least recently used first.
+    evicted_dates: list[date], readonly
+        The days most recently forgotten to stay within `max_dates`, oldest first. Only the last 64 are listed.
     """
 
-    _observations: list[TrafficObservation]
+    _store: ObservationStore | None
+    # Hourly aggregates of `_observations`, rebuilt when it changes
+    _index: HourlyIndex | None = None
+    _index_store: ObservationStore | None = None
     _date: datetime
     _site_id: int
     _name: str
+    _lazy: bool
+    _max_dates: int
+    _date_memo: OrderedDict[Date, ObservationStore]
+    _evicted_dates: deque[Date]
 
     @property
     def date(self) -> datetime:
@@ -380,45 +2188,275 @@ class Site:
 
     @date.setter
     def date(self, new: datetime):
+        old = self._date
         self._date = new
-        self.update_data()
+        if new.date() != old.date():
+            if self._store is not None and self._max_dates > 0:
+                self._remember(old.date())
+            memo = self._date_memo.pop(new.date(), None)
+            if memo is not None:
+                # Switching back to a remembered day reuses its observations without calling the API
+                self._store = memo
+                self._name = self._store.site_name or "Unknown Site"
+                return
+        if self._lazy:
+            self._store = None
+        else:
+            self.update_data()
+
+    def _remember(self, day: Date) -> None:
+        """
+        Keeps the current observations for `day`, evicting the least recently used days past `max_dates`.
+        """
+        self._date_memo[day] = self._store
+        self._date_memo.move_to_end(day)
+        while len(self._date_memo) > self._max_dates:
+            evicted, _ = self._date_memo.popitem(last=False)
+            self._evicted_dates.append(evicted)
+
+    @property
+    def max_dates(self) -> int:
+        return self._max_dates
+
+    @property
+    def memo_dates(self) -> list[Date]:
+        return list(self._date_memo)
+
+    @property
+    def evicted_dates(self) -> list[Date]:
+        return list(self._evicted_dates)
 
     @property
     def site_id(self) -> int:
         return self._site_id
 
     @property
-    def name(self) -> str:
-        return self._name
+    def name(self) -> str:
+        # The name comes from the observations, so a pending site is fetched first
+        if self._store is None:
+            self.update_data()
+        return self._name
+
+    @property
+    def lazy(self) -> bool:
+        return self._lazy
+
+    @property
+    def pending(self) -> bool:
+        return self._store is None
+
+    @property
+    def _observations(self) -> ObservationStore:
+        # Every use of the observations goes through here, so a pending site is fetched on first use
+        if self._store is None:
+            self.update_data()
+        return self._store
+
+    @_observations.setter
+    def _observations(self, store: ObservationStore) -> None:
+        self._store = store
 
-    def __init__(self, site_id: int, date: datetime = datetime.now()):
-        self._date = date
+    def __init__(
+        self,
+        site_id: int,
+        date: datetime | None = None,
+        transport: WebTRISTransport | None = None,
+        observations: list[TrafficObservation] | None = None,
+        lazy: bool = False,
+        max_dates: int = 4,
+        cache: ReportCache | None = None,
+        observation_cache: ObservationCache | None = None,
+    ):
+        """
+        Parameters
+        ----------
+        site_id : int
+            The site identifier which this object corresponds to.
+        date : datetime | None
+            The date on which the observations are recorded. Defaults to the current time.
+        transport : WebTRISTransport | None
+            The transport used for API calls.
+        observations : list[TrafficObservation] | None
+            Already fetched observations for this site and date, i.e. from `MultiSiteDailyReportRequest`. The API is only called if not given.
+        lazy : bool
+            If True and `observations` is not given, the API is called when observations are first needed instead of now.
+        max_dates : int
+            The number of previous days whose observations are remembered when `date` changes. 0 remembers none.
+        cache : ReportCache | None
+            The cache reports are served from and stored in. Defaults to the shared cache from `get_default_cache()`.
+        observation_cache : ObservationCache | None
+            The in-memory cache of parsed observations. Defaults to `get_default_observation_cache()`.
+        """
+        if not isinstance(max_dates, int) or max_dates < 0:
+            raise ValueError("Cannot initialize Site with non-int/<0 max_dates!")
+        self._date = date if date is not None else datetime.now()
         self._site_id = site_id
-        self.update_data()
+        self.transport = transport
+        self.cache = cache
+        self.observation_cache = observation_cache
+        self._lazy = lazy
+        self._store = None
+        self._max_dates = max_dates
+        self._date_memo = OrderedDict()
+        self._evicted_dates = deque(maxlen=64)
+        if observations is not None:
+            self.set_observations(observations)
+        elif not lazy:
+            self.update_data()
 
     def get_observations_list(self) -> list[TrafficObservation]:
         """
-        Returns a shallow copy of the observations related to this site
+        Returns a list of the observations related to this site. Changing the list does not change the site.
 
         Returns
         -------
         list[TrafficObservation]
-            The shallow copy
+            The observations in chronological order
+        """
+        return list(self._observations)
+
+    @property
+    def observations_view(self) -> SequenceView:
+        """
+        A read-only view of the observations in chronological order, which does not copy them like `get_observations_list()`.
+        Follows the site, so shows new observations after `date` changes or `refresh()`.
         """
-        return self._observations.copy()
+        return SequenceView(self)
 
     def update_data(self):
         """
-        Makes another call to the API to update the observation data. Called on `__init__` and `@date.setter`
+        Makes another call to the API to update the observation data. Called on `__init__` and `@date.setter`,
+        or on first use of a lazy site's observations.
         """
-        requestor = DailyReportRequest(site_id=self.site_id, date=self.date)
-        self._observations = requestor.send()
-        self._observations.sort()
-        self._name = (
-            self._observations[0].site_name
-            if len(self._observations) > 0
-            else "Unknown Site"
+        requestor = DailyReportRequest(
+            site_id=self.site_id,
+            date=self.date,
+            transport=self.transport,
+            cache=self.cache,
+            observation_cache=self.observation_cache,
+        )
+        self.set_observations(requestor._send_store(), copy=False)
+
+    def refresh(self) -> bool:
+        """
+        Downloads the whole day again, as the API can only filter reports by day, i.e. to follow today's data every
+        fifteen minutes. A whole day fits one page, so this is one call. Of the day downloaded, only observations newer
+        than the last one held are appended, so values derived from the rest are kept.
+        The site's report and observation caches are updated, so later requests for the day are not served stale data.
+        A pending site is fetched in full.
+
+        Returns
+        -------
+        bool
+            True if any observations were added, so values derived from this site must be worked out again
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised in the case that a fetch does not return a res.ok
+        ValueError
+            Raised if "Rows" not in a returned data dictionary
+        """
+        if self._store is None:
+            self.update_data()
+            return len(self._store) > 0
+        day = self.date.replace(hour=0, minute=0, second=0, microsecond=0)
+        rows: list[dict] = []
+        for page in _iter_report_pages(
+            self.transport if self.transport is not None else get_default_transport(),
+            str(self.site_id),
+            day,
+            day,
+            page_size=500,
+        ):
+            rows.extend(page)
+        new, _ = ObservationStore.from_rows(self.site_id, rows)
+        # Today's cached entries are replaced with the whole day just fetched
+        cache = self.cache if self.cache is not None else get_default_cache()
+        if cache is not None:
+            cache.put(self.site_id, day, rows)
+        observation_cache = (
+            self.observation_cache
+            if self.observation_cache is not None
+            else get_default_observation_cache()
         )
+        if observation_cache is not None:
+            observation_cache.put(self.site_id, day, list(new))
+        store = self._store
+        if len(store) > 0 and len(new) > 0:
+            # Skips every row up to the last one already held
+            newer = np.flatnonzero(new._time_keys() > store._time_keys()[-1])
+            new = ObservationStore(
+                new.site_id,
+                new.site_name,
+                new.day[newer],
+                new.minute[newer],
+                new.speed[newer],
+                new.volume[newer],
+            )
+        if len(new) == 0:
+            return False
+        store.extend(new)
+        self._name = store.site_name or "Unknown Site"
+        return True
+
+    def set_observations(
+        self, observations: Iterable[TrafficObservation], copy: bool = True
+    ) -> None:
+        """
+        Replaces the observation data with already fetched observations, without calling the API. Sorts them and updates `name`.
+
+        Parameters
+        ----------
+        observations : Iterable[TrafficObservation]
+            The observations for this site on `date`. May also be an `ObservationStore`, which is copied.
+        copy : bool
+            If False and `observations` is an `ObservationStore`, it is used directly instead of copied, i.e. to keep
+            columns read from an `ObservationArchive` as views of the file. The store must be from this site.
+
+        Raises
+        ------
+        ValueError
+            If the observations are from another site
+        """
+        if not copy and isinstance(observations, ObservationStore):
+            if observations.site_id != self.site_id:
+                raise ValueError("Cannot store observations from more than one site")
+            self._observations = observations
+        else:
+            self._observations = ObservationStore.from_observations(
+                observations, site_id=self.site_id
+            )
+        self._observations.sort()
+        self._name = self._observations.site_name or "Unknown Site"
+        self._index = HourlyIndex(self._observations)
+        self._index_store = self._observations
+
+    def _hourly_index(self) -> HourlyIndex:
+        """
+        Gets the hourly index of the observations, rebuilding it if they have changed since it was built.
+        """
+        index = self._index
+        if (
+            index is None
+            or self._index_store is not self._observations
+            or index.version != self._observations.version
+        ):
+            index = HourlyIndex(self._observations)
+            self._index = index
+            self._index_store = self._observations
+        return index
+
+    def get_hourly_profile(self) -> HourlyIndex:
+        """
+        Gets the aggregates of all 24 hours at once, i.e. to draw a whole day.
+
+        Returns
+        -------
+        HourlyIndex
+            Average speeds, vehicle counts, and record counts indexed by hour, plus the peak hour
+        """
+        return self._hourly_index()
 
     def get_average_speed(self) -> float:
         """
@@ -429,10 +2467,9 @@ class Site:
         float
             The average speed in mph
         """
-        total_weighted_speed = sum(
-            o.average_speed * o.vehicle_count for o in self._observations
-        )
-        total_count = sum(o.vehicle_count for o in self._observations)
+        store = self._observations
+        total_weighted_speed = float((store.speed * store.volume).sum())
+        total_count = int(store.volume.sum(dtype=np.int64))
         return total_weighted_speed / total_count if total_count > 0 else 0.0
 
     def get_hourly_average_speed(self, hour: int) -> float:
@@ -452,15 +2489,7 @@ class Site:
         """
         if hour < 0 or hour > 23:
             raise ValueError("Hour must be between 0 and 23 inclusive")
-        total_weighted_speed = sum(
-            o.average_speed * o.vehicle_count
-            for o in self._observations
-            if o.end_datetime.hour == hour
-        )
-        total_count = sum(
-            o.vehicle_count for o in self._observations if o.end_datetime.hour == hour
-        )
-        return total_weighted_speed / total_count if total_count > 0 else 0.0
+        return float(self._hourly_index().average_speed[hour])
 
     def get_vehicle_count(self) -> int:
         """
@@ -471,7 +2500,7 @@ class Site:
         int
             The total vehicle count over all observations
         """
-        return sum(o.vehicle_count for o in self._observations)
+        return int(self._observations.volume.sum(dtype=np.int64))
 
     def get_hourly_vehicle_count(self, hour: int) -> int:
         """
@@ -489,9 +2518,7 @@ class Site:
         """
         if hour < 0 or hour > 23:
             raise ValueError("Hour must be between 0 and 23 inclusive")
-        return sum(
-            o.vehicle_count for o in self._observations if o.end_datetime.hour == hour
-        )
+        return int(self._hourly_index().vehicle_count[hour])
 
     def get_peak_hour(self) -> int:
         """
@@ -503,15 +2530,65 @@ class Site:
         int
             The hour (0-23) with the highest amount of vehicles
         """
-        hourly_counts: dict[int:int] = dict()
-        for o in self._observations:
-            hour = o.end_datetime.hour
-            if hour not in hourly_counts:
-                hourly_counts[hour] = 0
-            hourly_counts[hour] += o.vehicle_count
-        return (
-            max(hourly_counts.items(), key=lambda x: x[1])[0] if hourly_counts else 0
-        )  # Return hour with most vehicles
+        return self._hourly_index().peak_hour
+
+    def get_observation_at(self, when: datetime) -> TrafficObservation | None:
+        """
+        Gets the observation covering a point in time, which is the first observation ending after it.
+        Found with a binary search of the observations, without copying them.
+
+        Parameters
+        ----------
+        when : datetime
+            The time to look up
+
+        Returns
+        -------
+        TrafficObservation | None
+            The observation covering `when`, or None if every observation ends at or before it
+        """
+        i = self._observations.bisect_right(when)
+        if i == len(self._observations):
+            return None
+        return self._observations[i]
+
+    def get_speed_at(self, when: datetime, interpolate: bool = False) -> float | None:
+        """
+        Gets the average speed at a point in time. Found with a binary search of the observations, without copying them.
+
+        Parameters
+        ----------
+        when : datetime
+            The time to look up
+        interpolate : bool
+            If True, interpolates linearly between the end times of the observations either side of `when`.
+            Otherwise uses the speed of the observation covering `when`, as `get_observation_at()` does.
+
+        Returns
+        -------
+        float | None
+            The speed in mph, or None if every observation ends at or before `when`
+        """
+        store = self._observations
+        i = store.bisect_right(when)
+        if i == len(store):
+            return None
+        speed = float(store.speed[i])
+        if not interpolate or i == 0:
+            return speed
+        keys = store._time_keys()
+        start, end = int(keys[i - 1]), int(keys[i])
+        if end == start:
+            return speed
+        offset = (
+            when.toordinal() * 1440
+            + when.hour * 60
+            + when.minute
+            + (when.second + when.microsecond / 1e6) / 60
+            - start
+        )
+        previous = float(store.speed[i - 1])
+        return previous + (speed - previous) * offset / (end - start)
 
     def get_records_for_hour(self, hour: int) -> list[TrafficObservation]:
         """
@@ -534,7 +2611,7 @@ class Site:
         """
         if hour < 0 or hour > 23:
             raise ValueError("Hour must be between 0 and 23 inclusive")
-        return [o for o in self._observations if o.end_datetime.hour == hour]
+        return [self._observations[int(i)] for i in self._hourly_index().rows(hour)]
 
     def __getitem__(
         self, key: int | slice
@@ -546,11 +2623,464 @@ class Site:
 
     def __iter__(self) -> Iterator[TrafficObservation]:
         # Guaranteed to be in chronological order due to sorting in `update_data()`
-        for o in self._observations:
-            yield o
+        yield from self._observations
 
     def __repr__(self) -> str:
+        if self.pending:
+            return f"Site(site_id={self.site_id}, date='{self.date.strftime('%Y-%m-%d')}', pending=True)"
         return f"Site(site_id={self.site_id}, name='{self.name}', date='{self.date.strftime('%Y-%m-%d')}', observations={self._observations})"
 
     def __str__(self) -> str:
+        if self.pending:
+            return f"Site {self.site_id} on {self.date.strftime('%Y-%m-%d')}, not yet fetched"
         return f"Site {self.site_id} ({self.name}) on {self.date.strftime('%Y-%m-%d')} with {len(self._observations)} observations"
+
+
+def load_pending_sites(
+    sites: Iterable[Site], max_workers: int = 16, batched: bool = False
+) -> dict[int, Exception]:
+    """
+    Fetches every pending lazy site together, instead of one at a time as each is first used.
+    Sites that are not pending are skipped. A site appearing more than once on the same day is only fetched once.
+
+    Parameters
+    ----------
+    sites : Iterable[Site]
+        The sites to load.
+    max_workers : int
+        The number of threads fetching at once.
+    batched : bool
+        If True, sites on the same day are fetched with one `MultiSiteDailyReportRequest` instead of one request each.
+
+    Returns
+    -------
+    dict[int, Exception]
+        Errors raised while fetching, keyed by site id. Failed sites stay pending, so using them fetches them again.
+    """
+    if not isinstance(max_workers, int) or max_workers <= 0:
+        raise ValueError("Cannot load sites with non-int/<=0 max_workers")
+    pending: dict[tuple, list[Site]] = {}
+    for site in sites:
+        if site.pending:
+            if batched:
+                key = (site.date.date(), id(site.transport))
+            else:
+                key = (site.site_id, site.date.date())
+            pending.setdefault(key, []).append(site)
+    if not pending:
+        return {}
+
+    def fetch(group: list[Site]) -> None:
+        first = group[0]
+        if batched:
+            MultiSiteDailyReportRequest(
+                [site.site_id for site in group], first.date, transport=first.transport
+            ).fill_sites(group)
+        else:
+            store = DailyReportRequest(
+                first.site_id,
+                first.date,
+                transport=first.transport,
+                cache=first.cache,
+                observation_cache=first.observation_cache,
+            )._send_store()
+            first.set_observations(store, copy=False)
+            for site in group[1:]:
+                site.set_observations(store.copy(), copy=False)
+
+    errors: dict[int, Exception] = {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(pending))) as pool:
+        futures = {pool.submit(fetch, group): group for group in pending.values()}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except FETCH_ERRORS as e:
+                for site in futures[future]:
+                    errors[site.site_id] = e
+    return errors
+
+
+class SiteTrend:
+    """
+    A class to represent one site's traffic over a long range as daily or monthly totals, for trend dashboards.
+    Uses `MonthlyReportRequest` for daily totals or `AnnualReportRequest` for monthly totals, so a range is one row per
+    period rather than 96 `TrafficObservation` objects per day. Summaries can be indexed into like a `Site`.
+
+    Attributes
+    ----------
+    site_id: int, readonly
+        The site identifier which this object corresponds to.
+    name: str | None, readonly
+        The name of the site. Obtained from the API when `.update_data()` is called.
+    period: str, readonly
+        "day" for daily totals or "month" for monthly totals.
+    start_date: datetime, readonly
+        The start of the first period in the range.
+    end_date: datetime, readonly
+        The start of the last period in the range.
+    transport: WebTRISTransport | None
+        The transport used for API calls. `None` uses the shared transport from `get_default_transport()`.
+    summaries: SequenceView, readonly
+        A read-only view of the summaries in chronological order.
+    dropped_rows: int, readonly
+        The number of faulty rows excluded by the last `.update_data()`.
+    """
+
+    PERIODS = ("day", "month")
+
+    _site_id: int
+    _period: str
+    _start_date: datetime
+    _end_date: datetime
+    _summaries: list[ReportSummary]
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @property
+    def name(self) -> str | None:
+        return self._summaries[0].site_name if self._summaries else None
+
+    @property
+    def period(self) -> str:
+        return self._period
+
+    @property
+    def start_date(self) -> datetime:
+        return self._start_date
+
+    @property
+    def end_date(self) -> datetime:
+        return self._end_date
+
+    @property
+    def summaries(self) -> SequenceView:
+        return SequenceView(self._summaries)
+
+    @property
+    def dropped_rows(self) -> int:
+        return self._dropped_rows
+
+    def __init__(
+        self,
+        site_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        period: str = "month",
+        transport: WebTRISTransport | None = None,
+        lazy: bool = False,
+    ):
+        """
+        Parameters
+        ----------
+        site_id : int
+            The site identifier which this object corresponds to.
+        start_date : datetime
+            Any time in the first period of the range.
+        end_date : datetime
+            Any time in the last period of the range, inclusive.
+        period : str
+            "day" for daily totals or "month" for monthly totals.
+        transport : WebTRISTransport | None
+            The transport used for API calls.
+        lazy : bool
+            If True, the API is not called until `.update_data()` is.
+
+        Raises
+        ------
+        TypeError
+            If `site_id` is not an int or the dates are not datetimes
+        ValueError
+            If `period` is unknown or `end_date` is before `start_date`
+        """
+        if not isinstance(site_id, int):
+            raise TypeError("Cannot initialize SiteTrend with non-int site_id!")
+        if not isinstance(start_date, datetime) or not isinstance(end_date, datetime):
+            raise TypeError("Cannot initialize SiteTrend with non-datetime dates!")
+        if period not in SiteTrend.PERIODS:
+            raise ValueError(
+                f"Cannot initialize SiteTrend with unknown period {period!r}!"
+            )
+        summary_type = DailySummary if period == "day" else MonthlySummary
+        self._site_id = site_id
+        self._period = period
+        self._start_date = summary_type._normalise(start_date)
+        self._end_date = summary_type._normalise(end_date)
+        if self._end_date < self._start_date:
+            raise ValueError(
+                "Cannot initialize SiteTrend with end_date before start_date!"
+            )
+        self.transport = transport
+        self._summaries = []
+        self._dropped_rows = 0
+        if not lazy:
+            self.update_data()
+
+    def update_data(self) -> None:
+        """
+        Fetches the summaries of the range, keeping only periods inside it.
+        """
+        if self._period == "day":
+            request = MonthlyReportRequest(
+                self._site_id,
+                self._start_date,
+                self._end_date,
+                transport=self.transport,
+            )
+        else:
+            request = AnnualReportRequest(
+                self._site_id,
+                self._start_date.year,
+                self._end_date.year,
+                transport=self.transport,
+            )
+        self._summaries = [
+            summary
+            for summary in request.send()
+            if self._start_date <= summary.period_start <= self._end_date
+        ]
+        self._dropped_rows = request.dropped_rows
+
+    def get_average_speed(self) -> float:
+        """
+        Calculates the average speed over the range in mph, weighted by the vehicle count of each period.
+
+        Returns
+        -------
+        float
+            The average speed in mph. 0 if no vehicles were counted.
+        """
+        total_count = self.get_vehicle_count()
+        if total_count == 0:
+            return 0.0
+        return (
+            sum(s.average_speed * s.vehicle_count for s in self._summaries)
+            / total_count
+        )
+
+    def get_vehicle_count(self) -> int:
+        """
+        Calculates the total number of vehicles over the range.
+        """
+        return sum(s.vehicle_count for s in self._summaries)
+
+    def get_peak_period(self) -> ReportSummary | None:
+        """
+        Gets the earliest period with the most vehicles, or None if there are no summaries.
+        """
+        return max(self._summaries, key=lambda s: s.vehicle_count, default=None)
+
+    def get_summary_at(self, when: datetime) -> ReportSummary | None:
+        """
+        Gets the summary of the period holding a point in time.
+
+        Returns
+        -------
+        ReportSummary | None
+            The summary, or None if no summary covers `when`
+        """
+        i = bisect_right([s.period_start for s in self._summaries], when) - 1
+        if i < 0 or when >= self._summaries[i].period_end:
+            return None
+        return self._summaries[i]
+
+    def __getitem__(self, key: int | slice) -> ReportSummary | list[ReportSummary]:
+        return self._summaries[key]
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def __iter__(self) -> Iterator[ReportSummary]:
+        return iter(self._summaries)
+
+    def __repr__(self) -> str:
+        return f"SiteTrend(site_id={self.site_id}, start_date={self.start_date.strftime('%Y-%m-%d')}, end_date={self.end_date.strftime('%Y-%m-%d')}, period='{self.period}')"
+
+    def __str__(self) -> str:
+        return f"Site {self.name or self.site_id} (ID {self.site_id}) with {len(self)} {self.period}ly summaries from {self.start_date.strftime('%Y-%m-%d')} to {self.end_date.strftime('%Y-%m-%d')}"
+
+
+class SiteInfo:
+    """
+    A class to represent the metadata of one WebTRIS site returned by the `/sites` endpoint.
+
+    Attributes
+    ----------
+    site_id: int, readonly
+        The ID of the site.
+    name: str, readonly
+        The long name of the site.
+    description: str, readonly
+        The short description of the site. Daily report rows use this as their "Site Name".
+    longitude: float, readonly
+        The longitude of the site.
+    latitude: float, readonly
+        The latitude of the site.
+    status: str, readonly
+        The status reported by the API, i.e. "Active" or "Inactive".
+    active: bool, readonly
+        Whether the site is currently active.
+
+    Raises
+    ------
+    ValueError
+        If trying to initialize with a non-int/<=0 `site_id`
+    ValueError
+        If trying to initialize with no/empty `name`, `description` or `status`
+    ValueError
+        If trying to initialize with out of range or (0, 0) coordinates
+    """
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "SiteInfo":
+        """
+        Creates a new `SiteInfo` from one entry of the "sites" list returned by the API.
+
+        Raises
+        ------
+        ValueError
+            If "Id" is not an int or any field is missing or invalid
+
+        Returns
+        -------
+        SiteInfo
+            A new `SiteInfo` containing the data given
+        """
+        return cls(
+            site_id=int(data.get("Id")),
+            name=data.get("Name"),
+            description=data.get("Description"),
+            longitude=float(data.get("Longitude")),
+            latitude=float(data.get("Latitude")),
+            status=data.get("Status"),
+        )
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    @property
+    def description(self) -> str:
+        return self._description
+
+    @property
+    def longitude(self) -> float:
+        return self._longitude
+
+    @property
+    def latitude(self) -> float:
+        return self._latitude
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @property
+    def active(self) -> bool:
+        return self._status.lower() == "active"
+
+    def __init__(
+        self,
+        site_id: int,
+        name: str,
+        description: str,
+        longitude: float,
+        latitude: float,
+        status: str,
+    ):
+        if not isinstance(site_id, int) or site_id <= 0:
+            raise ValueError("Cannot initialize SiteInfo with no/<=0 site_id!")
+        self._site_id = site_id
+        for field, value in (
+            ("name", name),
+            ("description", description),
+            ("status", status),
+        ):
+            if not isinstance(value, str) or value == "":
+                raise ValueError(f"Cannot initialize SiteInfo with no/empty {field}!")
+        self._name = name
+        self._description = description
+        self._status = status
+        if (
+            not -180 <= longitude <= 180
+            or not -90 <= latitude <= 90
+            or (longitude == 0 and latitude == 0)
+        ):
+            raise ValueError("Cannot initialize SiteInfo with invalid coordinates!")
+        self._longitude = longitude
+        self._latitude = latitude
+
+    def __repr__(self) -> str:
+        return f"SiteInfo(site_id={self.site_id}, description='{self.description}', status='{self.status}')"
+
+    def __str__(self) -> str:
+        return f"Site {self.site_id} ({self.description}) at ({self.latitude}, {self.longitude}), {self.status}"
+
+
+class SitesRequest:
+    """
+    A class to request site metadata from the `/sites` endpoint. Make a request by calling `.send()`
+
+    Attributes
+    ----------
+    ENDPOINT: str, static, readonly
+        The endpoint for site requests on the API. This should not be changed.
+    site_ids: list[int] | None
+        The sites to request. `None` requests every site.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    """
+
+    ENDPOINT = "/sites"
+
+    def __init__(
+        self,
+        site_ids: list[int] | None = None,
+        transport: WebTRISTransport | None = None,
+    ):
+        self.site_ids = site_ids
+        self.transport = transport if transport is not None else get_default_transport()
+
+    def send(self) -> list[SiteInfo]:
+        """
+        Sends a request to the `/sites` endpoint.
+
+        Returns
+        -------
+        list[SiteInfo]
+            The sites returned. Faulty entries are silently excluded.
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised in the case that the fetch does not return a res.ok
+        ValueError
+            Raised if "sites" not in returned data dictionary
+        """
+        endpoint = SitesRequest.ENDPOINT
+        if self.site_ids:
+            endpoint += "/" + ",".join(str(site_id) for site_id in self.site_ids)
+        res = self.transport.get(endpoint, params={})
+        res.raise_for_status()
+        if res.status_code == 204:
+            return []
+        data = res.json()
+        if "sites" not in data:
+            raise ValueError(
+                "`sites` not found in `SitesRequest.send()`. Required field to form data."
+            )
+        sites: list[SiteInfo] = []
+        for site in data["sites"]:
+            try:
+                sites.append(SiteInfo.from_dict(site))
+            except (ValueError, TypeError):
+                continue
+        return sites
+
+    def __repr__(self):
+        return f"SitesRequest(site_ids={self.site_ids})"
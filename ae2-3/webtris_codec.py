@@ -0,0 +1,306 @@
+"""A compact binary encoding of site-days, so years of observations for many sites can be held in memory"""
+
+import threading
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from webtris_client import ObservationStore, Site, TrafficObservation
+
+SLOTS_PER_DAY = 96  # Fifteen minute intervals in a day
+BITMAP_BYTES = SLOTS_PER_DAY // 8
+
+# Flags held in the first byte of every block
+ZLIB = 1  # The columns are compressed with zlib
+DELTA = 2  # Each column holds differences from the previous value, wrapping around within its type
+SPEED_FLOAT = 4  # Speeds are float64 instead of whole mph as uint8
+VOLUME_WIDE = 8  # Volumes are uint32 instead of uint16
+
+_SLOT_MINUTES = (np.arange(SLOTS_PER_DAY) * 15 + 14).astype(np.int16)
+
+
+def encode_day(
+    observations: list[TrafficObservation] | ObservationStore,
+    delta: bool = True,
+    compress: bool = True,
+) -> bytes:
+    """
+    Encodes one day of observations for one site as a block. Times are implied by the fifteen minute slot of each value
+    and a 96 bit bitmap marks which slots hold one. Speeds are stored as whole mph in one byte and volumes in two bytes
+    when they fit, otherwise at full width, so the encoding never loses data.
+
+    Parameters
+    ----------
+    observations : list[TrafficObservation] | ObservationStore
+        The observations of one site on one day. Each must end on a slot, at 14, 29, 44, or 59 minutes past the hour.
+    delta : bool
+        If True, each value is stored as the difference from the one before, which compresses better.
+    compress : bool
+        If True, the values are compressed with zlib.
+
+    Raises
+    ------
+    ValueError
+        If the observations are from more than one site or day, do not end on a slot, or two end on the same slot
+
+    Returns
+    -------
+    bytes
+        The block. Decode with `decode_day()`.
+    """
+    if isinstance(observations, ObservationStore):
+        store = observations
+    elif observations:
+        store = ObservationStore.from_observations(observations)
+    else:
+        store = None
+    flags = 0
+    filled = np.zeros(SLOTS_PER_DAY, dtype=bool)
+    speed = np.zeros(0, dtype=np.uint8)
+    volume = np.zeros(0, dtype=np.uint16)
+    if store is not None and len(store) > 0:
+        if np.any(store.day != store.day[0]):
+            raise ValueError("Cannot encode observations from more than one day")
+        if np.any(store.minute % 15 != 14):
+            raise ValueError("Cannot encode observations not ending on a slot")
+        slots = store.minute // 15
+        if len(np.unique(slots)) != len(slots):
+            raise ValueError("Cannot encode two observations ending on the same slot")
+        order = np.argsort(slots)
+        filled[slots] = True
+        speed = store.speed[order]
+        volume = store.volume[order]
+        if np.all((speed >= 0) & (speed <= 255) & (speed == np.round(speed))):
+            speed = speed.astype(np.uint8)
+        else:
+            flags |= SPEED_FLOAT
+        if volume.max() <= np.iinfo(np.uint16).max:
+            volume = volume.astype(np.uint16)
+        else:
+            flags |= VOLUME_WIDE
+            volume = volume.astype(np.uint32)
+    if delta:
+        flags |= DELTA
+        if not flags & SPEED_FLOAT:
+            speed = np.diff(speed, prepend=speed.dtype.type(0))
+        volume = np.diff(volume, prepend=volume.dtype.type(0))
+    payload = speed.astype("<f8" if flags & SPEED_FLOAT else "u1").tobytes()
+    payload += volume.astype("<u4" if flags & VOLUME_WIDE else "<u2").tobytes()
+    if compress:
+        flags |= ZLIB
+        payload = zlib.compress(payload, 6)
+    return bytes([flags]) + np.packbits(filled).tobytes() + payload
+
+
+def decode_day(
+    block: bytes, site_id: int, date: datetime, site_name: str | None = None
+) -> ObservationStore:
+    """
+    Decodes a block from `encode_day()` straight into columns, without creating `TrafficObservation` objects.
+
+    Parameters
+    ----------
+    block : bytes
+        The encoded day
+    site_id : int
+        The site the day belongs to
+    date : datetime
+        The day the block holds. Time of day is ignored.
+    site_name : str | None
+        The site name reported by the API
+
+    Raises
+    ------
+    ValueError
+        If the block is malformed
+
+    Returns
+    -------
+    ObservationStore
+        The observations in chronological order
+    """
+    if len(block) < 1 + BITMAP_BYTES:
+        raise ValueError("Cannot decode a block shorter than its header")
+    flags = block[0]
+    filled = np.unpackbits(
+        np.frombuffer(block, dtype=np.uint8, count=BITMAP_BYTES, offset=1)
+    ).astype(bool)
+    n = int(np.count_nonzero(filled))
+    payload = block[1 + BITMAP_BYTES :]
+    if flags & ZLIB:
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError(
+                "Cannot decode a block with corrupt compressed data"
+            ) from e
+    speed_type = np.dtype("<f8" if flags & SPEED_FLOAT else "u1")
+    volume_type = np.dtype("<u4" if flags & VOLUME_WIDE else "<u2")
+    if len(payload) != n * (speed_type.itemsize + volume_type.itemsize):
+        raise ValueError("Cannot decode a block whose length does not match its bitmap")
+    speed = np.frombuffer(payload, dtype=speed_type, count=n)
+    volume = np.frombuffer(
+        payload, dtype=volume_type, count=n, offset=n * speed_type.itemsize
+    )
+    if flags & DELTA:
+        # Sums wrap around within the type exactly as the differences did
+        if not flags & SPEED_FLOAT:
+            speed = np.cumsum(speed, dtype=speed_type)
+        volume = np.cumsum(volume, dtype=volume_type)
+    return ObservationStore(
+        site_id,
+        site_name if n > 0 else None,
+        np.full(n, date.toordinal(), dtype=np.int32),
+        _SLOT_MINUTES[filled],
+        speed.astype(np.float64),
+        volume.astype(np.int32),
+    )
+
+
+class SiteDayFleet:
+    """
+    A class to hold many site-days in memory as blocks from `encode_day()`, keyed by (site_id, date).
+    Days are decoded into columns only when a `Site` or store is asked for. Safe to share between threads.
+
+    Attributes
+    ----------
+    delta: bool, readonly
+        Whether blocks hold differences between values.
+    compress: bool, readonly
+        Whether blocks are compressed with zlib.
+    nbytes: int, readonly
+        The bytes held by every block.
+    bytes_per_site_day: float, readonly
+        The average size of a block. 0 if empty.
+
+    Methods
+    -------
+    put(site_id: int, date: datetime, observations) -> int
+        Encodes and stores one site-day, returning the size of its block.
+    get(site_id: int, date: datetime) -> `ObservationStore | None`
+        Decodes one site-day.
+    site(site_id: int, date: datetime) -> `Site | None`
+        Decodes one site-day into a `Site` without calling the API.
+    """
+
+    def __init__(self, delta: bool = True, compress: bool = True):
+        """
+        Parameters
+        ----------
+        delta : bool
+            If True, blocks hold differences between values, which compress better.
+        compress : bool
+            If True, blocks are compressed with zlib.
+        """
+        self._delta = delta
+        self._compress = compress
+        self._blocks: dict[tuple[int, int], bytes] = {}
+        self._names: dict[int, str] = {}
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def delta(self) -> bool:
+        return self._delta
+
+    @property
+    def compress(self) -> bool:
+        return self._compress
+
+    @property
+    def nbytes(self) -> int:
+        return self._nbytes
+
+    @property
+    def bytes_per_site_day(self) -> float:
+        return self._nbytes / len(self._blocks) if self._blocks else 0.0
+
+    def put(
+        self,
+        site_id: int,
+        date: datetime,
+        observations: list[TrafficObservation] | ObservationStore,
+    ) -> int:
+        """
+        Encodes and stores one day of observations for a site, replacing any stored before.
+
+        Parameters
+        ----------
+        site_id : int
+            The site of the observations
+        date : datetime
+            The day of the observations. Time of day is ignored.
+        observations : list[TrafficObservation] | ObservationStore
+            The observations, i.e. as returned by `DailyReportRequest.send()`
+
+        Raises
+        ------
+        ValueError
+            If the observations are from another site or day, or cannot be encoded
+
+        Returns
+        -------
+        int
+            The size of the block in bytes
+        """
+        store = ObservationStore.from_observations(observations, site_id=site_id)
+        if np.any(store.day != date.toordinal()):
+            raise ValueError(f"Cannot store observations not on {date.date()}")
+        block = encode_day(store, delta=self._delta, compress=self._compress)
+        key = (site_id, date.toordinal())
+        with self._lock:
+            if key in self._blocks:
+                self._nbytes -= len(self._blocks[key])
+            self._blocks[key] = block
+            self._nbytes += len(block)
+            if store.site_name is not None:
+                self._names[site_id] = store.site_name
+        return len(block)
+
+    def get(self, site_id: int, date: datetime) -> ObservationStore | None:
+        """
+        Decodes one day of observations for a site.
+
+        Returns
+        -------
+        ObservationStore | None
+            The observations in chronological order, or None if the day is not stored
+        """
+        block = self._blocks.get((site_id, date.toordinal()))
+        if block is None:
+            return None
+        return decode_day(block, site_id, date, self._names.get(site_id))
+
+    def site(self, site_id: int, date: datetime) -> Site | None:
+        """
+        Decodes one day of observations into a `Site`, ready for its aggregate functions, without calling the API.
+
+        Parameters
+        ----------
+        site_id : int
+            The site to load
+        date : datetime
+            The date to give the site. Date and time components are kept.
+
+        Returns
+        -------
+        Site | None
+            The site, or None if the day is not stored
+        """
+        store = self.get(site_id, date)
+        if store is None:
+            return None
+        site = Site(site_id, date, lazy=True)
+        site.set_observations(store, copy=False)
+        return site
+
+    def __contains__(self, key: tuple[int, datetime]) -> bool:
+        site_id, date = key
+        return (site_id, date.toordinal()) in self._blocks
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def __repr__(self) -> str:
+        return f"SiteDayFleet(site_days={len(self)}, nbytes={self.nbytes}, delta={self.delta}, compress={self.compress})"
@@ -1,8 +1,23 @@
 from abc import ABC, abstractmethod
 from collections import deque
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import date as Date, datetime
 import heapq
-from webtris_client import Site
+import itertools
+import math
+from webtris_client import (
+    FETCH_ERRORS,
+    DailyReportRequest,
+    MultiSiteDailyReportRequest,
+    ObservationStore,
+    SequenceView,
+    Site,
+    TrafficObservation,
+    WebTRISTransport,
+    load_pending_sites,
+)
+from webtris_planner import RequestPlanner
+from webtris_quality import LowQualityError, QualityFilter
 
 
 class RouteSegment:
@@ -15,6 +30,8 @@ class RouteSegment:
         The name of this RouteSegment. Usually to represent the end point of the segment
     sites: list[Site], readonly
         A list of all the sites that are on the road path in this segment. Used to obtain speeds.
+    sites_view: SequenceView, readonly
+        A read-only view of `sites` that does not copy the list.
     next_segments: list[RouteSegment]
         A list of the next possible segments that originate at the end of this segment.
     date: datetime
@@ -22,6 +39,15 @@ class RouteSegment:
         Expensive to set if outside of same 24-hour UTC date as API calls will be made for each site.
     length: float
         The length of this RouteSegment in miles.
+    transport: WebTRISTransport | None
+        The transport shared by all sites on this segment. `None` uses the shared default transport.
+    hydration_errors: dict[int, Exception]
+        Errors raised while fetching each site in thread-pool hydration, keyed by site id. Those sites are left without observations.
+    lazy: bool, readonly
+        If True, sites are only fetched when this segment's speed is first needed, all together.
+    quality: QualityFilter | None, readonly
+        If set, sites below its threshold on this segment's day are not fetched. Each is left without observations
+        and a `LowQualityError` is recorded in `hydration_errors`.
     """
 
     _name: str
@@ -29,15 +55,35 @@ class RouteSegment:
     next_segments: list["RouteSegment"]
     _date: datetime
     length: float  # in miles
+    transport: WebTRISTransport | None
+    hydration_errors: dict[int, Exception]
+    _lazy: bool
+    _batched: bool
+    _max_workers: int | None
+    _quality: QualityFilter | None
+    _speed: float
+    _speed_key: tuple | None = None
 
     @property
     def name(self) -> str:
         return self._name
 
+    @property
+    def lazy(self) -> bool:
+        return self._lazy
+
+    @property
+    def quality(self) -> QualityFilter | None:
+        return self._quality
+
     @property
     def sites(self) -> list[Site]:
         return self._sites.copy()
 
+    @property
+    def sites_view(self) -> SequenceView:
+        return SequenceView(self._sites)
+
     def append_site_by_id(self, new_site_id: int) -> None:
         """
         Appends a new site to the internal list of sites by id and updates its date.
@@ -47,9 +93,11 @@ class RouteSegment:
         new_site_id : int
             The id of the new site to add. Does nothing if site already in this segment.
         """
-        if new_site_id in [s.site_id for s in self.sites]:
+        if any(site.site_id == new_site_id for site in self._sites):
             return
-        new_site = Site(new_site_id, self.date)
+        new_site = Site(
+            new_site_id, self.date, transport=self.transport, lazy=self._lazy
+        )
         self._sites.append(new_site)
 
     def remove_site_by_id(self, old_site_id: int) -> None:
@@ -61,7 +109,7 @@ class RouteSegment:
         old_site_id : int
             The id of the site to remove.
         """
-        self.sites.remove(site for site in self.sites if site.site_id == old_site_id)
+        self._sites[:] = [site for site in self._sites if site.site_id != old_site_id]
 
     @property
     def date(self) -> datetime:
@@ -82,18 +130,67 @@ class RouteSegment:
         Returns
         -------
         float
-            The average speed in MPH.
+            The average speed in MPH. 0 if no site has a speed at that time.
+        """
+        if self._lazy:
+            self.load_pending()
+        # Reused until the date or any site's observations change, i.e. after a `refresh()` that added data
+        key = (
+            self._date,
+            [(site._observations, site._observations.version) for site in self._sites],
+        )
+        if self._speed_key == key:
+            return self._speed
+        avg_speeds: list[float] = []
+        for site in self._sites:
+            speed = site.get_speed_at(self.date)
+            if speed is not None:
+                avg_speeds.append(speed)
+        self._speed = sum(avg_speeds) / len(avg_speeds) if avg_speeds else 0.0
+        self._speed_key = key
+        return self._speed
+
+    def refresh(self) -> bool:
         """
-        avg_speeds: list[int] = list()
-        for site in self.sites:
-            observation = None
-            for o in site.get_observations_list():
-                if o.end_datetime > self.date:
-                    observation = o
-                    break
-            if observation:
-                avg_speeds.append(observation.average_speed)
-        return sum(avg_speeds) / len(avg_speeds)
+        Fetches only new intervals for every site on this segment with `Site.refresh()`, i.e. to follow today's traffic.
+
+        Returns
+        -------
+        bool
+            True if any site gained observations. If False, speeds and traversal times are unchanged and need not be recomputed.
+        """
+        changed = False
+        for site in self._sites:
+            changed = site.refresh() or changed
+        return changed
+
+    def load_pending(self) -> dict[int, Exception]:
+        """
+        Fetches every pending lazy site on this segment together, concurrently or batched as set when initialized.
+
+        Returns
+        -------
+        dict[int, Exception]
+            Errors raised while fetching, keyed by site id. Also recorded in `hydration_errors`.
+            Sites that failed are given empty observations, as when hydrating with `max_workers`, so they are not fetched again.
+        """
+        errors: dict[int, Exception] = {}
+        if self._quality is not None:
+            skipped = _skip_low_quality(
+                [site for site in self._sites if site.pending], self._quality
+            )
+            errors.update((site_id, error) for (site_id, _), error in skipped.items())
+        failed = load_pending_sites(
+            self._sites,
+            self._max_workers if self._max_workers is not None else 16,
+            batched=self._batched,
+        )
+        for site in self._sites:
+            if site.site_id in failed and site.pending:
+                site.set_observations([])
+        errors |= failed
+        self.hydration_errors.update(errors)
+        return errors
 
     def get_traversal_time(self) -> float:
         """
@@ -102,9 +199,10 @@ class RouteSegment:
         Returns
         -------
         float
-            The time to traverse this segment in hours.
+            The time to traverse this segment in hours. Infinite if no site on it has a speed, so searches avoid it.
         """
-        return self.length / self.get_average_speed()
+        speed = self.get_average_speed()
+        return self.length / speed if speed > 0 else math.inf
 
     def __repr__(self) -> str:
         """
@@ -115,7 +213,7 @@ class RouteSegment:
         str
             The string representation
         """
-        site_ids = [site.site_id for site in self.sites]
+        site_ids = [site.site_id for site in self._sites]
         return f"RouteSegment(name= {self.name}, get_traversal_time()={self.get_traversal_time()} ids={site_ids})"
 
     def __str__(self) -> str:
@@ -131,7 +229,19 @@ class RouteSegment:
             f"{self.name} segment taking {self.get_traversal_time() * 60:.1f} minutes"
         )
 
-    def __init__(self, name: str, site_ids: list[int], date: datetime, length: int):
+    def __init__(
+        self,
+        name: str,
+        site_ids: list[int],
+        date: datetime,
+        length: int,
+        transport: WebTRISTransport | None = None,
+        batched: bool = False,
+        hydrate: bool = True,
+        max_workers: int | None = None,
+        lazy: bool = False,
+        quality: QualityFilter | None = None,
+    ):
         """
         Initializes a new instance of a RouteSegment
 
@@ -145,14 +255,253 @@ class RouteSegment:
             The datetime to fetch traffic data for. Date and time components matter.
         length : int
             The length of the segment in miles.
+        transport : WebTRISTransport | None
+            The pooled transport to fetch site data through. Defaults to the shared transport.
+        batched : bool
+            If True, all sites are fetched together with one `MultiSiteDailyReportRequest` instead of one request per site.
+        hydrate : bool
+            If False, sites are created without observations and no API calls are made.
+            Use `hydrate_segments()` or `hydrate_graph()` to later fetch every site of many segments at once.
+        max_workers : int | None
+            If given, sites are fetched concurrently on a pool of this many threads and errors are collected in `hydration_errors` instead of raised.
+        lazy : bool
+            If True, no API calls are made until this segment's speed is first needed, i.e. when a search reaches it.
+            Its pending sites are then fetched together, batched if `batched` and on `max_workers` threads.
+        quality : QualityFilter | None
+            If given, the data quality of every site is checked first and sites below its threshold are not fetched.
+            Checked when the sites would be fetched, so not at all if `hydrate` is False.
         """
         self._name = name
         self._date = date
         self._sites = list()
         self.next_segments = list()
         self.length = length
-        for site_id in site_ids:
-            self._sites.append(Site(site_id, self.date))
+        self.transport = transport
+        self.hydration_errors = {}
+        self._lazy = lazy
+        self._batched = batched
+        self._max_workers = max_workers
+        self._quality = quality
+        skipped: dict[int, LowQualityError] = {}
+        given = list(site_ids)
+        if quality is not None and hydrate and not lazy:
+            skipped = quality.skipped(site_ids, self.date, self.date)
+            site_ids = [site_id for site_id in site_ids if site_id not in skipped]
+        if lazy:
+            for site_id in site_ids:
+                self._sites.append(
+                    Site(site_id, self.date, transport=self.transport, lazy=True)
+                )
+        elif not hydrate or max_workers is not None:
+            for site_id in site_ids:
+                self._sites.append(
+                    Site(site_id, self.date, transport=self.transport, observations=[])
+                )
+            if hydrate:
+                hydrate_segments([self], max_workers)
+        elif batched and site_ids:
+            observations = MultiSiteDailyReportRequest(
+                site_ids, self.date, transport=self.transport
+            ).send()
+            for site_id in observations:
+                self._sites.append(
+                    Site(
+                        site_id,
+                        self.date,
+                        transport=self.transport,
+                        observations=observations[site_id],
+                    )
+                )
+        else:
+            for site_id in site_ids:
+                self._sites.append(Site(site_id, self.date, transport=self.transport))
+        for site_id, error in skipped.items():
+            self._sites.append(
+                Site(site_id, self.date, transport=self.transport, observations=[])
+            )
+            self.hydration_errors[site_id] = error
+        if skipped:
+            # Skipped sites keep their place among the sites given
+            position = {site_id: i for i, site_id in enumerate(given)}
+            self._sites.sort(key=lambda site: position[site.site_id])
+
+
+def _skip_low_quality(
+    sites: list[Site], quality: QualityFilter
+) -> dict[tuple[int, datetime], LowQualityError]:
+    """
+    Checks the data quality of sites on their own days and gives those below the threshold empty observations,
+    so they are neither fetched nor left pending.
+
+    Returns
+    -------
+    dict[tuple[int, datetime], LowQualityError]
+        The skipped sites, keyed by (site_id, date at midnight)
+    """
+    by_day: dict[Date, list[Site]] = {}
+    for site in sites:
+        by_day.setdefault(site.date.date(), []).append(site)
+    skipped: dict[tuple[int, datetime], LowQualityError] = {}
+    for day_sites in by_day.values():
+        date = day_sites[0].date
+        day = date.replace(hour=0, minute=0, second=0, microsecond=0)
+        errors = quality.skipped([site.site_id for site in day_sites], date, date)
+        for site in day_sites:
+            if site.site_id in errors:
+                site.set_observations([])
+        skipped.update(((site_id, day), error) for site_id, error in errors.items())
+    return skipped
+
+
+def hydrate_segments(
+    segments: list[RouteSegment],
+    max_workers: int = 16,
+    quality: QualityFilter | None = None,
+    planner: RequestPlanner | None = None,
+) -> dict[int, Exception]:
+    """
+    Fetches the observations of every site on every segment concurrently on a thread pool.
+    A site appearing on several segments on the same day is only fetched once.
+
+    Parameters
+    ----------
+    segments : list[RouteSegment]
+        The segments to hydrate. Each site is fetched for its own date.
+    max_workers : int
+        The number of threads fetching at once.
+    quality : QualityFilter | None
+        If given, sites below its threshold are not fetched and a `LowQualityError` is returned for each.
+        Segments with their own `quality` are checked with it instead.
+    planner : RequestPlanner | None
+        If given, every (site, date) is fetched through its plan, in as few calls as possible, instead of one
+        `DailyReportRequest` each. The planner's transport is used for every site.
+
+    Returns
+    -------
+    dict[tuple[int, datetime], Exception]
+        Errors raised while fetching, keyed by (site_id, date at midnight) as in `RequestPlanner.errors`.
+        Failed sites are left without observations and the error is also recorded, by site id, in the
+        `hydration_errors` of each segment containing the site on that day.
+    """
+    if not isinstance(max_workers, int) or max_workers <= 0:
+        raise ValueError("Cannot hydrate with non-int/<=0 max_workers")
+    # Keyed by (site_id, date at midnight), like the needs of a `RequestPlanner`
+    pending: dict[tuple[int, datetime], list[Site]] = {}
+    owners: dict[tuple[int, datetime], list[RouteSegment]] = {}
+    filters: dict[int, tuple[QualityFilter, list[Site]]] = {}
+    for segment in segments:
+        check = segment._quality if segment._quality is not None else quality
+        for site in segment._sites:
+            day = site.date.replace(hour=0, minute=0, second=0, microsecond=0)
+            pending.setdefault((site.site_id, day), []).append(site)
+            owners.setdefault((site.site_id, day), []).append(segment)
+            if check is not None:
+                filters.setdefault(id(check), (check, []))[1].append(site)
+    errors: dict[tuple[int, datetime], Exception] = {}
+
+    def record(key: tuple[int, datetime], error: Exception) -> None:
+        errors[key] = error
+        for segment in owners[key]:
+            segment.hydration_errors[key[0]] = error
+
+    for check, sites in filters.values():
+        for key, error in _skip_low_quality(sites, check).items():
+            record(key, error)
+    pending = {key: sites for key, sites in pending.items() if key not in errors}
+    if planner is not None:
+        results = planner._execute(planner.plan(pending), max_workers)
+        for key, sites in pending.items():
+            if key in results:
+                _share_observations(sites, results[key])
+        for key, e in planner.errors.items():
+            record(key, e)
+        return errors
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {}
+        for key, sites in pending.items():
+            request = DailyReportRequest(
+                sites[0].site_id,
+                sites[0].date,
+                transport=sites[0].transport,
+                cache=sites[0].cache,
+                observation_cache=sites[0].observation_cache,
+            )
+            futures[pool.submit(request._send_store)] = key
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                observations = future.result()
+            except FETCH_ERRORS as e:
+                record(key, e)
+                continue
+            _share_observations(pending[key], observations)
+    return errors
+
+
+def _share_observations(
+    sites: list[Site], observations: list[TrafficObservation] | ObservationStore
+) -> None:
+    """
+    Gives the sites of one (site, day) the same fetched observations. A store is kept by the first site and
+    copied for the others, so none of them share it.
+    """
+    for site in sites[1:]:
+        site.set_observations(observations)
+    sites[0].set_observations(observations, copy=False)
+
+
+def collect_segments(head: RouteSegment) -> list[RouteSegment]:
+    """
+    Collects every segment reachable from `head` through `next_segments`, in breadth-first order.
+
+    Parameters
+    ----------
+    head : RouteSegment
+        The segment to start from. Included in the result.
+
+    Returns
+    -------
+    list[RouteSegment]
+        Every reachable segment, each once
+    """
+    segments: list[RouteSegment] = [head]
+    seen: set[RouteSegment] = {head}
+    q: deque[RouteSegment] = deque([head])
+    while q:
+        for next in q.popleft().next_segments:
+            if next not in seen:
+                seen.add(next)
+                segments.append(next)
+                q.append(next)
+    return segments
+
+
+def hydrate_graph(
+    head: RouteSegment,
+    max_workers: int = 16,
+    quality: QualityFilter | None = None,
+    planner: RequestPlanner | None = None,
+) -> dict[tuple[int, datetime], Exception]:
+    """
+    Fetches every site of every segment reachable from `head` concurrently. See `hydrate_segments()`.
+
+    Parameters
+    ----------
+    head : RouteSegment
+        The origin segment of the graph.
+    max_workers : int
+        The number of threads fetching at once.
+    quality : QualityFilter | None
+        If given, sites below its threshold are not fetched.
+    planner : RequestPlanner | None
+        If given, sites are fetched in as few calls as its plan allows.
+
+    Returns
+    -------
+    dict[tuple[int, datetime], Exception]
+        Errors raised while fetching, keyed by (site_id, date at midnight).
+    """
+    return hydrate_segments(collect_segments(head), max_workers, quality, planner)
 
 
 class RouteSegmentExternal(RouteSegment):
@@ -313,12 +662,14 @@ class DijkstrasAlgoSearch(SearchStrategy):
         # Hold the min-heap as a list of (time, path) tuples to evaluate the segment at the end of the list.
         # Used to be able to return the path at the end.
         # Python uses the first value in tuples for comparison, so heapq will rank based on traverse time
-        paths: list[tuple[float, list[RouteSegment]]] = []
+        # Equal times, i.e. two segments with no data, fall back to insertion order instead of comparing paths
+        order = itertools.count().__next__
+        paths: list[tuple[float, int, list[RouteSegment]]] = []
         # Must use [head] here to maintain a list of RouteSegments for a partial Route
-        heapq.heappush(paths, (head.get_traversal_time(), [head]))
+        heapq.heappush(paths, (head.get_traversal_time(), order(), [head]))
         visited: set[RouteSegment] = set()
         while paths:
-            cur_time, cur_path = heapq.heappop(paths)
+            cur_time, _, cur_path = heapq.heappop(paths)
             if len(cur_path) == 0:
                 continue
             cur_node: RouteSegment = cur_path[-1]
@@ -329,5 +680,8 @@ class DijkstrasAlgoSearch(SearchStrategy):
             for next in cur_node.next_segments:
                 new_path = cur_path.copy()
                 new_path.append(next)
-                heapq.heappush(paths, (cur_time + next.get_traversal_time(), new_path))
+                heapq.heappush(
+                    paths,
+                    (cur_time + next.get_traversal_time(), order(), new_path),
+                )
             visited.add(cur_node)
\ No newline at end of file
@@ -0,0 +1,541 @@
+"""Plans the fewest `/reports/daily` calls that cover a set of (site, date) needs, and runs the plan concurrently"""
+
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from webtris_cache import CacheMissError, ObservationCache, ReportCache
+from webtris_client import (
+    FETCH_ERRORS,
+    MAX_PAGE_SIZE,
+    ObservationStore,
+    SitesRequest,
+    TrafficObservation,
+    WebTRISTransport,
+    _iter_report_pages,
+    _parse_report_date,
+    get_default_cache,
+    get_default_observation_cache,
+    get_default_transport,
+)
+
+ROWS_PER_DAY = 96  # Fifteen minute rows the API returns for one site on one day
+
+
+def _as_list(
+    observations: list[TrafficObservation] | ObservationStore,
+) -> list[TrafficObservation]:
+    """
+    Gets the observations of a need as a list, making them only if they were kept as a store.
+    """
+    return observations if isinstance(observations, list) else list(observations)
+
+
+class PlannedCall:
+    """
+    One call to `/reports/daily` in a `FetchPlan`, covering every day from `start_date` to `end_date` for every site in `site_ids`.
+    Every (site, day) it covers was needed, so nothing is fetched twice or for nothing.
+
+    Attributes
+    ----------
+    site_ids: list[int], readonly
+        The sites sent together in the call.
+    start_date: datetime, readonly
+        The first day of the call.
+    end_date: datetime, readonly
+        The last day of the call, inclusive.
+    days: int, readonly
+        The number of days covered.
+    site_days: int, readonly
+        The number of (site, day) needs covered.
+    """
+
+    __slots__ = ("_end_date", "_site_ids", "_start_date")
+
+    def __init__(self, site_ids: list[int], start_date: datetime, end_date: datetime):
+        self._site_ids = list(site_ids)
+        self._start_date = start_date
+        self._end_date = end_date
+
+    @property
+    def site_ids(self) -> list[int]:
+        return self._site_ids.copy()
+
+    @property
+    def start_date(self) -> datetime:
+        return self._start_date
+
+    @property
+    def end_date(self) -> datetime:
+        return self._end_date
+
+    @property
+    def days(self) -> int:
+        return (self._end_date - self._start_date).days + 1
+
+    @property
+    def site_days(self) -> int:
+        return len(self._site_ids) * self.days
+
+    def needs(self) -> Iterator[tuple[int, datetime]]:
+        """
+        Yields the (site_id, date) needs this call covers.
+        """
+        for i in range(self.days):
+            date = self._start_date + timedelta(days=i)
+            for site_id in self._site_ids:
+                yield site_id, date
+
+    def __repr__(self) -> str:
+        return f"PlannedCall(site_ids={self._site_ids}, start_date={self._start_date.strftime('%Y-%m-%d')}, end_date={self._end_date.strftime('%Y-%m-%d')})"
+
+
+class FetchPlan:
+    """
+    The calls `RequestPlanner` will make for a set of (site, date) needs. Built by `RequestPlanner.plan()`,
+    inspected freely, and run by `RequestPlanner.execute()`.
+
+    Attributes
+    ----------
+    calls: list[PlannedCall], readonly
+        The `/reports/daily` calls to make.
+    lookup_calls: int, readonly
+        The `/sites` calls needed to map the "Site Name" of multi-site rows back to IDs. 0 if names were given.
+    cached: dict[tuple[int, datetime], list[TrafficObservation]], readonly
+        Needs already held by the caches, with their observations. These are not fetched.
+    unavailable: dict[tuple[int, datetime], CacheMissError], readonly
+        Needs an offline `ReportCache` does not hold. These are not fetched.
+    call_count: int, readonly
+        Every call the plan makes, report and lookup.
+    naive_call_count: int, readonly
+        The calls one `DailyReportRequest` per uncached need would make.
+    """
+
+    def __init__(
+        self,
+        calls: list[PlannedCall],
+        lookup_calls: int,
+        cached: dict[tuple[int, datetime], list[TrafficObservation] | ObservationStore],
+        unavailable: dict[tuple[int, datetime], CacheMissError],
+    ):
+        self._calls = calls
+        self._lookup_calls = lookup_calls
+        self._cached = cached
+        self._unavailable = unavailable
+
+    @property
+    def calls(self) -> list[PlannedCall]:
+        return self._calls.copy()
+
+    @property
+    def lookup_calls(self) -> int:
+        return self._lookup_calls
+
+    @property
+    def cached(self) -> dict[tuple[int, datetime], list[TrafficObservation]]:
+        return {need: _as_list(obs) for need, obs in self._cached.items()}
+
+    @property
+    def unavailable(self) -> dict[tuple[int, datetime], CacheMissError]:
+        return dict(self._unavailable)
+
+    @property
+    def call_count(self) -> int:
+        return len(self._calls) + self._lookup_calls
+
+    @property
+    def naive_call_count(self) -> int:
+        return sum(call.site_days for call in self._calls)
+
+    def describe(self) -> str:
+        """
+        Describes the plan one call per line, for logging or printing.
+        """
+        lines = [
+            f"{self.call_count} calls for {self.naive_call_count} uncached site-days ({len(self._cached)} cached, {len(self._unavailable)} unavailable)"
+        ]
+        if self._lookup_calls:
+            lines.append(f"  /sites lookup x{self._lookup_calls}")
+        for call in self._calls:
+            days = call.start_date.strftime("%Y-%m-%d")
+            if call.days > 1:
+                days += f" to {call.end_date.strftime('%Y-%m-%d')}"
+            lines.append(f"  /reports/daily {len(call.site_ids)} sites, {days}")
+        return "\n".join(lines)
+
+    def __iter__(self) -> Iterator[PlannedCall]:
+        return iter(self._calls)
+
+    def __len__(self) -> int:
+        return len(self._calls)
+
+    def __repr__(self) -> str:
+        return f"FetchPlan(calls={len(self._calls)}, lookup_calls={self._lookup_calls}, cached={len(self._cached)})"
+
+
+class RequestPlanner:
+    """
+    A class to fetch many scattered (site, date) needs with as few calls as the API's limits allow, instead of one
+    `DailyReportRequest` each. Needs already in `cache` or `observation_cache` are skipped. Each site's remaining days
+    are split into runs of consecutive days, and sites needing exactly the same run are sent together, so every row
+    fetched was needed. Calls are sized to fit one page of `page_size` rows and `max_sites_per_call` site IDs.
+    Fetched reports are stored in both caches, the same as `DailyReportRequest.send()`.
+
+    Attributes
+    ----------
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    cache: ReportCache | None
+        The cache of raw reports. Defaults to the shared cache from `get_default_cache()`.
+    observation_cache: ObservationCache | None
+        The in-memory cache of parsed observations. Defaults to `get_default_observation_cache()`.
+    site_names: dict[int, str] | None
+        The "Site Name" each site's rows are reported under. Looked up with `SitesRequest` for multi-site calls when not given.
+    page_size: int
+        The most rows a call may return.
+    max_sites_per_call: int
+        The most site IDs sent in one call, to keep request URLs within server limits.
+    dropped_rows: int, readonly
+        The number of rows excluded by the last `execute()`, either faulty or not from a planned site and day.
+    errors: dict[tuple[int, datetime], Exception], readonly
+        Errors raised by the last `execute()`, keyed by (site_id, date). Those needs have no result.
+
+    Methods
+    -------
+    plan(needs: Iterable[tuple[int, datetime]]) -> `FetchPlan`
+        Plans the calls covering the needs, without fetching anything.
+    execute(plan: FetchPlan, max_workers: int = 8) -> `dict[tuple[int, datetime], list[TrafficObservation]]`
+        Runs a plan's calls concurrently.
+    fetch(needs: Iterable[tuple[int, datetime]], max_workers: int = 8) -> `dict[tuple[int, datetime], list[TrafficObservation]]`
+        Plans and runs the calls covering the needs.
+    """
+
+    def __init__(
+        self,
+        transport: WebTRISTransport | None = None,
+        cache: ReportCache | None = None,
+        observation_cache: ObservationCache | None = None,
+        site_names: dict[int, str] | None = None,
+        page_size: int = MAX_PAGE_SIZE,
+        max_sites_per_call: int = 100,
+    ):
+        """
+        Parameters
+        ----------
+        transport : WebTRISTransport | None
+            The pooled transport to send requests through.
+        cache : ReportCache | None
+            The cache of raw reports.
+        observation_cache : ObservationCache | None
+            The in-memory cache of parsed observations.
+        site_names : dict[int, str] | None
+            The "Site Name" of each site, to skip the `/sites` lookup.
+        page_size : int
+            The most rows a call may return. At least one day of one site.
+        max_sites_per_call : int
+            The most site IDs sent in one call.
+        """
+        if (
+            not isinstance(page_size, int)
+            or not ROWS_PER_DAY <= page_size <= MAX_PAGE_SIZE
+        ):
+            raise ValueError(
+                f"Cannot initialize RequestPlanner with page_size outside {ROWS_PER_DAY}..{MAX_PAGE_SIZE}!"
+            )
+        if not isinstance(max_sites_per_call, int) or max_sites_per_call <= 0:
+            raise ValueError(
+                "Cannot initialize RequestPlanner with <=0 max_sites_per_call!"
+            )
+        self.transport = transport if transport is not None else get_default_transport()
+        self.cache = cache if cache is not None else get_default_cache()
+        self.observation_cache = (
+            observation_cache
+            if observation_cache is not None
+            else get_default_observation_cache()
+        )
+        self.site_names = site_names
+        self.page_size = page_size
+        self.max_sites_per_call = max_sites_per_call
+        self._dropped_rows = 0
+        self._errors: dict[tuple[int, datetime], Exception] = {}
+
+    @property
+    def dropped_rows(self) -> int:
+        return self._dropped_rows
+
+    @property
+    def errors(self) -> dict[tuple[int, datetime], Exception]:
+        return dict(self._errors)
+
+    def _cached(
+        self, site_id: int, date: datetime
+    ) -> list[TrafficObservation] | ObservationStore | None:
+        """
+        Gets a need from `observation_cache` or `cache`, or None if neither holds it.
+        Rows from `cache` are kept as a store unless `observation_cache` needs them as observations.
+
+        Raises
+        ------
+        webtris_cache.CacheMissError
+            Raised if `cache` is offline and does not hold the report
+        """
+        if self.observation_cache is not None:
+            observations = self.observation_cache.get(site_id, date)
+            if observations is not None:
+                return observations
+        if self.cache is not None:
+            rows = self.cache.get(site_id, date)
+            if rows is not None:
+                store, _ = ObservationStore.from_rows(site_id, rows)
+                if self.observation_cache is None:
+                    return store
+                observations = list(store)
+                self.observation_cache.put(site_id, date, observations)
+                return observations
+        return None
+
+    def plan(self, needs: Iterable[tuple[int, datetime]]) -> FetchPlan:
+        """
+        Plans the calls covering a set of needs. Caches are checked but the API is not called.
+
+        Parameters
+        ----------
+        needs : Iterable[tuple[int, datetime]]
+            The (site_id, date) pairs to fetch. Time of day is ignored and duplicates are planned once.
+
+        Raises
+        ------
+        TypeError
+            If a site ID is not an int or a date is not a datetime
+
+        Returns
+        -------
+        FetchPlan
+            The calls to make, and the needs served from the caches instead
+        """
+        days: dict[int, set[int]] = {}
+        for site_id, date in needs:
+            if not isinstance(site_id, int):
+                raise TypeError("Cannot plan non-int site_id")
+            if not isinstance(date, datetime):
+                raise TypeError("Cannot plan non-datetime date")
+            days.setdefault(site_id, set()).add(date.toordinal())
+
+        cached: dict[
+            tuple[int, datetime], list[TrafficObservation] | ObservationStore
+        ] = {}
+        unavailable: dict[tuple[int, datetime], CacheMissError] = {}
+        # Sites needing exactly the same run of days, keyed by the run's first and last day
+        runs: dict[tuple[int, int], list[int]] = {}
+        max_days = self.page_size // ROWS_PER_DAY
+        for site_id, ordinals in days.items():
+            missing: list[int] = []
+            for ordinal in sorted(ordinals):
+                date = datetime.fromordinal(ordinal)
+                try:
+                    observations = self._cached(site_id, date)
+                except CacheMissError as e:
+                    unavailable[(site_id, date)] = e
+                    continue
+                if observations is not None:
+                    cached[(site_id, date)] = observations
+                else:
+                    missing.append(ordinal)
+            start = 0
+            for i in range(1, len(missing) + 1):
+                if (
+                    i == len(missing)
+                    or missing[i] != missing[i - 1] + 1
+                    or i - start == max_days
+                ):
+                    runs.setdefault((missing[start], missing[i - 1]), []).append(
+                        site_id
+                    )
+                    start = i
+
+        calls: list[PlannedCall] = []
+        multi_site: set[int] = set()
+        for (first, last), site_ids in sorted(runs.items()):
+            per_call = min(
+                self.max_sites_per_call,
+                max(self.page_size // (ROWS_PER_DAY * (last - first + 1)), 1),
+            )
+            for i in range(0, len(site_ids), per_call):
+                chunk = site_ids[i : i + per_call]
+                calls.append(
+                    PlannedCall(
+                        chunk, datetime.fromordinal(first), datetime.fromordinal(last)
+                    )
+                )
+                if len(chunk) > 1:
+                    multi_site.update(chunk)
+        lookup_calls = 0
+        if self.site_names is None and multi_site:
+            lookup_calls = -(-len(multi_site) // self.max_sites_per_call)
+        return FetchPlan(calls, lookup_calls, cached, unavailable)
+
+    def _resolve_site_ids(self, plan: FetchPlan) -> dict[str, int]:
+        """
+        Builds the mapping of reported "Site Name" to site ID for the sites of multi-site calls.
+        """
+        if self.site_names is not None:
+            return {name: site_id for site_id, name in self.site_names.items()}
+        site_ids = sorted(
+            {
+                site_id
+                for call in plan
+                for site_id in call.site_ids
+                if len(call.site_ids) > 1
+            }
+        )
+        by_name: dict[str, int] = {}
+        for i in range(0, len(site_ids), self.max_sites_per_call):
+            chunk = site_ids[i : i + self.max_sites_per_call]
+            for info in SitesRequest(chunk, transport=self.transport).send():
+                # Report rows use the short description (i.e. "M25/4876A") as the site name
+                by_name.setdefault(info.name, info.site_id)
+                by_name[info.description] = info.site_id
+        return by_name
+
+    def _run_call(
+        self, call: PlannedCall, by_name: dict[str, int]
+    ) -> tuple[
+        dict[tuple[int, datetime], ObservationStore],
+        int,
+        dict[tuple[int, datetime], Exception],
+    ]:
+        """
+        Fetches one planned call and splits its rows per (site, day), storing each in the caches.
+        Sites of a multi-site call with no rows while some rows had an unknown "Site Name" are returned as errors
+        instead, as their rows may be among those, and are not cached.
+        """
+        site_ids = call.site_ids
+        grouped: dict[tuple[int, int], list[dict]] = {
+            (site_id, date.toordinal()): [] for site_id, date in call.needs()
+        }
+        dropped = 0
+        unmapped = 0
+        for rows in _iter_report_pages(
+            self.transport,
+            ",".join(str(site_id) for site_id in site_ids),
+            call.start_date,
+            call.end_date,
+            self.page_size,
+        ):
+            for row in rows:
+                site_id = (
+                    site_ids[0]
+                    if len(site_ids) == 1
+                    else by_name.get(row.get("Site Name"))
+                )
+                if site_id is None:
+                    unmapped += 1
+                key = (site_id, _parse_report_date(row.get("Report Date")))
+                if key not in grouped:
+                    dropped += 1
+                    continue
+                grouped[key].append(row)
+        unmatched: set[int] = set()
+        if unmapped:
+            unmatched = set(site_ids) - {
+                site_id for (site_id, _), rows in grouped.items() if rows
+            }
+        results: dict[tuple[int, datetime], ObservationStore] = {}
+        errors: dict[tuple[int, datetime], Exception] = {}
+        for (site_id, ordinal), rows in grouped.items():
+            date = datetime.fromordinal(ordinal)
+            if site_id in unmatched:
+                errors[(site_id, date)] = ValueError(
+                    f'Cannot match {unmapped} report rows to site {site_id} by "Site Name"'
+                )
+                continue
+            if self.cache is not None:
+                self.cache.put(site_id, date, rows)
+            # Silently exclude any faulty observations not containing full amounts of data
+            store, faulty = ObservationStore.from_rows(site_id, rows)
+            dropped += faulty
+            if self.observation_cache is not None:
+                self.observation_cache.put(site_id, date, list(store))
+            results[(site_id, date)] = store
+        return results, dropped, errors
+
+    def execute(
+        self, plan: FetchPlan, max_workers: int = 8
+    ) -> dict[tuple[int, datetime], list[TrafficObservation]]:
+        """
+        Runs every call of a plan concurrently on a thread pool.
+
+        Parameters
+        ----------
+        plan : FetchPlan
+            The plan from `plan()`.
+        max_workers : int
+            The number of calls made at once.
+
+        Returns
+        -------
+        dict[tuple[int, datetime], list[TrafficObservation]]
+            Observations keyed by (site_id, date at midnight), including those served from the caches.
+            Needs whose call failed, or that were unavailable offline, are left out and recorded in `errors`.
+        """
+        return {
+            need: _as_list(obs)
+            for need, obs in self._execute(plan, max_workers).items()
+        }
+
+    def _execute(
+        self, plan: FetchPlan, max_workers: int
+    ) -> dict[tuple[int, datetime], list[TrafficObservation] | ObservationStore]:
+        """
+        Runs a plan like `execute()`, but leaves fetched days as stores so no `TrafficObservation` objects are made
+        unless `observation_cache` needs them. Each store is returned once, so it can be kept with
+        `Site.set_observations(store, copy=False)`.
+        """
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError("Cannot execute plan with non-int/<=0 max_workers")
+        self._dropped_rows = 0
+        self._errors = dict(plan.unavailable)
+        # Stores are copied so a plan can be executed again without sharing them
+        results = {
+            need: obs.copy() if isinstance(obs, ObservationStore) else obs
+            for need, obs in plan._cached.items()
+        }
+        calls = plan.calls
+        if not calls:
+            return results
+        by_name: dict[str, int] = {}
+        if any(len(call.site_ids) > 1 for call in calls):
+            try:
+                by_name = self._resolve_site_ids(plan)
+            except FETCH_ERRORS as e:
+                for call in calls:
+                    if len(call.site_ids) > 1:
+                        self._errors.update((need, e) for need in call.needs())
+                calls = [call for call in calls if len(call.site_ids) == 1]
+        if not calls:
+            return results
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(calls))) as pool:
+            futures = {
+                pool.submit(self._run_call, call, by_name): call for call in calls
+            }
+            for future in as_completed(futures):
+                try:
+                    call_results, dropped, call_errors = future.result()
+                except FETCH_ERRORS as e:
+                    self._errors.update((need, e) for need in futures[future].needs())
+                    continue
+                results.update(call_results)
+                self._dropped_rows += dropped
+                self._errors.update(call_errors)
+        return results
+
+    def fetch(
+        self, needs: Iterable[tuple[int, datetime]], max_workers: int = 8
+    ) -> dict[tuple[int, datetime], list[TrafficObservation]]:
+        """
+        Plans and runs the calls covering a set of needs. See `plan()` and `execute()`.
+        """
+        return self.execute(self.plan(needs), max_workers)
+
+    def __repr__(self) -> str:
+        return f"RequestPlanner(page_size={self.page_size}, max_sites_per_call={self.max_sites_per_call})"
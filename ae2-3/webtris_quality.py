@@ -0,0 +1,317 @@
+"""A data-quality pre-check against the WebTRIS `/quality` endpoint, so sites without usable data are skipped before fetching"""
+
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from webtris_cache import QualityCache
+from webtris_client import FETCH_ERRORS, WebTRISTransport, get_default_transport
+
+
+class LowQualityError(Exception):
+    """
+    Recorded instead of fetching a site whose data quality is below a `QualityFilter` threshold.
+
+    Attributes
+    ----------
+    site_id: int
+        The site that was skipped.
+    quality: int | None
+        The quality reported by the API as a percentage, or None if it had no data.
+    """
+
+    def __init__(self, site_id: int, quality: int | None, min_quality: int):
+        self.site_id = site_id
+        self.quality = quality
+        reported = "no data" if quality is None else f"{quality}%"
+        super().__init__(
+            f"Site {site_id} skipped with data quality {reported}, below {min_quality}%"
+        )
+
+
+class QualityRequest:
+    """
+    A class to request the data quality of one site over a range of days from the `/quality/overall` endpoint.
+    Quality is the percentage of expected fifteen minute intervals the API holds. Make a request by calling `.send()`
+
+    Attributes
+    ----------
+    ENDPOINT: str, static, readonly
+        The endpoint used to make requests to the API. Do not change this.
+    site_id: int
+        The ID of the site this object handles.
+    start_date: datetime
+        The first day of the range. Strips hours, minutes, seconds, and microseconds on assignment.
+    end_date: datetime
+        The last day of the range, inclusive. Strips hours, minutes, seconds, and microseconds on assignment.
+    transport: WebTRISTransport
+        The pooled transport requests are sent through. Defaults to the shared transport from `get_default_transport()`.
+    cache: QualityCache | None
+        The cache qualities are served from and stored in.
+    """
+
+    ENDPOINT = "/quality/overall"
+
+    _site_id: int
+
+    @property
+    def site_id(self) -> int:
+        return self._site_id
+
+    @site_id.setter
+    def site_id(self, new: int) -> None:
+        if not isinstance(new, int):
+            raise TypeError("Cannot assign non-int to site_id")
+        self._site_id = new
+
+    _start_date: datetime
+
+    @property
+    def start_date(self) -> datetime:
+        return self._start_date
+
+    @start_date.setter
+    def start_date(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to start_date")
+        self._start_date = new.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    _end_date: datetime
+
+    @property
+    def end_date(self) -> datetime:
+        return self._end_date
+
+    @end_date.setter
+    def end_date(self, new: datetime) -> None:
+        if not isinstance(new, datetime):
+            raise TypeError("Cannot assign non-datetime to end_date")
+        self._end_date = new.replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def __init__(
+        self,
+        site_id: int,
+        start_date: datetime,
+        end_date: datetime,
+        transport: WebTRISTransport | None = None,
+        cache: QualityCache | None = None,
+    ):
+        self.site_id = site_id
+        self.start_date = start_date
+        self.end_date = end_date
+        if self.end_date < self.start_date:
+            raise ValueError("Cannot request a range with end_date before start_date")
+        self.transport = transport if transport is not None else get_default_transport()
+        self.cache = cache
+
+    def send(self) -> int | None:
+        """
+        Sends a request to the `/quality/overall` endpoint, unless `cache` holds the answer.
+
+        Returns
+        -------
+        int | None
+            The quality as a percentage from 0 to 100, or None if the API has no data for the site
+
+        Raises
+        ------
+        requests.HTTPError
+            Raised in the case that the fetch does not return a res.ok
+        ValueError
+            Raised if "data_quality" is not a number
+        """
+        if self.cache is not None:
+            stored, quality = self.cache.get(
+                self.site_id, self.start_date, self.end_date
+            )
+            if stored:
+                return quality
+        res = self.transport.get(
+            QualityRequest.ENDPOINT,
+            params={
+                "sites": str(self.site_id),
+                "start_date": self.start_date.strftime("%d%m%Y"),
+                "end_date": self.end_date.strftime("%d%m%Y"),
+            },
+        )
+        res.raise_for_status()
+        quality = None
+        if res.status_code != 204:
+            value = res.json().get("data_quality")
+            if value is not None:
+                quality = int(float(value))
+        if self.cache is not None:
+            self.cache.put(self.site_id, self.start_date, self.end_date, quality)
+        return quality
+
+    def __repr__(self):
+        return f"QualityRequest(site_id={self.site_id}, start_date={self.start_date.strftime('%Y-%m-%d')}, end_date={self.end_date.strftime('%Y-%m-%d')})"
+
+
+class QualityFilter:
+    """
+    A class to check the data quality of many sites before fetching them, so sites below `min_quality` are skipped
+    and the rest can be ranked best first. Qualities are cached per (site, date range) in `cache`.
+    A site whose quality cannot be checked is kept, so an outage of the quality endpoint never hides data.
+
+    Attributes
+    ----------
+    min_quality: int
+        The lowest quality, as a percentage, of a site that is fetched. Sites with no data are always skipped.
+    cache: QualityCache
+        The cache qualities are served from and stored in.
+    transport: WebTRISTransport | None
+        The transport used for API calls. `None` uses the shared transport from `get_default_transport()`.
+    max_workers: int
+        The number of sites checked at once.
+
+    Methods
+    -------
+    check(site_ids: Iterable[int], start_date: datetime, end_date: datetime) -> `dict[int, int | None]`
+        Gets the quality of each site that could be checked.
+    usable(site_ids: Iterable[int], start_date: datetime, end_date: datetime) -> `list[int]`
+        Removes sites below `min_quality`, keeping the order.
+    rank(site_ids: Iterable[int], start_date: datetime, end_date: datetime) -> `list[int]`
+        Orders usable sites by quality, best first.
+    """
+
+    def __init__(
+        self,
+        min_quality: int = 50,
+        cache: QualityCache | None = None,
+        transport: WebTRISTransport | None = None,
+        max_workers: int = 8,
+    ):
+        """
+        Parameters
+        ----------
+        min_quality : int
+            The lowest quality, as a percentage, of a site that is fetched.
+        cache : QualityCache | None
+            The cache of qualities. A new in-memory cache if not given.
+        transport : WebTRISTransport | None
+            The pooled transport to check through.
+        max_workers : int
+            The number of sites checked at once.
+        """
+        if not isinstance(min_quality, int) or not 0 <= min_quality <= 100:
+            raise ValueError(
+                "Cannot initialize QualityFilter with non-int/<0/>100 min_quality!"
+            )
+        if not isinstance(max_workers, int) or max_workers <= 0:
+            raise ValueError("Cannot initialize QualityFilter with <=0 max_workers!")
+        self.min_quality = min_quality
+        self.cache = cache if cache is not None else QualityCache()
+        self.transport = transport
+        self.max_workers = max_workers
+        self._errors: dict[int, Exception] = {}
+
+    @property
+    def errors(self) -> dict[int, Exception]:
+        """
+        Errors raised by the last `check()`, keyed by site id. Those sites were kept.
+        """
+        return dict(self._errors)
+
+    def check(
+        self, site_ids: Iterable[int], start_date: datetime, end_date: datetime
+    ) -> dict[int, int | None]:
+        """
+        Gets the quality of each site over a range of days, checking uncached sites concurrently.
+
+        Parameters
+        ----------
+        site_ids : Iterable[int]
+            The sites to check. Duplicates are checked once.
+        start_date : datetime
+            The first day of the range
+        end_date : datetime
+            The last day of the range, inclusive
+
+        Returns
+        -------
+        dict[int, int | None]
+            The quality of each site as a percentage, or None if the API has no data for it.
+            Sites whose check raised an error are left out and recorded in `errors`.
+        """
+        site_ids = list(dict.fromkeys(site_ids))
+        qualities: dict[int, int | None] = {}
+        self._errors = {}
+        if not site_ids:
+            return qualities
+        requests = {
+            site_id: QualityRequest(
+                site_id,
+                start_date,
+                end_date,
+                transport=self.transport,
+                cache=self.cache,
+            )
+            for site_id in site_ids
+        }
+        with ThreadPoolExecutor(
+            max_workers=min(self.max_workers, len(site_ids))
+        ) as pool:
+            futures = {
+                pool.submit(request.send): site_id
+                for site_id, request in requests.items()
+            }
+            for future in as_completed(futures):
+                site_id = futures[future]
+                try:
+                    qualities[site_id] = future.result()
+                except FETCH_ERRORS as e:
+                    self._errors[site_id] = e
+        return qualities
+
+    def passes(self, quality: int | None) -> bool:
+        """
+        Checks whether a quality is high enough for a site to be fetched.
+        """
+        return quality is not None and quality >= self.min_quality
+
+    def skipped(
+        self, site_ids: Iterable[int], start_date: datetime, end_date: datetime
+    ) -> dict[int, LowQualityError]:
+        """
+        Finds the sites below `min_quality` over a range of days.
+
+        Returns
+        -------
+        dict[int, LowQualityError]
+            An error describing each skipped site, keyed by site id
+        """
+        return {
+            site_id: LowQualityError(site_id, quality, self.min_quality)
+            for site_id, quality in self.check(site_ids, start_date, end_date).items()
+            if not self.passes(quality)
+        }
+
+    def usable(
+        self, site_ids: Iterable[int], start_date: datetime, end_date: datetime
+    ) -> list[int]:
+        """
+        Removes the sites below `min_quality` over a range of days, keeping the order of the rest.
+        """
+        site_ids = list(site_ids)
+        skipped = self.skipped(site_ids, start_date, end_date)
+        return [site_id for site_id in site_ids if site_id not in skipped]
+
+    def rank(
+        self, site_ids: Iterable[int], start_date: datetime, end_date: datetime
+    ) -> list[int]:
+        """
+        Orders the sites at or above `min_quality` by quality, best first. Sites that could not be checked come last.
+        Ties keep the order given.
+        """
+        site_ids = list(dict.fromkeys(site_ids))
+        qualities = self.check(site_ids, start_date, end_date)
+        kept = [
+            site_id
+            for site_id in site_ids
+            if site_id not in qualities or self.passes(qualities[site_id])
+        ]
+        return sorted(kept, key=lambda site_id: -qualities.get(site_id, -1))
+
+    def __repr__(self) -> str:
+        return f"QualityFilter(min_quality={self.min_quality}, max_workers={self.max_workers})"
@@ -0,0 +1,457 @@
+"""Mergeable streaming quantile sketches of speed, so percentiles over months of observations need bounded memory"""
+
+import math
+from collections.abc import Iterable
+
+import numpy as np
+
+from webtris_client import ObservationStore, Site, TrafficObservation
+
+
+class QuantileSketch:
+    """
+    A class to estimate quantiles of a weighted stream of values in bounded memory, using a merging t-digest.
+    Values are summarised as centroids (mean, weight), kept small near the tails so extreme quantiles stay accurate.
+    Sketches of separate streams can be merged and answer as if they had seen both.
+
+    Attributes
+    ----------
+    compression: int, readonly
+        Bounds the number of centroids, which is at most `compression`. Higher is more accurate and uses more memory.
+    count: float, readonly
+        The total weight of every value added.
+    min: float, readonly
+        The smallest value added. inf if empty.
+    max: float, readonly
+        The largest value added. -inf if empty.
+    centroid_count: int, readonly
+        The number of centroids held after compressing.
+
+    Methods
+    -------
+    add(values: ArrayLike, weights: ArrayLike | None = None) -> None
+        Adds values to the sketch.
+    merge(other: QuantileSketch) -> None
+        Adds everything another sketch has seen.
+    quantile(q: float) -> float
+        Estimates a quantile.
+    quantiles(qs: Iterable[float]) -> `numpy.ndarray`
+        Estimates several quantiles at once.
+    copy() -> `QuantileSketch`
+        Creates an independent copy.
+    """
+
+    def __init__(self, compression: int = 100):
+        """
+        Parameters
+        ----------
+        compression : int
+            Bounds the number of centroids. At least 10.
+        """
+        if not isinstance(compression, int) or compression < 10:
+            raise ValueError("Cannot initialize QuantileSketch with <10 compression!")
+        self._compression = compression
+        self._means = np.zeros(0)
+        self._weights = np.zeros(0)
+        # Values are buffered and folded into the centroids in batches, as each fold sorts everything
+        self._buffer_means: list[np.ndarray] = []
+        self._buffer_weights: list[np.ndarray] = []
+        self._buffered = 0
+        self._count = 0.0
+        self._min = math.inf
+        self._max = -math.inf
+
+    @property
+    def compression(self) -> int:
+        return self._compression
+
+    @property
+    def count(self) -> float:
+        return self._count
+
+    @property
+    def min(self) -> float:
+        return self._min
+
+    @property
+    def max(self) -> float:
+        return self._max
+
+    @property
+    def centroid_count(self) -> int:
+        self._compress()
+        return len(self._means)
+
+    def add(self, values, weights=None) -> None:
+        """
+        Adds values to the sketch. Values or weights that are not finite, and weights <=0, are silently ignored.
+
+        Parameters
+        ----------
+        values : ArrayLike
+            The values to add
+        weights : ArrayLike | None
+            The weight of each value, i.e. a vehicle count. Each value has weight 1 if not given.
+
+        Raises
+        ------
+        ValueError
+            If `weights` is not the same length as `values`
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if weights is None:
+            weights = np.ones(len(values))
+        else:
+            weights = np.asarray(weights, dtype=np.float64).ravel()
+            if len(weights) != len(values):
+                raise ValueError("Cannot add values and weights of different lengths")
+        keep = np.isfinite(values) & np.isfinite(weights) & (weights > 0)
+        if not keep.all():
+            values, weights = values[keep], weights[keep]
+        if len(values) == 0:
+            return
+        self._append(
+            values,
+            weights,
+            float(weights.sum()),
+            float(values.min()),
+            float(values.max()),
+        )
+
+    def _append(
+        self,
+        means: np.ndarray,
+        weights: np.ndarray,
+        count: float,
+        low: float,
+        high: float,
+    ) -> None:
+        self._buffer_means.append(means)
+        self._buffer_weights.append(weights)
+        self._buffered += len(means)
+        self._count += count
+        self._min = min(self._min, low)
+        self._max = max(self._max, high)
+        if self._buffered >= 5 * self._compression:
+            self._compress()
+
+    def merge(self, other: "QuantileSketch") -> None:
+        """
+        Adds everything another sketch has seen. The other sketch is not changed.
+
+        Raises
+        ------
+        TypeError
+            If `other` is not a `QuantileSketch`
+        """
+        if not isinstance(other, QuantileSketch):
+            raise TypeError("Cannot merge a QuantileSketch with a non-QuantileSketch")
+        if other._count == 0:
+            return
+        means = np.concatenate([other._means, *other._buffer_means])
+        weights = np.concatenate([other._weights, *other._buffer_weights])
+        self._append(means, weights, other._count, other._min, other._max)
+
+    def _compress(self) -> None:
+        """
+        Folds buffered values into the centroids. Neighbouring values are merged while the centroid stays within
+        the size allowed at its quantile by the k1 scale function, k(q) = compression / (2 * pi) * asin(2q - 1).
+        """
+        if self._buffered == 0:
+            return
+        means = np.concatenate([self._means, *self._buffer_means])
+        weights = np.concatenate([self._weights, *self._buffer_weights])
+        self._buffer_means.clear()
+        self._buffer_weights.clear()
+        self._buffered = 0
+        order = np.argsort(means, kind="stable")
+        means, weights = means[order].tolist(), weights[order].tolist()
+        total = sum(weights)
+        scale = self._compression / (2 * math.pi)
+
+        def q_limit(q: float) -> float:
+            k = min(scale * math.asin(2 * q - 1) + 1, self._compression / 4)
+            return (math.sin(k / scale) + 1) / 2
+
+        new_means: list[float] = []
+        new_weights: list[float] = []
+        mean, weight = means[0], weights[0]
+        weight_before = 0.0
+        limit = q_limit(0.0)
+        for next_mean, next_weight in zip(means[1:], weights[1:]):
+            if (weight_before + weight + next_weight) / total <= limit:
+                weight += next_weight
+                mean += (next_mean - mean) * next_weight / weight
+            else:
+                new_means.append(mean)
+                new_weights.append(weight)
+                weight_before += weight
+                limit = q_limit(min(weight_before / total, 1.0))
+                mean, weight = next_mean, next_weight
+        new_means.append(mean)
+        new_weights.append(weight)
+        self._means = np.array(new_means)
+        self._weights = np.array(new_weights)
+
+    def quantiles(self, qs: Iterable[float]) -> np.ndarray:
+        """
+        Estimates several quantiles at once, interpolating between the centroids.
+
+        Parameters
+        ----------
+        qs : Iterable[float]
+            The quantiles to estimate, each from 0 to 1
+
+        Raises
+        ------
+        ValueError
+            If any quantile is outside 0 to 1, or the sketch is empty
+
+        Returns
+        -------
+        numpy.ndarray
+            The estimates, in the order of `qs`
+        """
+        qs = np.asarray(list(qs), dtype=np.float64)
+        if np.any((qs < 0) | (qs > 1)) or np.any(np.isnan(qs)):
+            raise ValueError("Cannot estimate quantiles outside 0 to 1")
+        if self._count == 0:
+            raise ValueError("Cannot estimate quantiles of an empty QuantileSketch")
+        self._compress()
+        # Each centroid's mean sits at the middle of its weight, and the extremes at either end
+        positions = np.concatenate(
+            ([0.0], np.cumsum(self._weights) - self._weights / 2, [self._count])
+        )
+        values = np.concatenate(([self._min], self._means, [self._max]))
+        return np.interp(qs * self._count, positions, values)
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile, i.e. 0.85 for the 85th percentile.
+
+        Raises
+        ------
+        ValueError
+            If `q` is outside 0 to 1, or the sketch is empty
+        """
+        return float(self.quantiles([q])[0])
+
+    def copy(self) -> "QuantileSketch":
+        """
+        Creates an independent copy of the sketch.
+        """
+        sketch = QuantileSketch(self._compression)
+        sketch.merge(self)
+        return sketch
+
+    def __len__(self) -> int:
+        return self.centroid_count
+
+    def __repr__(self) -> str:
+        return f"QuantileSketch(compression={self.compression}, count={self.count}, centroids={self.centroid_count})"
+
+
+class HourlySpeedSketches:
+    """
+    A class to keep one `QuantileSketch` of speeds per (site_id, hour), fed from observation streams.
+    Speeds are weighted by vehicle count by default, so quantiles are of the speed of vehicles, as `Site.get_average_speed()` is.
+    Memory per key is bounded by `compression`, however many days are added.
+
+    Attributes
+    ----------
+    compression: int, readonly
+        The compression of every sketch.
+    weighted: bool, readonly
+        Whether speeds are weighted by vehicle count instead of by observation.
+    site_ids: list[int], readonly
+        The sites with any sketch, in ascending order.
+
+    Methods
+    -------
+    add(observations: Iterable[TrafficObservation] | ObservationStore) -> None
+        Adds observations from any number of sites.
+    add_site(site: Site) -> None
+        Adds the current observations of a site.
+    merge(other: HourlySpeedSketches) -> None
+        Adds everything another set of sketches has seen.
+    sketch(hour: int, site_ids: Iterable[int] | None = None) -> `QuantileSketch | None`
+        Gets the sketch of an hour, merged across sites.
+    quantiles(hour: int, qs: Iterable[float] = DEFAULT_QUANTILES, site_ids: Iterable[int] | None = None) -> `dict[float, float] | None`
+        Estimates speed quantiles of an hour.
+    """
+
+    DEFAULT_QUANTILES = (0.5, 0.85, 0.95)
+
+    def __init__(self, compression: int = 100, weighted: bool = True):
+        """
+        Parameters
+        ----------
+        compression : int
+            The compression of every sketch. At least 10.
+        weighted : bool
+            If True, weight speeds by vehicle count. Otherwise every observation has the same weight.
+        """
+        if not isinstance(compression, int) or compression < 10:
+            raise ValueError(
+                "Cannot initialize HourlySpeedSketches with <10 compression!"
+            )
+        self._compression = compression
+        self._weighted = weighted
+        self._sketches: dict[tuple[int, int], QuantileSketch] = {}
+
+    @property
+    def compression(self) -> int:
+        return self._compression
+
+    @property
+    def weighted(self) -> bool:
+        return self._weighted
+
+    @property
+    def site_ids(self) -> list[int]:
+        return sorted({site_id for site_id, _ in self._sketches})
+
+    def _get(self, site_id: int, hour: int) -> QuantileSketch:
+        sketch = self._sketches.get((site_id, hour))
+        if sketch is None:
+            sketch = self._sketches[(site_id, hour)] = QuantileSketch(self._compression)
+        return sketch
+
+    def _add_store(self, store: ObservationStore) -> None:
+        hours = store.minute // 60
+        order = np.argsort(hours, kind="stable")
+        counts = np.bincount(hours, minlength=24)
+        offsets = np.concatenate(([0], np.cumsum(counts)))
+        speed = store.speed[order]
+        volume = store.volume[order]
+        for hour in np.flatnonzero(counts).tolist():
+            rows = slice(offsets[hour], offsets[hour + 1])
+            self._get(store.site_id, hour).add(
+                speed[rows], volume[rows] if self._weighted else None
+            )
+
+    def add(
+        self, observations: Iterable[TrafficObservation] | ObservationStore
+    ) -> None:
+        """
+        Adds observations, which may be from any number of sites and days.
+
+        Parameters
+        ----------
+        observations : Iterable[TrafficObservation] | ObservationStore
+            The observations to add, i.e. as returned by `DailyReportRangeRequest.send()`
+        """
+        if isinstance(observations, ObservationStore):
+            self._add_store(observations)
+            return
+        by_site: dict[int, list[TrafficObservation]] = {}
+        for observation in observations:
+            by_site.setdefault(observation.site_id, []).append(observation)
+        for site_id, site_observations in by_site.items():
+            self._add_store(
+                ObservationStore.from_observations(site_observations, site_id=site_id)
+            )
+
+    def add_site(self, site: Site) -> None:
+        """
+        Adds the observations a site currently holds, without creating `TrafficObservation` objects.
+        A pending site is loaded first.
+        """
+        self._add_store(site._observations)
+
+    def merge(self, other: "HourlySpeedSketches") -> None:
+        """
+        Adds everything another set of sketches has seen, i.e. one built in another thread or process.
+
+        Raises
+        ------
+        TypeError
+            If `other` is not a `HourlySpeedSketches`
+        ValueError
+            If `other` weights speeds differently
+        """
+        if not isinstance(other, HourlySpeedSketches):
+            raise TypeError(
+                "Cannot merge a HourlySpeedSketches with a non-HourlySpeedSketches"
+            )
+        if other.weighted != self.weighted:
+            raise ValueError("Cannot merge weighted and unweighted sketches")
+        for (site_id, hour), sketch in other._sketches.items():
+            self._get(site_id, hour).merge(sketch)
+
+    def sketch(
+        self, hour: int, site_ids: Iterable[int] | None = None
+    ) -> QuantileSketch | None:
+        """
+        Gets the sketch of an hour, merged across sites.
+
+        Parameters
+        ----------
+        hour : int
+            The hour (0-23)
+        site_ids : Iterable[int] | None
+            The sites to merge. Every site if None.
+
+        Raises
+        ------
+        ValueError
+            If `hour` is not an int from 0 to 23
+
+        Returns
+        -------
+        QuantileSketch | None
+            A new sketch, or None if none of the sites have observations in that hour
+        """
+        if not isinstance(hour, int) or not 0 <= hour <= 23:
+            raise ValueError("Cannot get sketch of non-int/<0/>23 hour")
+        if site_ids is None:
+            site_ids = self.site_ids
+        merged = None
+        for site_id in site_ids:
+            sketch = self._sketches.get((site_id, hour))
+            if sketch is None:
+                continue
+            if merged is None:
+                merged = QuantileSketch(self._compression)
+            merged.merge(sketch)
+        return merged
+
+    def quantiles(
+        self,
+        hour: int,
+        qs: Iterable[float] = DEFAULT_QUANTILES,
+        site_ids: Iterable[int] | None = None,
+    ) -> dict[float, float] | None:
+        """
+        Estimates speed quantiles of an hour in mph, by default p50, p85, and p95.
+
+        Parameters
+        ----------
+        hour : int
+            The hour (0-23)
+        qs : Iterable[float]
+            The quantiles to estimate, each from 0 to 1
+        site_ids : Iterable[int] | None
+            The sites to include. Every site if None.
+
+        Raises
+        ------
+        ValueError
+            If `hour` is not an int from 0 to 23, or any quantile is outside 0 to 1
+
+        Returns
+        -------
+        dict[float, float] | None
+            The estimate of each quantile, or None if the sites have no observations in that hour
+        """
+        qs = list(qs)
+        sketch = self.sketch(hour, site_ids)
+        if sketch is None:
+            return None
+        return dict(zip(qs, sketch.quantiles(qs).tolist()))
+
+    def __len__(self) -> int:
+        return len(self._sketches)
+
+    def __repr__(self) -> str:
+        return f"HourlySpeedSketches(compression={self.compression}, weighted={self.weighted}, sketches={len(self)})"
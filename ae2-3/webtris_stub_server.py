@@ -0,0 +1,332 @@
+"""A local stand-in for the WebTRIS API used by tests and benchmarks"""
+
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+from urllib.parse import parse_qs, urlparse
+
+
+def make_daily_rows(site_id: int, date: datetime) -> list[dict]:
+    """
+    Builds a deterministic day of fifteen minute rows in the format returned by `/reports/daily`.
+
+    Parameters
+    ----------
+    site_id : int
+        The site the rows are generated for. Used as the seed for speeds and volumes.
+    date : datetime
+        The day the rows are generated for.
+
+    Returns
+    -------
+    list[dict]
+        96 rows, one per fifteen minute interval, in chronological order
+    """
+    rows: list[dict] = []
+    for interval in range(96):
+        minutes = interval * 15 + 14
+        rows.append(
+            {
+                "Site Name": f"STUB/{site_id}",
+                "Report Date": date.strftime("%Y-%m-%dT00:00:00"),
+                "Time Period Ending": f"{minutes // 60:02d}:{minutes % 60:02d}:00",
+                "Time Interval": str(interval),
+                "Avg mph": str(40 + (site_id + interval) % 30),
+                "Total Volume": str(50 + (site_id * 7 + interval * 13) % 200),
+            }
+        )
+    return rows
+
+
+def make_site(site_id: int, active: bool = True) -> dict:
+    """
+    Builds the `/sites` entry for a site, with a description matching the "Site Name" of `make_daily_rows()`.
+    """
+    return {
+        "Id": str(site_id),
+        "Name": f"Stub site {site_id}",
+        "Description": f"STUB/{site_id}",
+        "Longitude": -0.5 + (site_id % 100) / 100,
+        "Latitude": 51.0 + (site_id % 100) / 100,
+        "Status": "Active" if active else "Inactive",
+    }
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = (
+        256  # Accept bursts of concurrent connections without dropping any
+    )
+
+
+class StubWebTRISServer:
+    """
+    A threaded HTTP/1.1 server which imitates the parts of the WebTRIS API used by this application.
+    Keep-alive is supported so that pooled and un-pooled transports can be compared.
+
+    Attributes
+    ----------
+    url: str, readonly
+        The base URL of the server. Pass as `base_url` to a `WebTRISTransport`.
+    latency: float
+        Seconds to sleep before answering each request, to imitate a remote server.
+    request_count: int, readonly
+        The number of requests answered so far.
+    connection_count: int, readonly
+        The number of TCP connections accepted so far.
+    peak_in_flight: int, readonly
+        The most requests that have been handled at the same time.
+    failing_sites: set[int]
+        Sites whose reports are answered with a 500 error.
+    inactive_sites: set[int]
+        Sites listed by `/sites` with an "Inactive" status.
+    site_quality: dict[int, int | None]
+        The data quality `/quality/overall` reports for a site, as a percentage. None answers with a 204.
+        Sites not listed report 100.
+    intervals_available: int
+        The number of fifteen minute intervals served for each day, to imitate today's report still being filled in.
+    """
+
+    def __init__(self, latency: float = 0.0, host: str = "127.0.0.1"):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._request_count = 0
+        self._connection_count = 0
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self.failing_sites: set[int] = set()
+        self.inactive_sites: set[int] = set()
+        self.site_quality: dict[int, int | None] = {}
+        self.intervals_available = 96
+        self._server = _Server((host, 0), self._make_handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def request_count(self) -> int:
+        return self._request_count
+
+    @property
+    def connection_count(self) -> int:
+        return self._connection_count
+
+    @property
+    def peak_in_flight(self) -> int:
+        return self._peak_in_flight
+
+    def start(self) -> Self:
+        """
+        Starts serving on a background thread.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops serving and closes the listening socket.
+        """
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> Self:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def daily_report(self, query: dict[str, list[str]]) -> tuple[int, dict | None]:
+        """
+        Answers a `/reports/daily` query. Pages are built the same way as the real API, with a `nextPage` link in the header.
+
+        Returns
+        -------
+        tuple[int, dict | None]
+            The status code and JSON body to return
+        """
+        site_ids = [int(s) for s in query["sites"][0].split(",")]
+        if self.failing_sites.intersection(site_ids):
+            return 500, {"error": "stub failure"}
+        start = datetime.strptime(query["start_date"][0], "%d%m%Y")
+        end = datetime.strptime(query["end_date"][0], "%d%m%Y")
+        rows: list[dict] = []
+        day = start
+        while day <= end:
+            for site_id in site_ids:
+                rows.extend(make_daily_rows(site_id, day)[: self.intervals_available])
+            day += timedelta(days=1)
+        return self._page(rows, query, "/reports/daily")
+
+    def _page(
+        self, rows: list[dict], query: dict[str, list[str]], endpoint: str
+    ) -> tuple[int, dict | None]:
+        """
+        Answers one page of a `/reports` query from every row of the report.
+        """
+        page = int(query.get("page", ["1"])[0])
+        page_size = int(query.get("page_size", ["500"])[0])
+        page_rows = rows[(page - 1) * page_size : page * page_size]
+        if not page_rows:
+            return 204, None
+        links = []
+        if page * page_size < len(rows):
+            next_query = {k: v[0] for k, v in query.items()}
+            next_query["page"] = str(page + 1)
+            links.append(
+                {
+                    "href": f"{endpoint}?"
+                    + "&".join(f"{k}={v}" for k, v in next_query.items()),
+                    "rel": "nextPage",
+                }
+            )
+        header = {
+            "row_count": len(rows),
+            "start_date": query["start_date"][0],
+            "end_date": query["end_date"][0],
+            "links": links,
+        }
+        return 200, {"Header": header, "Rows": page_rows}
+
+    def summary_report(
+        self, query: dict[str, list[str]], monthly: bool
+    ) -> tuple[int, dict | None]:
+        """
+        Answers a `/reports/monthly` query with one row per day, or a `/reports/annual` query with one row per month.
+        Totals are those of the rows `daily_report()` serves for the same days.
+
+        Returns
+        -------
+        tuple[int, dict | None]
+            The status code and JSON body to return
+        """
+        site_ids = [int(s) for s in query["sites"][0].split(",")]
+        if self.failing_sites.intersection(site_ids):
+            return 500, {"error": "stub failure"}
+        start = datetime.strptime(query["start_date"][0], "%d%m%Y")
+        end = datetime.strptime(query["end_date"][0], "%d%m%Y")
+        rows: list[dict] = []
+        for site_id in site_ids:
+            periods: dict[datetime, list[float]] = {}
+            day = start
+            while day <= end:
+                daily = make_daily_rows(site_id, day)[: self.intervals_available]
+                period = day if monthly else day.replace(day=1)
+                totals = periods.setdefault(period, [0.0, 0])
+                for row in daily:
+                    volume = int(row["Total Volume"])
+                    totals[0] += float(row["Avg mph"]) * volume
+                    totals[1] += volume
+                day += timedelta(days=1)
+            for period, (weighted_speed, volume) in periods.items():
+                rows.append(
+                    {
+                        "Site Name": f"STUB/{site_id}",
+                        "Report Date": period.strftime("%Y-%m-%dT00:00:00"),
+                        "Avg mph": f"{weighted_speed / volume:.2f}" if volume else "",
+                        "Total Volume": str(volume),
+                    }
+                )
+        return self._page(
+            rows, query, "/reports/monthly" if monthly else "/reports/annual"
+        )
+
+    def quality(self, query: dict[str, list[str]]) -> tuple[int, dict | None]:
+        """
+        Answers a `/quality/overall` query for one site from `site_quality`.
+
+        Returns
+        -------
+        tuple[int, dict | None]
+            The status code and JSON body to return
+        """
+        site_id = int(query["sites"][0])
+        if site_id in self.failing_sites:
+            return 500, {"error": "stub failure"}
+        quality = self.site_quality.get(site_id, 100)
+        if quality is None:
+            return 204, None
+        return 200, {
+            "row_count": 1,
+            "start_date": query["start_date"][0],
+            "end_date": query["end_date"][0],
+            "data_quality": quality,
+            "sites": str(site_id),
+        }
+
+    def sites(self, path: str) -> tuple[int, dict | None]:
+        """
+        Answers a `/sites` or `/sites/{ids}` query.
+
+        Returns
+        -------
+        tuple[int, dict | None]
+            The status code and JSON body to return
+        """
+        ids = path.rsplit("/sites", 1)[1].strip("/")
+        site_ids = [int(s) for s in ids.split(",")] if ids else list(range(1, 101))
+        sites = [
+            make_site(site_id, site_id not in self.inactive_sites)
+            for site_id in site_ids
+        ]
+        return 200, {"row_count": len(sites), "sites": sites}
+
+    def _make_handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, so without this keep-alive connections stall on delayed ACKs
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub._connection_count += 1
+
+            def do_GET(self):
+                with stub._lock:
+                    stub._in_flight += 1
+                    stub._peak_in_flight = max(stub._peak_in_flight, stub._in_flight)
+                if stub.latency:
+                    threading.Event().wait(stub.latency)
+                with stub._lock:
+                    stub._request_count += 1
+                    stub._in_flight -= 1
+                parsed = urlparse(self.path)
+                if parsed.path.endswith("/reports/daily"):
+                    status, body = stub.daily_report(parse_qs(parsed.query))
+                elif parsed.path.endswith("/reports/monthly"):
+                    status, body = stub.summary_report(
+                        parse_qs(parsed.query), monthly=True
+                    )
+                elif parsed.path.endswith("/reports/annual"):
+                    status, body = stub.summary_report(
+                        parse_qs(parsed.query), monthly=False
+                    )
+                elif parsed.path.endswith("/quality/overall"):
+                    status, body = stub.quality(parse_qs(parsed.query))
+                elif "/sites" in parsed.path:
+                    status, body = stub.sites(parsed.path)
+                else:
+                    status, body = 404, {"error": "unknown endpoint"}
+                payload = b"" if body is None else json.dumps(body).encode()
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                except ConnectionError:
+                    # A client that timed out has already hung up
+                    pass
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler